@@ -1,19 +1,52 @@
 # main.py
 from fastapi import FastAPI, HTTPException, Depends
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List, Optional, Dict, Any
-import spacy
+from fastapi.responses import StreamingResponse, PlainTextResponse, JSONResponse
+from typing import TYPE_CHECKING, List, Optional, Dict, Any
+from dataclasses import dataclass, field, asdict
 import datetime
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Text, func, or_
+from sqlalchemy import create_engine, Column, Integer, String, DateTime, Text, Numeric, Index, func, or_, and_, select, insert, update, bindparam
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.engine import make_url
 import os
-import re
-from intents import INTENT_PATTERNS  
+import json
+import base64
+import binascii
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor
+import config
+from db_pool import PoolMetrics, warm_up_pool
+from message_writer import WriteBehindQueue, IdBlockAllocator
+from cache import QueryCache, TTLCache
+from name_index import TableNameIndex, rank_names
+from schema import ensure_columns, ensure_indexes, migrate_to_numeric, missing_columns
+from retention import archive_messages
+from jobs import PeriodicJob
+from stock_alerts import notify_restocked
+from suggestion_counts import SuggestionCounter
+from autocomplete import PrefixIndex
+from startup import StartupReport, LazyPipeline
+from nlp_backends import load_backend, catalog_entities
+from metrics import MetricsRegistry, MetricsMiddleware, StageTimer, instrument_engine, QUERY_COUNT_BUCKETS
+import uuid
+import queue
+import time
+from collections import Counter
+from intents import INTENT_PATTERNS, INTENT_EXAMPLES
+from intent_matcher import IntentMatcher
+from intent_similarity import IntentSimilarity
+from entity_extractor import EntityExtractor
+if TYPE_CHECKING:
+    from spacy.tokens import Doc, Span
 
 # Initialize FastAPI app
 app = FastAPI()
+# Timings of each startup phase and the readiness flag behind /ready
+startup_report = StartupReport()
 
 # CORS setup for frontend
 origins = ["http://localhost:3000"]
@@ -25,9 +58,57 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Instrumentation served from /metrics in Prometheus text format. Stage timers cover
+# parse / intent / entities / query / persist; the middleware adds per-route latency,
+# queries per request and (SERVER_TIMING) a Server-Timing header with the stage times.
+metrics = MetricsRegistry()
+stage_timer = StageTimer(
+    metrics.histogram("chatbot_stage_seconds", "Time spent in each message processing stage", ["stage"]),
+    enabled=config.METRICS_ENABLED
+)
+answer_seconds = metrics.histogram(
+    "chatbot_answer_seconds", "Time to answer one distinct question (lookups and formatting), by intent", ["intent"]
+)
+messages_answered = metrics.counter("chatbot_messages_total", "Messages answered, by intent", ["intent"])
+intent_fallbacks = metrics.counter(
+    "chatbot_intent_fallback_total", "Messages no intent pattern matched, by the intent the similarity fallback chose",
+    ["intent"]
+)
+if config.METRICS_ENABLED:
+    app.add_middleware(
+        MetricsMiddleware,
+        request_seconds=metrics.histogram(
+            "http_request_duration_seconds", "HTTP request latency", ["method", "route", "status"]
+        ),
+        request_queries=metrics.histogram(
+            "http_request_db_queries", "Database queries per HTTP request", ["route"], buckets=QUERY_COUNT_BUCKETS
+        ),
+        server_timing=config.SERVER_TIMING
+    )
+
 # Database setup for SQL Server
 SQLALCHEMY_DATABASE_URL = os.getenv('DATABASE_URL', "mssql+pyodbc://sa:kiran@HP\\SQLEXPRESS/ECommerceDB?driver=ODBC+Driver+17+for+SQL+Server")
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"driver": "ODBC Driver 17 for SQL Server"})
+# The ODBC driver argument only applies to SQL Server (local runs and benchmarks use SQLite)
+connect_args = {"driver": "ODBC Driver 17 for SQL Server"} if SQLALCHEMY_DATABASE_URL.startswith("mssql") else {}
+engine_options = {"pool_pre_ping": config.DB_POOL_PRE_PING, "pool_recycle": config.DB_POOL_RECYCLE}
+pool_metrics = PoolMetrics()
+# In-memory SQLite keeps a single connection per thread, so queue pooling doesn't apply
+database_url = make_url(SQLALCHEMY_DATABASE_URL)
+if not (database_url.get_backend_name() == "sqlite" and database_url.database in (None, "", ":memory:")):
+    engine_options.update(
+        poolclass=pool_metrics.pool_class,
+        pool_size=config.DB_POOL_SIZE,
+        max_overflow=config.DB_MAX_OVERFLOW,
+        pool_timeout=config.DB_POOL_TIMEOUT,
+    )
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args=connect_args, **engine_options)
+pool_metrics.attach(engine)
+if config.METRICS_ENABLED:
+    instrument_engine(
+        engine,
+        metrics.counter("db_queries_total", "Statements executed"),
+        metrics.histogram("db_query_seconds", "Statement execution time")
+    )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
@@ -38,6 +119,32 @@ class MessageDB(Base):
     content = Column(Text, nullable=False)
     is_user = Column(Integer, nullable=False)  # 1 for user, 0 for bot
     timestamp = Column(DateTime, default=datetime.datetime.utcnow)
+    session_id = Column(String(64), nullable=True)  # conversation; NULL for messages from before sessions
+
+    __table_args__ = (
+        # Serves history pages newest first and the (timestamp, id) keyset cursor
+        Index("ix_messages_timestamp_id", "timestamp", "id"),
+        # Makes "last N messages of session X" an index seek
+        Index("ix_messages_session_timestamp_id", "session_id", "timestamp", "id"),
+    )
+
+# Messages of sessions idle longer than MESSAGE_RETENTION_DAYS, moved out of the hot table
+class MessageArchiveDB(Base):
+    __tablename__ = "messages_archive"
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    content = Column(Text, nullable=False)
+    is_user = Column(Integer, nullable=False)
+    timestamp = Column(DateTime)
+    session_id = Column(String(64), nullable=True)
+    archived_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (Index("ix_messages_archive_session_timestamp", "session_id", "timestamp"),)
+
+# Counters for ids reserved ahead of insert (see message_writer.IdBlockAllocator)
+class IdBlockDB(Base):
+    __tablename__ = "id_blocks"
+    name = Column(String(50), primary_key=True)
+    next_id = Column(Integer, nullable=False)
 
 class SuggestionDB(Base):
     __tablename__ = "suggestions"
@@ -45,6 +152,21 @@ class SuggestionDB(Base):
     content = Column(String(255), nullable=False, unique=True)
     usage_count = Column(Integer, default=0)
 
+# "Notify me when X is back in stock" subscriptions; notified_at is set once the alert fires
+class StockAlertDB(Base):
+    __tablename__ = "stock_alerts"
+    id = Column(Integer, primary_key=True)
+    session_id = Column(String(64), nullable=False)
+    product_id = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    notified_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # The evaluator walks pending alerts (notified_at IS NULL) in id order
+        Index("ix_stock_alerts_pending", "notified_at", "id"),
+        Index("ix_stock_alerts_session_product", "session_id", "product_id"),
+    )
+
 # Models from your database schema
 class Brand(Base):
     __tablename__ = "Brands"
@@ -66,13 +188,28 @@ class Product(Base):
     __tablename__ = "products"
     ProductId = Column(Integer, primary_key=True)
     Name = Column(String(100), nullable=False)
-    Price = Column(String, nullable=False)
+    Price = Column(Numeric(18, 2), nullable=False)  # decimal(18,2), as the backend declares it
     Category = Column(String(100), nullable=False)
     Stock = Column(Integer, nullable=False)
     CreatedAt = Column(DateTime, default=datetime.datetime.utcnow)
     UpdatedAt = Column(DateTime)
     CategoryId = Column(Integer, nullable=False)
 
+    # Cheapest / most expensive / price range lookups are top-N scans of this index
+    __table_args__ = (Index("ix_products_price", "Price", "ProductId"),)
+
+# Low-stock and out-of-stock lists only read the bottom of the Stock range, so this
+# index holds just those rows and stays small however large the catalog grows. The
+# name carries the threshold: changing LOW_STOCK_THRESHOLD creates a new index at
+# startup (the old one has to be dropped by hand).
+low_stock_filter = Product.Stock <= config.LOW_STOCK_THRESHOLD
+Index(
+    f"ix_products_low_stock_{config.LOW_STOCK_THRESHOLD}", Product.Stock, Product.ProductId,
+    mssql_where=low_stock_filter, mssql_include=["Name"],
+    postgresql_where=low_stock_filter, postgresql_include=["Name"],
+    sqlite_where=low_stock_filter
+)
+
 class User(Base):
     __tablename__ = "Users"
     UserId = Column(Integer, primary_key=True)
@@ -106,33 +243,88 @@ class Supplier(Base):
     CreatedAt = Column(DateTime, default=datetime.datetime.utcnow)
     UpdatedAt = Column(DateTime)
 
-# Create tables if they don't exist
-Base.metadata.create_all(bind=engine)
+# Tables this service owns and migrates itself; the rest are the backend's catalog
+APP_TABLES = [
+    MessageDB.__table__, MessageArchiveDB.__table__, SuggestionDB.__table__,
+    IdBlockDB.__table__, StockAlertDB.__table__,
+]
+CATALOG_TABLES = [table for table in Base.metadata.sorted_tables if table not in APP_TABLES]
+
+def prepare_app_schema():
+    """Create the app's own tables and add the columns and indexes they are missing"""
+    Base.metadata.create_all(bind=engine, tables=APP_TABLES)
+    # create_all skips new columns and indexes on tables that already exist
+    for column_name in ensure_columns(engine, Base.metadata, APP_TABLES):
+        print(f"Added column {column_name}")
+    for index_name in ensure_indexes(engine, Base.metadata, APP_TABLES):
+        print(f"Created index {index_name}")
+
+def prepare_catalog_schema():
+    """Create missing catalog tables, columns and indexes and migrate old column types"""
+    Base.metadata.create_all(bind=engine, tables=CATALOG_TABLES)
+    for column_name in ensure_columns(engine, Base.metadata, CATALOG_TABLES):
+        print(f"Added column {column_name}")
+    # Databases created while Price was mapped as a string still store it as text
+    try:
+        rewritten = migrate_to_numeric(engine, Product.__table__.c.Price)
+        if rewritten is not None:
+            print(f"Converted products.Price to numeric ({rewritten} values rewritten)")
+    except (ValueError, NotImplementedError) as ex:
+        print(f"Warning: products.Price is still text, so price ordering is by text: {ex}")
+    for index_name in ensure_indexes(engine, Base.metadata, CATALOG_TABLES):
+        print(f"Created index {index_name}")
+
+# The app's own tables (history, suggestions, id blocks, stock alerts) are always
+# brought up to date, since every chat turn writes to them. Catalog DDL is opt-in
+# (DB_CREATE_SCHEMA): those tables belong to the backend's migrations.
+with startup_report.phase("schema"):
+    prepare_app_schema()
+if config.DB_CREATE_SCHEMA:
+    with startup_report.phase("catalog_schema"):
+        prepare_catalog_schema()
+
+DEFAULT_SUGGESTIONS = [
+    "List all products",
+    "Show product categories",
+    "Show brands",
+    "List all users",
+    "How many products in stock?",
+    "How many suppliers?",
+    "Show out of stock products",
+    "Show user permissions",
+    "Give email id of supplier Avantika Patil",
+    "What's the price of Laptop XPS 15?",
+    "Get phone number of supplier Tech Solutions"
+]
 
-# Initialize suggestions
 def initialize_suggestions():
+    """Store the default suggestions that are missing: one SELECT and at most one bulk INSERT"""
     db = SessionLocal()
-    default_suggestions = [
-        "List all products",
-        "Show product categories",
-        "Show brands",
-        "List all users",
-        "How many products in stock?",
-        "How many suppliers?",
-        "Show out of stock products",
-        "Show user permissions",
-        "Give email id of supplier Avantika Patil",
-        "What's the price of Laptop XPS 15?",
-        "Get phone number of supplier Tech Solutions"
-    ]
+    try:
+        existing = set(db.execute(
+            select(SuggestionDB.content).where(SuggestionDB.content.in_(DEFAULT_SUGGESTIONS))
+        ).scalars())
+        missing = [suggestion for suggestion in DEFAULT_SUGGESTIONS if suggestion not in existing]
+        if missing:
+            db.execute(insert(SuggestionDB.__table__), [{"content": suggestion} for suggestion in missing])
+            db.commit()
+    finally:
+        db.close()
 
-    for suggestion in default_suggestions:
-        existing = db.query(SuggestionDB).filter(SuggestionDB.content == suggestion).first()
-        if not existing:
-            db.add(SuggestionDB(content=suggestion))
+# Bounded pool for blocking DB and spaCy work, so a slow query only ties up one
+# worker thread instead of the event loop every other request is waiting on
+blocking_executor = (
+    ThreadPoolExecutor(max_workers=config.BLOCKING_WORKERS, thread_name_prefix="chatbot-blocking")
+    if config.BLOCKING_WORKERS > 0 else None
+)
 
-    db.commit()
-    db.close()
+async def run_blocking(func, *args, **kwargs):
+    """Run a blocking function on the executor and await its result"""
+    if blocking_executor is None:
+        return func(*args, **kwargs)
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(blocking_executor, functools.partial(context.run, func, *args, **kwargs))
 
 # Dependency to get DB session
 def get_db():
@@ -142,16 +334,32 @@ def get_db():
     finally:
         db.close()
 
-# Load spaCy NLP model
-try:
-    nlp = spacy.load("en_core_web_sm")
-except OSError:
-    print("Warning: spaCy model not found. Using small model.")
-    nlp = spacy.blank("en")
+# NLP pipeline (NLP_BACKEND, see nlp_backends.py). It is loaded on first use (normally
+# by the background warm-up), so importing the app and opening the port don't wait for
+# it. The handlers only read entities, noun chunks and part-of-speech tags.
+def load_catalog_names() -> Dict[str, List[str]]:
+    """Product and supplier names for the rule-only backend's entity ruler"""
+    db = SessionLocal()
+    try:
+        return {
+            "PRODUCT": db.execute(select(Product.Name).distinct()).scalars().all(),
+            "SUPPLIER": db.execute(select(Supplier.Name).distinct()).scalars().all(),
+        }
+    finally:
+        db.close()
+
+def load_nlp():
+    return load_backend(
+        config.NLP_BACKEND, config.SPACY_MODEL, config.SPACY_EXCLUDE,
+        load_names=load_catalog_names, refresh_interval=config.NLP_RULES_REFRESH_SECONDS
+    )
+
+nlp = LazyPipeline(load_nlp)
 
 # Models
 class MessageRequest(BaseModel):
     message: str
+    session_id: Optional[str] = Field(None, max_length=64)  # omit to start a new session
 
 class Entity(BaseModel):
     label: str
@@ -161,173 +369,384 @@ class ChatbotResponse(BaseModel):
     message: str
     entities: List[Entity] = []
     message_id: int
+    session_id: str
 
 class SuggestionsResponse(BaseModel):
     suggestions: List[str]
 
+class AutocompleteResponse(BaseModel):
+    query: str
+    completions: List[str]
+
 class Message(BaseModel):
     id: int
     content: str
     is_user: bool
     timestamp: datetime.datetime
+    session_id: Optional[str] = None
 
 class MessageHistoryResponse(BaseModel):
     messages: List[Message]
+    next_cursor: Optional[str] = None  # pass back as ?cursor= for the next (older) page
 
-# Improved entity extraction function
-def extract_entities(message: str) -> Dict[str, Any]:
-    doc = nlp(message)
-    entities = {}
-
-    # Extract product names, categories, numbers, etc.
-    # Look for product names after terms like "find" or "search"
-    product_search_patterns = [r"find\s+([\w\s]+)", r"search\s+for\s+([\w\s]+)", r"looking\s+for\s+([\w\s]+)"]
-    for pattern in product_search_patterns:
-        match = re.search(pattern, message, re.IGNORECASE)
-        if match:
-            entities["product_name"] = match.group(1).strip()
-            break
-
-    # Extract supplier name pattern
-    supplier_patterns = [
-        r"(?:supplier|vendor)\s+([A-Za-z\s]+?)(?:\s+(?:email|phone|contact|address)|$)",
-        r"(?:email|phone|contact|address)\s+(?:of|for)\s+(?:supplier|vendor)\s+([A-Za-z\s]+)(?:\?|$)",
-        r"(?:email|phone|contact|address)\s+(?:of|for)\s+([A-Za-z\s]+)(?:\?|$)"
-    ]
-
-    for pattern in supplier_patterns:
-        match = re.search(pattern, message, re.IGNORECASE)
-        if match:
-            entities["supplier_name"] = match.group(1).strip()
-            break
-
-    # Extract product price pattern
-    price_patterns = [
-        r"price\s+of\s+([\w\s\d]+?)(?:\?|$)",
-        r"how\s+much\s+(?:is|does|costs?)\s+([\w\s\d]+?)(?:\?|$)",
-        r"what(?:'s|\s+is)\s+the\s+price\s+of\s+([\w\s\d]+?)(?:\?|$)"
-    ]
+class BatchMessageRequest(BaseModel):
+    messages: List[str]
+    session_id: Optional[str] = Field(None, max_length=64)
 
-    for pattern in price_patterns:
-        match = re.search(pattern, message, re.IGNORECASE)
-        if match:
-            entities["product_name"] = match.group(1).strip()
-            break
-
-    # Extract what attribute/field they're looking for
-    field_patterns = {
-        "email": [r"email\s+(?:id|address)", r"e-?mail"],
-        "phone": [r"phone\s+(?:number|no\.?)", r"contact\s+number"],
-        "address": [r"address", r"location"],
-        "price": [r"price", r"cost", r"how much"],
-        "stock": [r"stock", r"inventory", r"available"]
-    }
-
-    for field, patterns in field_patterns.items():
-        for pattern in patterns:
-            if re.search(pattern, message, re.IGNORECASE):
-                entities["requested_field"] = field
-                break
-        if "requested_field" in entities:
-            break
-
-    # Extract numbers for potential quantities or IDs
-    quantity_pattern = r"(\d+)\s+(?:products?|items?|users?)"
-    match = re.search(quantity_pattern, message, re.IGNORECASE)
-    if match:
-        entities["quantity"] = int(match.group(1))
-
-    # If no specific product name was found, try to find noun chunks
-    if "product_name" not in entities and "supplier_name" not in entities:
-        for chunk in doc.noun_chunks:
-            # Skip chunks that are likely not product or supplier names
-            skip_terms = ["product", "category", "user", "database", "list", "all", "email", "phone"]
-            if not any(term in chunk.text.lower() for term in skip_terms):
-                # Check if this could be a proper name (potential supplier)
-                is_proper = any(token.pos_ == "PROPN" for token in chunk)
-                if is_proper:
-                    entities["supplier_name"] = chunk.text
-                else:
-                    entities["product_name"] = chunk.text
-                break
-
-    return entities
-
-# Determine user intent from message
-def classify_intent(message: str) -> str:
-    message_lower = message.lower()
+class BatchChatbotResponse(BaseModel):
+    responses: List[ChatbotResponse]
 
-    for intent, patterns in INTENT_PATTERNS.items():
-        for pattern in patterns:
-            if re.search(pattern, message_lower, re.IGNORECASE):
-                return intent
+# Result of running the NLP pipeline over a single message. It is built once per
+# request and shared by the endpoint and every response handler.
+@dataclass
+class MessageAnalysis:
+    message: str
+    doc: "Doc"
+    intent: str
+    entities: List[Dict[str, str]] = field(default_factory=list)  # spaCy NER entities
+    noun_chunks: List["Span"] = field(default_factory=list)
+    extracted: Dict[str, Any] = field(default_factory=dict)  # entities used by the handlers
+
+def get_noun_chunks(doc: "Doc") -> List["Span"]:
+    # Blank pipelines have no dependency parse, so they can't produce noun chunks
+    if not doc.has_annotation("DEP"):
+        return []
+    return list(doc.noun_chunks)
+
+def analyze_message(message: str) -> MessageAnalysis:
+    """Parse a message with spaCy once and collect everything the handlers need"""
+    with stage_timer("parse"):
+        doc = nlp(message)
+    return build_analysis(message, doc)
+
+def analyze_messages(messages: List[str], batch_size: Optional[int] = None,
+                     n_process: Optional[int] = None) -> List[MessageAnalysis]:
+    """analyze_message for many messages, parsed together with nlp.pipe"""
+    with stage_timer("parse"):
+        docs = list(nlp.pipe(
+            messages,
+            batch_size=batch_size or config.NLP_BATCH_SIZE,
+            n_process=n_process or config.NLP_N_PROCESS
+        ))
+    with stage_timer("intent"):
+        intents = classify_intents(messages)
+    return [build_analysis(message, doc, intent) for message, doc, intent in zip(messages, docs, intents)]
+
+def build_analysis(message: str, doc: "Doc", intent: Optional[str] = None) -> MessageAnalysis:
+    noun_chunks = get_noun_chunks(doc)
+    if intent is None:
+        with stage_timer("intent"):
+            intent = classify_intent(message)
+    with stage_timer("entities"):
+        extracted = extract_entities(message, doc, noun_chunks)
+    return MessageAnalysis(
+        message=message,
+        doc=doc,
+        intent=intent,
+        entities=[{"label": ent.label_, "text": ent.text} for ent in doc.ents],
+        noun_chunks=noun_chunks,
+        extracted=extracted
+    )
 
-    # Check if query is about specific supplier info
-    if re.search(r"(email|phone|contact|address)\s+(?:of|for|details)", message_lower):
-        return "supplier_contact"
+# Entity extraction rules live in entity_extractor.py and are compiled once at import
+entity_extractor = EntityExtractor()
+
+def extract_entities(message: str, doc: Optional["Doc"] = None, noun_chunks: Optional[List["Span"]] = None) -> Dict[str, Any]:
+    # Reuse an existing parse when the caller already has one
+    if doc is None and noun_chunks is None:
+        doc = nlp(message)
+    if noun_chunks is None:
+        noun_chunks = get_noun_chunks(doc)
+    return entity_extractor.extract(message, noun_chunks, catalog_entities(doc) if doc is not None else ())
+
+# Determine user intent from message. All patterns are compiled once at import;
+# the fallbacks below only apply when no INTENT_PATTERNS entry matches.
+intent_matcher = IntentMatcher(
+    INTENT_PATTERNS,
+    fallbacks=[
+        # Check if query is about specific supplier info
+        ("supplier_contact", r"(email|phone|contact|address)\s+(?:of|for|details)"),
+        # Check if query is about product price
+        ("product_price", r"(price|cost|how much)"),
+    ]
+)
 
-    # Check if query is about product price
-    if re.search(r"(price|cost|how much)", message_lower):
-        return "product_price"
+# Messages no pattern matches get a second chance against example utterances
+intent_similarity = (
+    IntentSimilarity(INTENT_EXAMPLES, threshold=config.INTENT_SIMILARITY_THRESHOLD, default=intent_matcher.default)
+    if config.INTENT_SIMILARITY_ENABLED else None
+)
 
-    return "unknown"
+def classify_intent(message: str) -> str:
+    intent = intent_matcher.match(message)
+    if intent == intent_matcher.default and intent_similarity is not None:
+        intent, _ = intent_similarity.classify(message)
+        intent_fallbacks.inc(intent)
+    return intent
+
+def classify_intents(messages: List[str]) -> List[str]:
+    """classify_intent for many messages; the unmatched ones are scored in one matrix product"""
+    intents = [intent_matcher.match(message) for message in messages]
+    unmatched = [i for i, intent in enumerate(intents) if intent == intent_matcher.default]
+    if unmatched and intent_similarity is not None:
+        scored = intent_similarity.classify_many([messages[i] for i in unmatched])
+        for i, (intent, _) in zip(unmatched, scored):
+            intents[i] = intent
+            intent_fallbacks.inc(intent)
+    return intents
 
 # Enhanced database query functions
-def get_products(db: Session, limit: int = 10):
-    return db.query(Product).limit(limit).all()
-
+# List replies only format a few columns, so they select just those through Core:
+# plain row tuples (with attribute access), no entity construction or identity map
+def read_rows(db: Session, query, chunk_size: Optional[int] = None):
+    """Execute a column-only select on the session's connection; with chunk_size the
+    rows are fetched from the database that many at a time as they are iterated"""
+    if chunk_size is not None:
+        # On the statement: connection options would stay set for the rest of the request
+        query = query.execution_options(yield_per=chunk_size)
+    return db.connection().execute(query)
+
+products_table = Product.__table__
+
+def get_products(db: Session, limit: int = 10, after_id: Optional[int] = None):
+    """(ProductId, Name, Price, Stock) of up to `limit` products after ProductId `after_id`"""
+    c = products_table.c
+    query = select(c.ProductId, c.Name, c.Price, c.Stock)
+    if after_id is not None:
+        query = query.where(c.ProductId > after_id)
+    return read_rows(db, query.order_by(c.ProductId).limit(limit)).all()
+
+# Reference data changes rarely, so these queries go through TTL caches. Cached
+# rows are detached from the session so a later commit can't expire them.
+reference_cache = QueryCache()
+
+def detached(db: Session, rows: list) -> list:
+    for row in rows:
+        db.expunge(row)
+    return rows
+
+@reference_cache.cached("categories", ttl=config.CACHE_TTL_CATEGORIES, maxsize=config.CACHE_MAX_ENTRIES)
 def get_categories(db: Session):
-    return db.query(Category).all()
+    return detached(db, db.query(Category).all())
 
+@reference_cache.cached("brands", ttl=config.CACHE_TTL_BRANDS, maxsize=config.CACHE_MAX_ENTRIES)
 def get_brands(db: Session):
-    return db.query(Brand).all()
+    return detached(db, db.query(Brand).all())
 
-def get_users(db: Session, limit: int = 10):
-    return db.query(User).limit(limit).all()
+def get_users(db: Session, limit: int = 10, after_id: Optional[int] = None):
+    """(UserId, Username, FirstName, LastName, Email) of up to `limit` users after UserId `after_id`"""
+    c = User.__table__.c
+    query = select(c.UserId, c.Username, c.FirstName, c.LastName, c.Email)
+    if after_id is not None:
+        query = query.where(c.UserId > after_id)
+    return read_rows(db, query.order_by(c.UserId).limit(limit)).all()
 
+@reference_cache.cached("suppliers", ttl=config.CACHE_TTL_SUPPLIERS, maxsize=config.CACHE_MAX_ENTRIES)
 def get_suppliers(db: Session):
-    return db.query(Supplier).all()
+    # Rows don't belong to the session, so they can be cached as they are
+    c = Supplier.__table__.c
+    return read_rows(db, select(c.SupplierId, c.Name, c.Email, c.Phone).order_by(c.SupplierId)).all()
 
 def get_products_count(db: Session):
     return db.query(func.count(Product.ProductId)).scalar()
 
+# Row counts for the overview intents, all read in one statement and cached as a
+# snapshot. The catalog is written by the backend, so the snapshot expires on a
+# TTL (or /invalidate-cache?name=stats) and replies say how old it is.
+@dataclass
+class StatsSnapshot:
+    products: int
+    products_in_stock: int
+    categories: int
+    brands: int
+    users: int
+    suppliers: int
+    taken_at: datetime.datetime
+
+    def age_seconds(self) -> float:
+        return (datetime.datetime.utcnow() - self.taken_at).total_seconds()
+
+    def freshness(self) -> str:
+        age = int(self.age_seconds())
+        return "just now" if age < 1 else f"{age}s ago"
+
+@reference_cache.cached("stats", ttl=config.CACHE_TTL_STATS, maxsize=1)
+def get_stats_snapshot(db: Session) -> StatsSnapshot:
+    # SELECT (SELECT COUNT(...)) AS products, ... - one round trip for every counter
+    counts = db.execute(select(
+        select(func.count(Product.ProductId)).scalar_subquery().label("products"),
+        select(func.count(Product.ProductId)).where(Product.Stock > 0).scalar_subquery().label("products_in_stock"),
+        select(func.count(Category.CategoryId)).scalar_subquery().label("categories"),
+        select(func.count(Brand.BrandId)).scalar_subquery().label("brands"),
+        select(func.count(User.UserId)).scalar_subquery().label("users"),
+        select(func.count(Supplier.SupplierId)).scalar_subquery().label("suppliers"),
+    )).one()
+    return StatsSnapshot(**counts._asdict(), taken_at=datetime.datetime.utcnow())
+
 def get_products_in_stock_count(db: Session):
     return db.query(func.count(Product.ProductId)).filter(Product.Stock > 0).scalar()
 
+def get_products_by_price(db: Session, descending: bool = False, min_price=None, max_price=None,
+                          limit: int = 10):
+    """Up to `limit` products ordered by price within an optional range (an index range scan)"""
+    query = db.query(Product)
+    if min_price is not None:
+        query = query.filter(Product.Price >= min_price)
+    if max_price is not None:
+        query = query.filter(Product.Price <= max_price)
+    order = (Product.Price.desc(), Product.ProductId.desc()) if descending else (Product.Price, Product.ProductId)
+    return query.order_by(*order).limit(limit).all()
+
+def inline_int(value: int):
+    # Rendered into the SQL instead of bound: SQL Server only uses a filtered index when
+    # it can see at compile time that the query's range lies inside the index's filter
+    return bindparam(None, int(value), type_=Integer, literal_execute=True)
+
 def get_out_of_stock_products(db: Session):
-    return db.query(Product).filter(Product.Stock == 0).all()
+    """Yield the names of products with no stock, reading LIST_STREAM_CHUNK_SIZE rows at a time"""
+    c = products_table.c
+    query = select(c.Name).where(c.Stock == inline_int(0)).order_by(c.ProductId)
+    for rows in read_rows(db, query, config.LIST_STREAM_CHUNK_SIZE).partitions():
+        yield from rows
+
+def get_low_stock_products(db: Session, threshold: int, limit: int):
+    """Up to `limit` products with at most `threshold` units, lowest stock first"""
+    return (
+        db.query(Product.ProductId, Product.Name, Product.Stock)
+        .filter(Product.Stock <= inline_int(threshold))
+        .order_by(Product.Stock, Product.ProductId)
+        .limit(limit)
+        .all()
+    )
+
+def subscribe_to_stock_alert(db: Session, session_id: str, product_id: int) -> bool:
+    """Add a pending back-in-stock alert; False if the session already has one for the product"""
+    pending = db.query(StockAlertDB.id).filter(
+        StockAlertDB.session_id == session_id,
+        StockAlertDB.product_id == product_id,
+        StockAlertDB.notified_at.is_(None)
+    ).first()
+    if pending is not None:
+        return False
+    db.add(StockAlertDB(session_id=session_id, product_id=product_id))
+    # Committed with the conversation turn (save_conversation_turn), or by
+    # commit_request_writes when the turn goes through the write-behind queue
+    db.flush()
+    db.info["has_writes"] = True
+    return True
+
+def commit_request_writes(db: Session):
+    """Commit what the answer itself wrote (stock alerts) when the turn isn't saved in this session"""
+    if db.info.pop("has_writes", False):
+        db.commit()
+
+def get_pending_stock_alerts(db: Session, session_id: str):
+    return (
+        db.query(Product.Name)
+        .join(StockAlertDB, StockAlertDB.product_id == Product.ProductId)
+        .filter(StockAlertDB.session_id == session_id, StockAlertDB.notified_at.is_(None))
+        .order_by(StockAlertDB.id)
+        .all()
+    )
 
 def get_product_by_category(db: Session, category_id: int):
     return db.query(Product).filter(Product.CategoryId == category_id).all()
 
+@reference_cache.cached("permissions", ttl=config.CACHE_TTL_PERMISSIONS, maxsize=config.CACHE_MAX_ENTRIES)
 def get_user_permissions(db: Session, user_id: int = None):
     if user_id:
-        return db.query(UserPermission).filter(UserPermission.UserId == user_id).all()
-    return db.query(UserPermission).all()
+        return detached(db, db.query(UserPermission).filter(UserPermission.UserId == user_id).all())
+    return detached(db, db.query(UserPermission).all())
+
+# In-memory name indexes answer the substring lookups below without a LIKE '%term%'
+# table scan; only the matching rows are then fetched by primary key
+product_index = None
+supplier_index = None
+if config.NAME_INDEX_ENABLED:
+    product_index = TableNameIndex(
+        Product.ProductId, [Product.Name, Product.Category],
+        func.coalesce(Product.UpdatedAt, Product.CreatedAt),
+        refresh_interval=config.NAME_INDEX_REFRESH_SECONDS
+    )
+    supplier_index = TableNameIndex(
+        Supplier.SupplierId, [Supplier.Name],
+        func.coalesce(Supplier.UpdatedAt, Supplier.CreatedAt),
+        refresh_interval=config.NAME_INDEX_REFRESH_SECONDS
+    )
+
+    def refresh_name_indexes(name: Optional[str]):
+        if name in (None, "suppliers"):
+            supplier_index.mark_stale()
+        if name is None:
+            product_index.mark_stale()
+
+    reference_cache.on_invalidate(refresh_name_indexes)
+
+def get_by_ids(db: Session, pk_column, ids: List[int]):
+    # Chunked to stay under SQL Server's 2100 parameter limit
+    model = pk_column.class_
+    rows = []
+    for start in range(0, len(ids), 1000):
+        rows.extend(db.query(model).filter(pk_column.in_(ids[start:start + 1000])).order_by(pk_column).all())
+    return rows
+
+def indexed_matches(db: Session, index, name: str) -> Optional[List[int]]:
+    """Keys the name index matches, or None when they are so large a share of the
+    table that a LIKE scan beats fetching them by id"""
+    ids = index.search(db, name)
+    if len(ids) > config.NAME_INDEX_MAX_MATCH_RATIO * len(index.index):
+        return None
+    return ids
 
 def get_product_by_name(db: Session, name: str):
-    # Improved search with OR condition and fuzzy matching
+    # Substring match on name or category, in key order whichever way it's found
+    if product_index is not None:
+        ids = indexed_matches(db, product_index, name)
+        if ids is not None:
+            return get_by_ids(db, Product.ProductId, ids)
     search_term = f"%{name}%"
     return db.query(Product).filter(
         or_(
             Product.Name.like(search_term),
             Product.Category.like(search_term)
         )
-    ).all()
+    ).order_by(Product.ProductId).all()
 
 def get_supplier_by_name(db: Session, name: str):
-    # Fuzzy search for supplier by name
+    # Substring match on supplier name, in key order whichever way it's found
+    if supplier_index is not None:
+        ids = indexed_matches(db, supplier_index, name)
+        if ids is not None:
+            return get_by_ids(db, Supplier.SupplierId, ids)
     search_term = f"%{name}%"
-    return db.query(Supplier).filter(Supplier.Name.like(search_term)).all()
+    return db.query(Supplier).filter(Supplier.Name.like(search_term)).order_by(Supplier.SupplierId).all()
+
+def best_match(db: Session, index, pk_column, name_column, name: str):
+    """(row, score) for the row whose name best matches name, typos allowed, or (None, 0.0)"""
+    if index is not None:
+        ranked = index.best_matches(db, name, limit=1, min_score=config.FUZZY_MATCH_MIN_SCORE)
+        if not ranked:
+            return None, 0.0
+        pk, score = ranked[0]
+        return db.get(pk_column.class_, pk), score
+    # Without the index only substring matches are found; rank those by name
+    rows = db.query(pk_column.class_).filter(name_column.like(f"%{name}%")).all()
+    ranked = rank_names(name, [(i, getattr(row, name_column.key)) for i, row in enumerate(rows)],
+                        limit=1, min_score=config.FUZZY_MATCH_MIN_SCORE)
+    return (rows[ranked[0][0]], ranked[0][1]) if ranked else (None, 0.0)
+
+def match_product(db: Session, product_name: str):
+    return best_match(db, product_index, Product.ProductId, Product.Name, product_name)
+
+def match_supplier(db: Session, supplier_name: str):
+    return best_match(db, supplier_index, Supplier.SupplierId, Supplier.Name, supplier_name)
 
 def find_specific_product_attribute(db: Session, product_name: str, attribute: str):
-    """Find a specific attribute of a product by name"""
-    products = get_product_by_name(db, product_name)
-    if not products:
+    """Find a specific attribute of the product whose name best matches product_name"""
+    product, _ = match_product(db, product_name)
+    if product is None:
         return None
 
-    # Return the requested attribute for the first matching product
-    product = products[0]
     if attribute == "price":
         return product.Price
     elif attribute == "stock":
@@ -338,13 +757,11 @@ def find_specific_product_attribute(db: Session, product_name: str, attribute: s
         return None
 
 def find_specific_supplier_attribute(db: Session, supplier_name: str, attribute: str):
-    """Find a specific attribute of a supplier by name"""
-    suppliers = get_supplier_by_name(db, supplier_name)
-    if not suppliers:
+    """Find a specific attribute of the supplier whose name best matches supplier_name"""
+    supplier, _ = match_supplier(db, supplier_name)
+    if supplier is None:
         return None
 
-    # Return the requested attribute for the first matching supplier
-    supplier = suppliers[0]
     if attribute == "email":
         return supplier.Email
     elif attribute == "phone":
@@ -354,12 +771,110 @@ def find_specific_supplier_attribute(db: Session, supplier_name: str, attribute:
     else:
         return None
 
-# Enhanced response generation function
-def generate_response(message: str, db: Session) -> str:
-    # Extract entities and determine intent
-    entities = extract_entities(message)
-    intent = classify_intent(message)
+# Entities each intent's reply depends on. The reply for these intents is a function
+# of the intent and these entities alone (never the raw message text). Paged lists
+# (PAGED_INTENTS) are left out: their reply also depends on the conversation's last page.
+INTENT_ENTITY_KEYS = {
+    "product_categories": (),
+    "out_of_stock": (),
+    "inventory_management": ("stock_below", "limit"),
+    "product_count": (),
+    "brands": (),
+    "user_permissions": (),
+    "suppliers": (),
+    "database_info": (),
+    "help": (),
+}
+
+response_cache = TTLCache(maxsize=config.RESPONSE_CACHE_SIZE, ttl=config.RESPONSE_CACHE_TTL)
+response_cache_intents = (
+    {intent for intent in config.RESPONSE_CACHE_INTENTS if intent in INTENT_ENTITY_KEYS}
+    if config.RESPONSE_CACHE_TTL > 0 else set()
+)
+# Cached replies go stale with the reference data they were built from
+reference_cache.on_invalidate(lambda name: response_cache.invalidate())
+
+# Paged list replies: where each conversation's last page ended, by listing
+PAGED_INTENTS = {"list_products", "list_users"}
+list_pages = TTLCache(maxsize=config.LIST_PAGE_SESSIONS, ttl=config.LIST_PAGE_TTL)
+
+def list_page(db: Session, fetch, listing: str, entities: Dict[str, Any], session_id: Optional[str]):
+    """(rows, more, continued): one page from fetch(db, limit, after_id), whose rows start
+    with their id. "next" continues after the last row this conversation was shown."""
+    size = min(entities.get("quantity") or entities.get("limit") or config.LIST_PAGE_SIZE, config.LIST_PAGE_MAX)
+    after_id = None
+    if entities.get("page") == "next" and session_id is not None:
+        after_id = list_pages.get((session_id, listing))
+    # One extra row tells us whether there is another page
+    rows = fetch(db, size + 1, after_id)
+    shown = rows[:size]
+    if session_id is not None and shown:
+        list_pages.set((session_id, listing), shown[-1][0])
+    return shown, len(rows) > size, after_id is not None
+
+def response_cache_key(analysis: MessageAnalysis) -> Optional[tuple]:
+    """(intent, normalized entities) for cacheable intents, otherwise None"""
+    if analysis.intent not in response_cache_intents:
+        return None
+    entities = tuple(
+        (key, str(analysis.extracted[key]).strip().lower())
+        for key in INTENT_ENTITY_KEYS[analysis.intent] if key in analysis.extracted
+    )
+    return analysis.intent, entities
 
+# Enhanced response generation function
+def generate_response(message: str, db: Session, analysis: Optional[MessageAnalysis] = None,
+                      session_id: Optional[str] = None) -> str:
+    # Extract entities and determine intent (parsing only if the caller hasn't already)
+    if analysis is None:
+        analysis = analyze_message(message)
+    return generate_responses([message], db, [analysis], session_id)[0]
+
+def generate_responses(messages: List[str], db: Session, analyses: Optional[List[MessageAnalysis]] = None,
+                       session_id: Optional[str] = None) -> List[str]:
+    """Replies to many messages of one conversation, in order. Messages with the same intent
+    and entities share one set of lookups; only the default reply depends on the message text."""
+    if analyses is None:
+        analyses = analyze_messages(messages)
+
+    answers: Dict[tuple, Optional[str]] = {}
+    responses = []
+    for message, analysis in zip(messages, analyses):
+        messages_answered.inc(analysis.intent)
+        # Repeated common questions skip the query and formatting work entirely
+        cache_key = response_cache_key(analysis)
+        if cache_key is not None:
+            found, response = response_cache.lookup(cache_key)
+            if found:
+                responses.append(response)
+                continue
+
+        answer_key = (analysis.intent, tuple(sorted(analysis.extracted.items())))
+        if analysis.intent in PAGED_INTENTS or analysis.intent == "stock_alerts":
+            # Every list reply moves the conversation's page position (a first page resets
+            # it, "next" advances it), and alert replies read or add the session's alerts,
+            # so a reused answer would leave that state behind
+            answer_key += (len(responses),)
+        if answer_key not in answers:
+            start = time.perf_counter()
+            answers[answer_key] = answer_intent(db, analysis.intent, analysis.extracted, session_id)
+            answer_seconds.observe(time.perf_counter() - start, analysis.intent)
+        answer = answers[answer_key]
+        response = answer if answer is not None else default_response(message)
+        if cache_key is not None:
+            response_cache.set(cache_key, response)
+        responses.append(response)
+    return responses
+
+def respond_to_intent(message: str, db: Session, intent: str, entities: Dict[str, Any],
+                      session_id: Optional[str] = None) -> str:
+    answer = answer_intent(db, intent, entities, session_id)
+    return answer if answer is not None else default_response(message)
+
+def answer_intent(db: Session, intent: str, entities: Dict[str, Any],
+                  session_id: Optional[str] = None) -> Optional[str]:
+    """The reply for a recognised intent or entity, or None to fall back to default_response.
+    session_id is the conversation asking; only stock alerts depend on it."""
     # Handle specific supplier contact information requests
     if intent == "supplier_contact" and "supplier_name" in entities:
         supplier_name = entities["supplier_name"]
@@ -383,13 +898,78 @@ def generate_response(message: str, db: Session) -> str:
         else:
             return f"Sorry, I couldn't find the {field} for product '{product_name}'. Please check the name and try again."
 
+    # Price-ordered lookups; "top 5" / "5 cheapest" sets how many to show
+    if intent in ("cheapest_products", "most_expensive_products", "price_range"):
+        limit = min(entities.get("limit") or entities.get("quantity") or 10, config.PRICE_QUERY_MAX_RESULTS)
+        min_price, max_price = entities.get("price_min"), entities.get("price_max")
+        if intent == "price_range":
+            if min_price is None and max_price is None:
+                return "Tell me a price range, for example 'products between $50 and $200' or 'under $100'."
+            if min_price is not None and max_price is not None:
+                label = f"between ${min_price} and ${max_price}"
+            else:
+                label = f"over ${min_price}" if min_price is not None else f"under ${max_price}"
+        else:
+            label = "cheapest" if intent == "cheapest_products" else "most expensive"
+        descending = intent == "most_expensive_products" or entities.get("price_order") == "desc"
+        # One extra row tells us whether the list was cut short
+        products = get_products_by_price(
+            db, descending=descending, min_price=min_price, max_price=max_price, limit=limit + 1
+        )
+        if not products:
+            return f"No products found priced {label}." if intent == "price_range" else "No products found in the database."
+        shown = products[:limit]
+        product_list = "\n".join([f"- {product.Name}: ${product.Price}, Stock: {product.Stock}" for product in shown])
+        if intent == "price_range":
+            more = ""
+            if len(products) > limit:
+                more = f"\n(showing the {limit} {'highest' if descending else 'lowest'}-priced)"
+            return f"Products priced {label}:\n{product_list}{more}"
+        return f"The {len(shown)} {label} products:\n{product_list}"
+
+    # Low-stock report, lowest first; "below 20 units" overrides LOW_STOCK_THRESHOLD
+    if intent == "inventory_management":
+        threshold = entities["stock_below"] - 1 if "stock_below" in entities else config.LOW_STOCK_THRESHOLD
+        limit = min(entities.get("limit") or config.LOW_STOCK_MAX_RESULTS, config.LOW_STOCK_MAX_RESULTS)
+        products = get_low_stock_products(db, threshold, limit + 1)
+        if not products:
+            return f"No products are low on stock (all have more than {threshold} units)."
+        product_list = "\n".join([
+            f"- {product.Name}: {'out of stock' if product.Stock <= 0 else f'{product.Stock} left'}"
+            for product in products[:limit]
+        ])
+        more = f"\n(showing the {limit} lowest)" if len(products) > limit else ""
+        return f"Products with {threshold} or fewer units in stock:\n{product_list}{more}"
+
+    # Back-in-stock alerts are per conversation; the stock alert job posts the notice there
+    if intent == "stock_alerts":
+        if session_id is None:
+            return "Stock alerts need a conversation to notify; please send your message again."
+        if "product_name" not in entities:
+            pending = get_pending_stock_alerts(db, session_id)
+            if pending:
+                alert_list = "\n".join([f"- {alert.Name}" for alert in pending])
+                return f"I'll let you know here when these are back in stock:\n{alert_list}"
+            return "You have no stock alerts. Try 'notify me when [Product Name] is back in stock'."
+        product_name = entities["product_name"]
+        product, score = match_product(db, product_name)
+        if product is None:
+            return f"Sorry, I couldn't find product '{product_name}'. Please check the name and try again."
+        if product.Stock > 0:
+            return f"{product.Name} is in stock right now ({product.Stock} available)."
+        if subscribe_to_stock_alert(db, session_id, product.ProductId):
+            return f"OK, I'll let you know here when {product.Name} is back in stock."
+        return f"You already have an alert for {product.Name}; I'll let you know when it's back in stock."
+
     # Handle different intents
     if intent == "list_products":
-        products = get_products(db)
+        products, more, continued = list_page(db, get_products, "products", entities, session_id)
         if products:
             product_list = "\n".join([f"- {product.Name}: ${product.Price}, Stock: {product.Stock}" for product in products])
-            return f"Here are the products in our database:\n{product_list}"
-        return "No products found in the database."
+            heading = f"Here are the next {len(products)} products:" if continued else "Here are the products in our database:"
+            more = f"\n(say 'next {len(products)} products' for more)" if more and session_id is not None else ""
+            return f"{heading}\n{product_list}{more}"
+        return "No more products." if continued else "No products found in the database."
 
     elif intent == "product_categories":
         categories = get_categories(db)
@@ -399,16 +979,17 @@ def generate_response(message: str, db: Session) -> str:
         return "No product categories found in the database."
 
     elif intent == "out_of_stock":
-        out_of_stock = get_out_of_stock_products(db)
-        if out_of_stock:
-            product_list = "\n".join([f"- {product.Name}" for product in out_of_stock])
+        product_list = "\n".join([f"- {product.Name}" for product in get_out_of_stock_products(db)])
+        if product_list:
             return f"Out of stock products:\n{product_list}"
         return "All products are currently in stock."
 
     elif intent == "product_count":
-        count = get_products_count(db)
-        in_stock = get_products_in_stock_count(db)
-        return f"There are {count} products in total, with {in_stock} currently in stock."
+        stats = get_stats_snapshot(db)
+        return (
+            f"There are {stats.products} products in total, with {stats.products_in_stock} currently in stock "
+            f"(counted {stats.freshness()})."
+        )
 
     elif intent == "brands":
         brands = get_brands(db)
@@ -418,11 +999,13 @@ def generate_response(message: str, db: Session) -> str:
         return "No brands found in the database."
 
     elif intent == "list_users":
-        users = get_users(db)
+        users, more, continued = list_page(db, get_users, "users", entities, session_id)
         if users:
             user_list = "\n".join([f"- {user.Username} ({user.FirstName} {user.LastName}, {user.Email})" for user in users])
-            return f"Here are the users in our system:\n{user_list}"
-        return "No users found in the database."
+            heading = f"Here are the next {len(users)} users:" if continued else "Here are the users in our system:"
+            more = f"\n(say 'next {len(users)} users' for more)" if more and session_id is not None else ""
+            return f"{heading}\n{user_list}{more}"
+        return "No more users." if continued else "No users found in the database."
 
     elif intent == "user_permissions":
         permissions = get_user_permissions(db)
@@ -454,19 +1037,14 @@ def generate_response(message: str, db: Session) -> str:
         return f"No products found matching '{product_name}'."
 
     elif intent == "database_info":
-        product_count = get_products_count(db)
-        category_count = db.query(func.count(Category.CategoryId)).scalar()
-        brand_count = db.query(func.count(Brand.BrandId)).scalar()
-        user_count = db.query(func.count(User.UserId)).scalar()
-        supplier_count = db.query(func.count(Supplier.SupplierId)).scalar()
-        
+        stats = get_stats_snapshot(db)
         return (
-            f"Database overview:\n"
-            f"- {product_count} products\n"
-            f"- {category_count} product categories\n"
-            f"- {brand_count} brands\n"
-            f"- {user_count} users\n"
-            f"- {supplier_count} suppliers"
+            f"Database overview (counted {stats.freshness()}):\n"
+            f"- {stats.products} products\n"
+            f"- {stats.categories} product categories\n"
+            f"- {stats.brands} brands\n"
+            f"- {stats.users} users\n"
+            f"- {stats.suppliers} suppliers"
         )
 
     elif intent == "help":
@@ -477,6 +1055,8 @@ def generate_response(message: str, db: Session) -> str:
             "- Show brands\n"
             "- List all users\n"
             "- Show out of stock products\n"
+            "- Show low stock products\n"
+            "- Notify me when [Product Name] is back in stock\n"
             "- How many products do we have?\n"
             "- Show user permissions\n"
             "- Show suppliers\n"
@@ -507,56 +1087,217 @@ def generate_response(message: str, db: Session) -> str:
             return f"Found supplier information for '{supplier_name}':\n{supplier_list}"
         return f"No suppliers found matching '{supplier_name}'."
 
-    # Default response
+    return None
+
+def default_response(message: str) -> str:
     return (
         f"I received your message: '{message}'. I can provide information about products, "
         f"categories, brands, users, and suppliers in our database. Type 'help' to see what I can do."
     )
 
-# Endpoints
-@app.post("/chatbot", response_model=ChatbotResponse)
-async def chatbot(data: MessageRequest, db: Session = Depends(get_db)):
-    try:
-        user_message = data.message.strip()
+# Blocking request handlers, run on the executor by the endpoints below
+def new_session_id() -> str:
+    return uuid.uuid4().hex
 
-        if not user_message:
-            raise HTTPException(status_code=400, detail="No message provided")
-        
-        # Save user message to database
-        user_msg_db = MessageDB(content=user_message, is_user=1)
-        db.add(user_msg_db)
-        db.commit()
-        db.refresh(user_msg_db)
-        
-        # Process the message with spaCy
-        doc = nlp(user_message)
-        entities = [{"label": ent.label_, "text": ent.text} for ent in doc.ents]
-        
-        # Generate bot response
-        bot_response = generate_response(user_message, db)
-        
-        # Save bot response to database
-        bot_msg_db = MessageDB(content=bot_response, is_user=0)
-        db.add(bot_msg_db)
-        db.commit()
-        db.refresh(bot_msg_db)
-        
-        # Update suggestion usage if the message matches any suggestion
-        suggestion = db.query(SuggestionDB).filter(SuggestionDB.content == user_message).first()
-        if suggestion:
-            suggestion.usage_count += 1
-            db.commit()
-        
-        return ChatbotResponse(
-            message=bot_response,
-            entities=entities,
-            message_id=bot_msg_db.id
+def process_chatbot_message(user_message: str, db: Session, session_id: Optional[str] = None) -> ChatbotResponse:
+    # Stamp the user message on arrival so it still sorts before the bot reply
+    received_at = datetime.datetime.utcnow()
+
+    # Process the message with spaCy (once for the whole request)
+    analysis = analyze_message(user_message)
+    entities = analysis.entities
+
+    # Generate bot response
+    session_id = session_id or new_session_id()
+    with stage_timer("query"):
+        bot_response = generate_response(user_message, db, analysis, session_id)
+
+    with stage_timer("persist"):
+        if message_writer is not None:
+            # Before queueing: allocating message ids writes on another connection
+            commit_request_writes(db)
+            message_id = queue_conversation_turn(user_message, bot_response, received_at, session_id)
+        else:
+            message_id = save_conversation_turn(db, user_message, bot_response, received_at, session_id)
+
+    return ChatbotResponse(
+        message=bot_response,
+        entities=entities,
+        message_id=message_id,
+        session_id=session_id
+    )
+
+def process_chatbot_messages(user_messages: List[str], db: Session,
+                             session_id: Optional[str] = None) -> BatchChatbotResponse:
+    received_at = datetime.datetime.utcnow()
+
+    # The whole batch is one conversation
+    session_id = session_id or new_session_id()
+
+    # Parse everything in one nlp.pipe run, then answer each distinct question once
+    analyses = analyze_messages(user_messages)
+    with stage_timer("query"):
+        bot_responses = generate_responses(user_messages, db, analyses, session_id)
+
+    with stage_timer("persist"):
+        if message_writer is not None:
+            commit_request_writes(db)
+            # Replies share the batch's timestamp too, so the id order interleaves the turns
+            bot_message_ids = [
+                queue_conversation_turn(user_message, bot_response, received_at, session_id, answered_at=received_at)
+                for user_message, bot_response in zip(user_messages, bot_responses)
+            ]
+        else:
+            bot_message_ids = save_conversation_turns(db, [
+                (user_message, bot_response, received_at, session_id)
+                for user_message, bot_response in zip(user_messages, bot_responses)
+            ])
+
+    return BatchChatbotResponse(responses=[
+        ChatbotResponse(message=bot_response, entities=analysis.entities, message_id=message_id, session_id=session_id)
+        for bot_response, analysis, message_id in zip(bot_responses, analyses, bot_message_ids)
+    ])
+
+def save_conversation_turn(db: Session, user_message: str, bot_response: str, received_at: datetime.datetime,
+                           session_id: Optional[str] = None) -> int:
+    """Save both messages and count suggestion usage in one transaction; returns the bot message id"""
+    user_msg_db = MessageDB(content=user_message, is_user=1, timestamp=received_at, session_id=session_id)
+    bot_msg_db = MessageDB(content=bot_response, is_user=0, session_id=session_id)
+    db.add_all([user_msg_db, bot_msg_db])
+    # Flushing assigns the ids; reading one after commit would trigger a refresh SELECT
+    db.flush()
+    message_id = bot_msg_db.id
+
+    count_suggestion_usage(db, [user_message])
+    db.commit()
+    return message_id
+
+def save_conversation_turns(db: Session, turns: List[tuple]) -> List[int]:
+    """save_conversation_turn for many (user_message, bot_response, received_at, session_id)
+    turns in one transaction; returns the bot message ids in order"""
+    bot_msgs_db = []
+    for user_message, bot_response, received_at, session_id in turns:
+        # Every message of the batch shares one timestamp, so history ordered by
+        # (timestamp, id) keeps each question next to its answer
+        bot_msg_db = MessageDB(content=bot_response, is_user=0, timestamp=received_at, session_id=session_id)
+        db.add_all([
+            MessageDB(content=user_message, is_user=1, timestamp=received_at, session_id=session_id),
+            bot_msg_db
+        ])
+        bot_msgs_db.append(bot_msg_db)
+    db.flush()
+    bot_message_ids = [bot_msg_db.id for bot_msg_db in bot_msgs_db]
+    count_suggestion_usage(db, [turn[0] for turn in turns])
+    db.commit()
+    return bot_message_ids
+
+# Suggestion usage (SUGGESTION_FLUSH_INTERVAL > 0) is counted in memory, where
+# /suggestions reads the ranking from, and written to the table in batches
+def load_suggestion_counts() -> List[tuple]:
+    with engine.connect() as conn:
+        return conn.execute(select(SuggestionDB.id, SuggestionDB.content, SuggestionDB.usage_count)).all()
+
+def write_suggestion_counts(deltas: Dict[int, int]):
+    """Add {suggestion id: uses} to usage_count, one executemany"""
+    with engine.begin() as conn:
+        conn.execute(
+            update(SuggestionDB.__table__)
+            .where(SuggestionDB.id == bindparam("b_id"))
+            .values(usage_count=SuggestionDB.usage_count + bindparam("b_uses")),
+            [{"b_id": suggestion_id, "b_uses": uses} for suggestion_id, uses in deltas.items()]
         )
-    except Exception as ex:
-        raise HTTPException(status_code=500, detail=f"Error: {str(ex)}")
 
-@app.get("/suggestions", response_model=SuggestionsResponse)
-async def suggestions(db: Session = Depends(get_db)):
+suggestion_counter = None
+if config.SUGGESTION_FLUSH_INTERVAL > 0:
+    suggestion_counter = SuggestionCounter(
+        load_suggestion_counts, write_suggestion_counts,
+        flush_interval=config.SUGGESTION_FLUSH_INTERVAL,
+        max_pending=config.SUGGESTION_FLUSH_MAX_PENDING
+    )
+
+def count_suggestion_usage(db: Session, user_messages: List[str]):
+    """Bump usage_count of the suggestions matching these messages, in memory or with one executemany"""
+    if suggestion_counter is not None:
+        suggestion_counter.record(user_messages)
+        return
+    usage = Counter(user_messages)
+    db.execute(
+        update(SuggestionDB.__table__)
+        .where(SuggestionDB.content == bindparam("b_content"))
+        .values(usage_count=SuggestionDB.usage_count + bindparam("b_count")),
+        [{"b_content": content, "b_count": count} for content, count in usage.items()]
+    )
+
+# Write-behind persistence (MESSAGE_WRITE_BEHIND): turns are queued with preallocated
+# ids and bulk-inserted by a background thread
+def flush_conversation_turns(turns: List[Dict[str, Any]]):
+    """Bulk insert the queued messages in one transaction, which also counts their
+    suggestion uses unless suggestion_counter keeps them in memory"""
+    db = SessionLocal()
+    try:
+        db.execute(insert(MessageDB.__table__), [row for turn in turns for row in turn["messages"]])
+        if suggestion_counter is None:
+            count_suggestion_usage(db, [turn["user_message"] for turn in turns])
+        db.commit()
+    finally:
+        db.close()
+
+def seed_message_ids(db: Session) -> int:
+    """First id the allocator may hand out: above every id in messages and in
+    messages_archive, where archiving moves the newest ids of idle sessions"""
+    live = db.query(func.max(MessageDB.id)).scalar() or 0
+    archived = db.query(func.max(MessageArchiveDB.id)).scalar() or 0
+    return max(live, archived) + 1
+
+message_writer = None
+message_ids = None
+if config.MESSAGE_WRITE_BEHIND:
+    message_writer = WriteBehindQueue(
+        flush_conversation_turns,
+        max_size=config.WRITE_BEHIND_QUEUE_SIZE,
+        batch_size=config.WRITE_BEHIND_BATCH_SIZE,
+        flush_interval=config.WRITE_BEHIND_FLUSH_INTERVAL,
+        put_timeout=config.WRITE_BEHIND_PUT_TIMEOUT
+    )
+    message_ids = IdBlockAllocator(
+        SessionLocal, IdBlockDB, MessageDB.__tablename__,
+        seed=seed_message_ids,
+        block_size=config.MESSAGE_ID_BLOCK_SIZE
+    )
+
+def queue_conversation_turn(user_message: str, bot_response: str, received_at: datetime.datetime,
+                            session_id: Optional[str] = None, answered_at: Optional[datetime.datetime] = None) -> int:
+    """Queue both messages for the background writer; returns the bot message's preallocated id.
+    The reply is stamped answered_at (default now)."""
+    user_id, bot_id = message_ids.allocate(2)
+    turn = {
+        "user_message": user_message,
+        "messages": [
+            {"id": user_id, "content": user_message, "is_user": 1, "timestamp": received_at,
+             "session_id": session_id},
+            {"id": bot_id, "content": bot_response, "is_user": 0,
+             "timestamp": answered_at or datetime.datetime.utcnow(), "session_id": session_id},
+        ],
+    }
+    if suggestion_counter is not None:
+        # Counted now rather than when the batch is written, so /suggestions is current
+        suggestion_counter.record([user_message])
+    try:
+        message_writer.put(turn)
+    except queue.Full:
+        # Backpressure: the writer is behind, so this request pays for its own write
+        flush_conversation_turns([turn])
+    return bot_id
+
+def load_suggestions(db: Session) -> SuggestionsResponse:
+    if suggestion_counter is not None:
+        top = suggestion_counter.top(6)
+        if not top:
+            initialize_suggestions()
+            suggestion_counter.reload()
+            top = suggestion_counter.top(6)
+        return SuggestionsResponse(suggestions=top)
+
     # Get top suggestions by usage count
     db_suggestions = db.query(SuggestionDB).order_by(SuggestionDB.usage_count.desc()).limit(6).all()
 
@@ -568,35 +1309,387 @@ async def suggestions(db: Session = Depends(get_db)):
         suggestions=[suggestion.content for suggestion in db_suggestions]
     )
 
-@app.get("/history", response_model=MessageHistoryResponse)
-async def message_history(limit: int = 50, db: Session = Depends(get_db)):
-    messages = db.query(MessageDB).order_by(MessageDB.timestamp.desc()).limit(limit).all()
+# History is paged newest first with a keyset cursor on (timestamp, id): each page
+# seeks straight to where the previous one ended instead of counting past an offset
+def encode_history_cursor(timestamp: datetime.datetime, message_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{timestamp.isoformat()}|{message_id}".encode()).decode()
+
+def decode_history_cursor(cursor: str):
+    """(timestamp, id) from a cursor; raises ValueError if it is malformed"""
+    try:
+        timestamp, message_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.datetime.fromisoformat(timestamp), int(message_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as ex:
+        raise ValueError(f"Invalid cursor: {cursor}") from ex
+
+def history_query(before: Optional[tuple] = None, session_id: Optional[str] = None):
+    query = (
+        select(MessageDB.id, MessageDB.content, MessageDB.is_user, MessageDB.timestamp, MessageDB.session_id)
+        .order_by(MessageDB.timestamp.desc(), MessageDB.id.desc())
+    )
+    if session_id is not None:
+        query = query.where(MessageDB.session_id == session_id)
+    if before is not None:
+        timestamp, message_id = before
+        # Spelled out because SQL Server has no row-value (a, b) < (x, y) comparison
+        query = query.where(or_(
+            MessageDB.timestamp < timestamp,
+            and_(MessageDB.timestamp == timestamp, MessageDB.id < message_id)
+        ))
+    return query
+
+def load_message_history(db: Session, limit: int, before: Optional[tuple] = None,
+                         session_id: Optional[str] = None) -> MessageHistoryResponse:
+    # One extra row tells us whether there is another page
+    rows = db.execute(history_query(before, session_id).limit(limit + 1)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_history_cursor(rows[-1].timestamp, rows[-1].id)
 
     return MessageHistoryResponse(
         messages=[Message(
-            id=msg.id,
-            content=msg.content,
-            is_user=bool(msg.is_user),
-            timestamp=msg.timestamp
-        ) for msg in messages]
+            id=row.id,
+            content=row.content,
+            is_user=bool(row.is_user),
+            timestamp=row.timestamp,
+            session_id=row.session_id
+        ) for row in rows],
+        next_cursor=next_cursor
     )
 
-@app.post("/add-suggestion")
-async def add_suggestion(data: MessageRequest, db: Session = Depends(get_db)):
-    new_suggestion = data.message.strip()
+def stream_message_history(before: Optional[tuple] = None, session_id: Optional[str] = None):
+    """Yield the history as NDJSON, newest first, holding only one chunk of rows at a time.
+
+    Uses its own session because the response body is produced after the
+    endpoint (and its request-scoped session) has returned.
+    """
+    db = SessionLocal()
+    try:
+        query = history_query(before, session_id)
+        result = db.execute(query.execution_options(yield_per=config.HISTORY_EXPORT_CHUNK_SIZE))
+        for rows in result.partitions():
+            yield "".join(
+                json.dumps({
+                    "id": row.id,
+                    "content": row.content,
+                    "is_user": bool(row.is_user),
+                    "timestamp": row.timestamp.isoformat() if row.timestamp else None,
+                    "session_id": row.session_id,
+                }) + "\n"
+                for row in rows
+            ).encode()
+    finally:
+        db.close()
+
+def archive_idle_sessions(older_than_days: float) -> Dict[str, int]:
+    """Move conversations idle for more than older_than_days to messages_archive"""
+    cutoff = datetime.datetime.utcnow() - datetime.timedelta(days=older_than_days)
+    return archive_messages(
+        engine, MessageDB.__table__, MessageArchiveDB.__table__, cutoff,
+        batch_size=config.MESSAGE_ARCHIVE_BATCH_SIZE
+    )
+
+retention_job = None
+if config.MESSAGE_RETENTION_DAYS > 0:
+    retention_job = PeriodicJob(
+        functools.partial(archive_idle_sessions, config.MESSAGE_RETENTION_DAYS),
+        config.MESSAGE_RETENTION_INTERVAL, name="message-retention"
+    )
+
+def check_stock_alerts() -> Dict[str, int]:
+    """Notify sessions whose awaited products are back in stock"""
+    return notify_restocked(
+        engine, StockAlertDB.__table__, Product.__table__, MessageDB.__table__,
+        batch_size=config.STOCK_ALERT_BATCH_SIZE,
+        allocate_ids=message_ids.allocate if message_ids is not None else None
+    )
+
+stock_alert_job = None
+if config.STOCK_ALERT_INTERVAL > 0:
+    stock_alert_job = PeriodicJob(check_stock_alerts, config.STOCK_ALERT_INTERVAL, name="stock-alerts")
+
+def save_suggestion(db: Session, new_suggestion: str) -> Dict[str, str]:
     existing = db.query(SuggestionDB).filter(SuggestionDB.content == new_suggestion).first()
     if existing:
         return {"status": "exists", "message": "Suggestion already exists"}
 
-    db.add(SuggestionDB(content=new_suggestion))
+    suggestion = SuggestionDB(content=new_suggestion, usage_count=0)
+    db.add(suggestion)
+    db.flush()
+    suggestion_id = suggestion.id
     db.commit()
+    if suggestion_counter is not None:
+        suggestion_counter.add(suggestion_id, new_suggestion)
+    if autocomplete_index is not None:
+        autocomplete_index.add(new_suggestion, suggestion_weight(0))
 
     return {"status": "success", "message": "Suggestion added successfully"}
 
+# Type-ahead over suggestions and catalog names. The index is rebuilt from the
+# database every AUTOCOMPLETE_REFRESH_SECONDS; new suggestions are added to it directly.
+def suggestion_weight(usage_count: Optional[int]) -> float:
+    # Any suggestion ranks above a plain product or supplier name with the same prefix
+    return (usage_count or 0) + 1
+
+def load_autocomplete_entries() -> List[tuple]:
+    """(text, weight) of every suggestion (weighted by usage) and product and supplier name"""
+    # The counter's counts include uses not yet written
+    usage = suggestion_counter.usage() if suggestion_counter is not None else None
+    with engine.connect() as conn:
+        if usage is None:
+            usage = conn.execute(select(SuggestionDB.content, SuggestionDB.usage_count)).all()
+        names = conn.execute(select(Product.Name).union(select(Supplier.Name))).scalars().all()
+    return [(content, suggestion_weight(count)) for content, count in usage] + [(name, 0) for name in names]
+
+def refresh_autocomplete() -> Dict[str, int]:
+    autocomplete_index.load(load_autocomplete_entries())
+    return autocomplete_index.stats()
+
+autocomplete_index = None
+autocomplete_job = None
+if config.AUTOCOMPLETE_ENABLED:
+    autocomplete_index = PrefixIndex(pending_limit=config.AUTOCOMPLETE_PENDING_LIMIT)
+    if config.AUTOCOMPLETE_REFRESH_SECONDS > 0:
+        autocomplete_job = PeriodicJob(refresh_autocomplete, config.AUTOCOMPLETE_REFRESH_SECONDS,
+                                       name="autocomplete-refresh")
+
+# Endpoints
+@app.post("/chatbot", response_model=ChatbotResponse)
+async def chatbot(data: MessageRequest, db: Session = Depends(get_db)):
+    try:
+        user_message = data.message.strip()
+
+        if not user_message:
+            raise HTTPException(status_code=400, detail="No message provided")
+
+        return await run_blocking(process_chatbot_message, user_message, db, data.session_id)
+    except Exception as ex:
+        raise HTTPException(status_code=500, detail=f"Error: {str(ex)}")
+
+@app.post("/chatbot/batch", response_model=BatchChatbotResponse)
+async def chatbot_batch(data: BatchMessageRequest, db: Session = Depends(get_db)):
+    """Answer many messages in one request; responses come back in the same order"""
+    user_messages = [message.strip() for message in data.messages]
+    if not user_messages:
+        raise HTTPException(status_code=400, detail="No messages provided")
+    if len(user_messages) > config.CHATBOT_BATCH_MAX_MESSAGES:
+        raise HTTPException(status_code=413, detail=f"At most {config.CHATBOT_BATCH_MAX_MESSAGES} messages per batch")
+    empty = [index for index, message in enumerate(user_messages) if not message]
+    if empty:
+        raise HTTPException(status_code=400, detail=f"Empty message at index {empty[0]}")
+
+    try:
+        return await run_blocking(process_chatbot_messages, user_messages, db, data.session_id)
+    except Exception as ex:
+        raise HTTPException(status_code=500, detail=f"Error: {str(ex)}")
+
+@app.get("/suggestions", response_model=SuggestionsResponse)
+async def suggestions(db: Session = Depends(get_db)):
+    return await run_blocking(load_suggestions, db)
+
+@app.get("/autocomplete", response_model=AutocompleteResponse)
+async def autocomplete(q: str = "", limit: int = 6):
+    """The most used suggestions and catalog names with a word starting with q"""
+    if autocomplete_index is None:
+        raise HTTPException(status_code=404, detail="Autocomplete is disabled")
+    if not autocomplete_index.loaded:
+        await run_blocking(autocomplete_index.ensure_loaded, load_autocomplete_entries)
+    limit = max(1, min(limit, config.AUTOCOMPLETE_MAX_RESULTS))
+    # A lookup takes microseconds, so it runs on the event loop
+    return AutocompleteResponse(query=q, completions=autocomplete_index.complete(q, limit))
+
+def parse_history_cursor(cursor: Optional[str]) -> Optional[tuple]:
+    if cursor is None:
+        return None
+    try:
+        return decode_history_cursor(cursor)
+    except ValueError as ex:
+        raise HTTPException(status_code=400, detail=str(ex))
+
+@app.get("/history", response_model=MessageHistoryResponse)
+async def message_history(limit: int = 50, cursor: Optional[str] = None, db: Session = Depends(get_db)):
+    limit = max(1, min(limit, config.HISTORY_MAX_LIMIT))
+    return await run_blocking(load_message_history, db, limit, parse_history_cursor(cursor))
+
+@app.get("/history/export")
+async def export_message_history(cursor: Optional[str] = None):
+    """The whole history (or everything older than cursor) as newline-delimited JSON"""
+    return StreamingResponse(stream_message_history(parse_history_cursor(cursor)), media_type="application/x-ndjson")
+
+@app.get("/sessions/{session_id}/history", response_model=MessageHistoryResponse)
+async def session_history(session_id: str, limit: int = 50, cursor: Optional[str] = None,
+                          db: Session = Depends(get_db)):
+    """The latest messages of one conversation, newest first, paged like /history"""
+    limit = max(1, min(limit, config.HISTORY_MAX_LIMIT))
+    return await run_blocking(load_message_history, db, limit, parse_history_cursor(cursor), session_id)
+
+@app.get("/sessions/{session_id}/history/export")
+async def export_session_history(session_id: str, cursor: Optional[str] = None):
+    return StreamingResponse(
+        stream_message_history(parse_history_cursor(cursor), session_id), media_type="application/x-ndjson"
+    )
+
+@app.post("/add-suggestion")
+async def add_suggestion(data: MessageRequest, db: Session = Depends(get_db)):
+    return await run_blocking(save_suggestion, db, data.message.strip())
+
+@app.get("/pool-stats")
+async def pool_stats():
+    # Connection pool counters and checkout wait times, for sizing the pool under load
+    return pool_metrics.snapshot()
+
+def all_cache_stats() -> Dict[str, Dict[str, Any]]:
+    return {**reference_cache.stats(), "responses": response_cache.stats()}
+
+@app.get("/cache-stats")
+async def cache_stats():
+    return all_cache_stats()
+
+# Gauges and counters read at scrape time from the stats the caches, pool and writer keep
+def cache_metric(key: str):
+    return lambda: [((name,), stats[key]) for name, stats in all_cache_stats().items()]
+
+metrics.callback("cache_hits_total", "Cache lookups that found a live entry", "counter", ["cache"], cache_metric("hits"))
+metrics.callback("cache_misses_total", "Cache lookups that had to load", "counter", ["cache"], cache_metric("misses"))
+metrics.callback("cache_hit_ratio", "Hits / lookups since startup", "gauge", ["cache"], cache_metric("hit_ratio"))
+metrics.callback("cache_entries", "Entries currently cached", "gauge", ["cache"], cache_metric("size"))
+
+def pool_metric(*path: str):
+    def collect():
+        value = pool_metrics.snapshot()
+        for key in path:
+            if key not in value:
+                return []
+            value = value[key]
+        return [((), value)]
+    return collect
+
+metrics.callback("db_pool_checkouts_total", "Connections handed out by the pool", "counter", [], pool_metric("checkouts"))
+metrics.callback("db_pool_timeouts_total", "Checkouts that timed out waiting", "counter", [], pool_metric("timeouts"))
+metrics.callback("db_pool_checked_out", "Connections currently in use", "gauge", [], pool_metric("pool", "checked_out"))
+metrics.callback("db_pool_wait_seconds_max", "Longest checkout wait since startup", "gauge", [],
+                 pool_metric("wait", "max_seconds"))
+if message_writer is not None:
+    metrics.callback("message_writer_queued", "Conversation turns waiting to be written", "gauge", [],
+                     lambda: [((), message_writer.stats()["queued"])])
+    metrics.callback("message_writer_failed_total", "Messages dropped after write retries", "counter", [],
+                     lambda: [((), message_writer.stats()["failed_items"])])
+if suggestion_counter is not None:
+    metrics.callback("suggestion_uses_pending", "Suggestion uses counted in memory but not yet written", "gauge", [],
+                     lambda: [((), suggestion_counter.stats()["pending_uses"])])
+    metrics.callback("suggestion_flush_failures_total", "Suggestion usage flushes that failed", "counter", [],
+                     lambda: [((), suggestion_counter.stats()["failed_flushes"])])
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    if not config.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/stats")
+async def stats(db: Session = Depends(get_db)):
+    snapshot = await run_blocking(get_stats_snapshot, db)
+    return {**asdict(snapshot), "age_seconds": snapshot.age_seconds()}
+
+@app.post("/invalidate-cache")
+async def invalidate_cache(name: Optional[str] = None):
+    # Call after changing categories, brands, suppliers or permissions (name=None clears all)
+    if name is not None and name not in reference_cache.caches:
+        raise HTTPException(status_code=404, detail=f"Unknown cache '{name}'")
+    reference_cache.invalidate(name)
+    return {"status": "success", "message": f"Invalidated {name or 'all caches'}"}
+
+@app.post("/archive-sessions")
+async def archive_sessions(older_than_days: Optional[float] = None):
+    # Run the retention job now (defaults to MESSAGE_RETENTION_DAYS)
+    older_than_days = older_than_days if older_than_days is not None else config.MESSAGE_RETENTION_DAYS
+    if older_than_days <= 0:
+        raise HTTPException(status_code=400, detail="older_than_days must be positive")
+    return await run_blocking(archive_idle_sessions, older_than_days)
+
+@app.post("/stock-alerts/check")
+async def check_stock_alerts_now():
+    # Run the stock alert check now instead of waiting for the next interval
+    return await run_blocking(check_stock_alerts)
+
 # Initialize app with default data
+def warm_up_name_indexes():
+    db = SessionLocal()
+    try:
+        for index in (product_index, supplier_index):
+            if index is not None:
+                index.ensure_fresh(db)
+    finally:
+        db.close()
+
+def check_app_schema():
+    """Fail the warm-up, and so /ready, when the app's tables don't match the models:
+    a request would fail on them instead"""
+    missing = missing_columns(engine, APP_TABLES)
+    if missing:
+        raise RuntimeError(f"database schema is missing {', '.join(missing)}")
+
+def warm_up_steps() -> List[tuple]:
+    """What the background warm-up does, in order; after a quick schema check spaCy goes first,
+    as every chat request needs it"""
+    steps = [
+        ("schema_check", check_app_schema),
+        ("spacy_load", nlp.load),
+        # The first parse allocates the pipeline's working memory
+        ("spacy_first_parse", lambda: analyze_message("How many products are in stock?")),
+        ("name_indexes", warm_up_name_indexes),
+        ("suggestions", initialize_suggestions),
+    ]
+    if suggestion_counter is not None:
+        steps.append(("suggestion_counts", suggestion_counter.reload))
+    if autocomplete_index is not None:
+        steps.append(("autocomplete", refresh_autocomplete))
+    if config.DB_POOL_WARMUP > 0:
+        steps.append(("db_pool", functools.partial(warm_up_pool, engine, config.DB_POOL_WARMUP)))
+    return steps
+
+@app.get("/ready")
+async def ready():
+    # Readiness probe: 503 until the background warm-up has finished without errors
+    report = startup_report.snapshot()
+    return JSONResponse(report, status_code=200 if report["ready"] else 503)
+
 @app.on_event("startup")
 async def startup_event():
-    initialize_suggestions()
+    if message_writer is not None:
+        message_writer.start()
+    # Slow work runs in the background so the server accepts requests right away;
+    # requests that arrive first load what they need on demand
+    startup_report.warm_up(warm_up_steps())
+    if config.CACHE_REFRESH_INTERVAL > 0:
+        await run_blocking(reference_cache.start_refresher, SessionLocal, config.CACHE_REFRESH_INTERVAL)
+    if retention_job is not None:
+        retention_job.start()
+    if stock_alert_job is not None:
+        stock_alert_job.start()
+    if suggestion_counter is not None:
+        suggestion_counter.start()
+    if autocomplete_job is not None:
+        autocomplete_job.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    reference_cache.stop()
+    if retention_job is not None:
+        retention_job.stop()
+    if stock_alert_job is not None:
+        stock_alert_job.stop()
+    if autocomplete_job is not None:
+        autocomplete_job.stop()
+    if message_writer is not None:
+        # Drain queued messages before the process exits
+        await run_blocking(message_writer.stop)
+    if suggestion_counter is not None:
+        # After the writer, whose last batches may still count suggestion uses
+        await run_blocking(suggestion_counter.stop)
+    if blocking_executor is not None:
+        blocking_executor.shutdown(wait=True)
 
 # Start the server
 if __name__ == "__main__":
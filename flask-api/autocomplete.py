@@ -0,0 +1,206 @@
+# autocomplete.py
+import bisect
+import heapq
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+def normalize(text: Optional[str]) -> str:
+    return " ".join((text or "").lower().split())
+
+
+def prefix_end(prefix: str) -> Optional[str]:
+    """The smallest string greater than every string starting with prefix, or None
+    when there is none (the prefix is all chr(0x10FFFF)) and the range is open-ended"""
+    # The last code point can't be incremented; the bound comes from the characters before it
+    stripped = prefix.rstrip(chr(0x10FFFF))
+    if not stripped:
+        return None
+    return stripped[:-1] + chr(ord(stripped[-1]) + 1)
+
+
+class _PrefixState:
+    """One immutable build of a PrefixIndex; queries read it without locking"""
+
+    __slots__ = ("texts", "normalized", "weights", "keys", "key_entries", "key_weights", "table")
+
+    def __init__(self, entries: Dict[str, Tuple[str, float]]):
+        self.texts: List[str] = []
+        self.normalized: List[str] = []
+        self.weights: List[float] = []
+        keyed: List[Tuple[str, int]] = []
+        for normalized, (text, weight) in entries.items():
+            entry = len(self.texts)
+            self.texts.append(text)
+            self.normalized.append(normalized)
+            self.weights.append(weight)
+            # Every word start is a key, so "xps" completes "Dell XPS 15 laptop"
+            keyed.append((normalized, entry))
+            start = normalized.find(" ")
+            while start != -1:
+                keyed.append((normalized[start + 1:], entry))
+                start = normalized.find(" ", start + 1)
+        keyed.sort()
+        self.keys = [key for key, _ in keyed]
+        self.key_entries = np.fromiter((entry for _, entry in keyed), dtype=np.int32, count=len(keyed))
+        self.key_weights = np.asarray(self.weights, dtype=np.float64)[self.key_entries] if keyed else np.zeros(0)
+
+        # Sparse table: table[j - 1][i] is the position of the heaviest key in
+        # keys[i:i + 2 ** j], the leftmost (alphabetically first) one on ties
+        self.table: List[np.ndarray] = []
+        previous = np.arange(len(keyed), dtype=np.int32)
+        width = 2
+        while width <= len(keyed):
+            half = width // 2
+            left = previous[:len(keyed) - width + 1]
+            right = previous[half:half + len(keyed) - width + 1]
+            previous = np.where(self.key_weights[left] >= self.key_weights[right], left, right).astype(np.int32)
+            self.table.append(previous)
+            width *= 2
+
+    def heaviest(self, lo: int, hi: int) -> int:
+        """Position of the heaviest key in keys[lo:hi] (hi > lo)"""
+        level = (hi - lo).bit_length() - 1
+        if level == 0:
+            return lo
+        first = int(self.table[level - 1][lo])
+        second = int(self.table[level - 1][hi - (1 << level)])
+        return first if self.key_weights[first] >= self.key_weights[second] else second
+
+
+class PrefixIndex:
+    """Top-k completions of a typed prefix, heaviest first.
+
+    Entries are (text, weight) pairs matched case-insensitively at the start
+    of the text or of any word in it. All keys are kept in one sorted list,
+    so a prefix is a contiguous range found with two bisects. A sparse table
+    gives the heaviest key of any range in O(1), and the top k are taken from
+    a heap of ranges: pop the heaviest key, push the ranges on either side of
+    it. A lookup is O(log n + k log k) however many entries share the prefix.
+
+    The sorted build is immutable. `add` puts new entries (or new weights for
+    existing ones) in a small pending map that lookups scan and that takes
+    precedence over the build; once it holds `pending_limit` entries they
+    are merged into a new build on a background thread. `load` replaces
+    everything.
+    """
+
+    def __init__(self, pending_limit: int = 1000):
+        self.pending_limit = pending_limit
+        self.lock = threading.Lock()
+        self.state = _PrefixState({})
+        self.pending: Dict[str, Tuple[str, float, int]] = {}
+        self.sequence = 0
+        self.compacting = False
+        self.loaded = False
+        # Held for a whole first load, so concurrent cold lookups build the index once
+        self.load_lock = threading.Lock()
+
+    def load(self, entries: Iterable[Tuple[str, float]]):
+        """Rebuild from (text, weight) pairs; duplicates keep their highest weight"""
+        with self.lock:
+            started_at = self.sequence
+        self._load(entries, started_at)
+
+    def _load(self, entries: Iterable[Tuple[str, float]], started_at: int):
+        """Build from entries that include every add() up to sequence number started_at"""
+        merged: Dict[str, Tuple[str, float]] = {}
+        for text, weight in entries:
+            normalized = normalize(text)
+            if normalized and (normalized not in merged or weight > merged[normalized][1]):
+                merged[normalized] = (text.strip(), weight)
+        state = _PrefixState(merged)
+        with self.lock:
+            # Entries added while building stay pending; the rest are in the new build
+            self.pending = {key: value for key, value in self.pending.items() if value[2] > started_at}
+            self.state = state
+            self.loaded = True
+
+    def ensure_loaded(self, entries: Callable[[], Iterable[Tuple[str, float]]]) -> bool:
+        """Load from `entries()` unless loaded already; callers racing the first load
+        wait for it instead of building their own. True if this call loaded."""
+        if self.loaded:
+            return False
+        with self.load_lock:
+            if self.loaded:
+                return False
+            self.load(entries())
+            return True
+
+    def add(self, text: str, weight: float = 0.0):
+        """Insert an entry, or change the weight of an existing one"""
+        normalized = normalize(text)
+        if not normalized:
+            return
+        with self.lock:
+            self.sequence += 1
+            pending = dict(self.pending)
+            pending[normalized] = (text.strip(), weight, self.sequence)
+            self.pending = pending
+            start = len(pending) >= self.pending_limit and not self.compacting
+            if start:
+                self.compacting = True
+        if start:
+            threading.Thread(target=self._compact, name="autocomplete-compact", daemon=True).start()
+
+    def _compact(self):
+        try:
+            # Snapshot and sequence number together, so an add() landing in between is
+            # neither missing from the build nor dropped from pending
+            with self.lock:
+                state, pending, started_at = self.state, self.pending, self.sequence
+            entries = {normalized: (text, weight)
+                       for text, normalized, weight in zip(state.texts, state.normalized, state.weights)}
+            entries.update((normalized, (text, weight)) for normalized, (text, weight, _) in pending.items())
+            self._load(entries.values(), started_at)
+        finally:
+            with self.lock:
+                self.compacting = False
+
+    def stats(self) -> Dict[str, int]:
+        state = self.state
+        return {"entries": len(state.texts), "keys": len(state.keys), "pending": len(self.pending)}
+
+    def complete(self, prefix: str, limit: int = 10) -> List[str]:
+        """Texts of the `limit` heaviest entries with a word starting with prefix"""
+        key = normalize(prefix)
+        if not key or limit <= 0:
+            return []
+        state, pending = self.state, self.pending
+        results: List[Tuple[float, str, str]] = []
+        seen = set()
+        keys = state.keys
+        lo = bisect.bisect_left(keys, key)
+        end = prefix_end(key)
+        hi = len(keys) if end is None else bisect.bisect_left(keys, end, lo)
+        heap = []
+        if lo < hi:
+            top = state.heaviest(lo, hi)
+            heap.append((-state.key_weights[top], top, lo, hi))
+        while heap and len(results) < limit:
+            weight, position, lo, hi = heapq.heappop(heap)
+            entry = int(state.key_entries[position])
+            normalized = state.normalized[entry]
+            # Superseded by a pending entry, or already found under another word
+            if entry not in seen and normalized not in pending:
+                seen.add(entry)
+                results.append((weight, keys[position], state.texts[entry]))
+            if lo < position:
+                top = state.heaviest(lo, position)
+                heapq.heappush(heap, (-state.key_weights[top], top, lo, position))
+            if position + 1 < hi:
+                top = state.heaviest(position + 1, hi)
+                heapq.heappush(heap, (-state.key_weights[top], top, position + 1, hi))
+
+        if pending:
+            for normalized, (text, weight, _) in pending.items():
+                if normalized.startswith(key):
+                    results.append((-weight, normalized, text))
+                else:
+                    start = normalized.find(" " + key)
+                    if start != -1:
+                        results.append((-weight, normalized[start + 1:], text))
+            results.sort()
+        return [text for _, _, text in results[:limit]]
@@ -0,0 +1,18 @@
+"""Benchmarks for the chatbot API.
+
+Run them from the flask-api directory, e.g. ``python -m benchmarks.bench_analysis``.
+They point the app at a throwaway SQLite database so no SQL Server is needed.
+
+- ``catalog`` generates the synthetic catalog (products, categories, brands,
+  suppliers, users, permissions) the benchmarks fill their database with;
+  the same --seed always gives the same rows
+- ``bench_helpers`` times extract_entities, classify_intent, every get_*
+  query helper and generate_response per intent
+- ``loadgen`` drives /chatbot, /history and /suggestions with concurrent
+  virtual users and reports p50/p95/p99 latency and throughput
+- the other ``bench_*`` scripts each measure one optimization against the
+  code it replaced
+
+``bench_helpers`` and ``loadgen`` take ``--json FILE`` to save a run and
+``--baseline FILE`` to compare a later run with it.
+"""
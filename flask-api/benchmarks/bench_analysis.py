@@ -0,0 +1,65 @@
+"""Compare spaCy parses and NLP latency per /chatbot request.
+
+The old request path parsed each message twice: once for the response
+entities and once more inside extract_entities. analyze_message parses once
+and shares the Doc with every handler.
+"""
+import argparse
+
+from benchmarks.common import use_sqlite, time_calls, print_summary
+
+use_sqlite()
+import app  # noqa: E402
+
+MESSAGES = [
+    "List all products",
+    "Show product categories",
+    "Give email id of supplier Avantika Patil",
+    "What's the price of Laptop XPS 15?",
+    "Get phone number of supplier Tech Solutions",
+    "I am looking for a wireless mouse",
+    "How many products in stock?",
+    "Tell me about the Dell monitor from Apple",
+]
+
+
+class CountingNlp:
+    """Wraps the spaCy pipeline and counts how often it runs"""
+
+    def __init__(self, nlp):
+        self.nlp = nlp
+        self.calls = 0
+
+    def __call__(self, text):
+        self.calls += 1
+        return self.nlp(text)
+
+
+def legacy_request(message):
+    # What /chatbot did before: parse for entities, then parse again in extract_entities
+    doc = app.nlp(message)
+    [{"label": ent.label_, "text": ent.text} for ent in doc.ents]
+    app.extract_entities(message)
+    app.classify_intent(message)
+
+
+def shared_request(message):
+    app.analyze_message(message)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    counter = CountingNlp(app.nlp)
+    app.nlp = counter
+    for name, func in (("before (parse twice)", legacy_request), ("after (analyze_message)", shared_request)):
+        counter.calls = 0
+        latencies = time_calls(func, MESSAGES, args.repeat)
+        print_summary(name, latencies)
+        print(f"{'':<32} spaCy parses per request: {counter.calls / len(latencies):.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""/autocomplete lookups on a large catalog: PrefixIndex against the database.
+
+Fills a SQLite catalog with --rows products and --suggestions suggestions
+(random usage counts), builds the autocomplete index from it the way the app
+does, and times completions for prefixes of 1 to 8 characters taken from
+real names and words, against the query a type-ahead would otherwise run
+(LIKE 'prefix%' on product names, ordered and limited). A sample of lookups
+is checked against a brute-force scan of every entry. Finally --adds new
+suggestions are added one at a time (by default one short of
+AUTOCOMPLETE_PENDING_LIMIT, so they all stay pending) and lookups are timed
+again.
+"""
+import argparse
+import random
+import time
+
+from benchmarks.common import print_summary, time_calls, use_sqlite
+
+use_sqlite()
+from sqlalchemy import insert, select  # noqa: E402
+
+import app  # noqa: E402
+from autocomplete import normalize  # noqa: E402
+from benchmarks.catalog import fill_products  # noqa: E402
+
+
+def like_prefix(prefix, limit):
+    with app.engine.connect() as conn:
+        return conn.execute(
+            select(app.Product.Name).where(app.Product.Name.like(f"{prefix}%")).order_by(app.Product.Name).limit(limit)
+        ).scalars().all()
+
+
+def brute_force(entries, prefix, limit):
+    key = normalize(prefix)
+    matches = []
+    for text, weight in entries.items():
+        normalized = normalize(text)
+        words = [normalized] + [normalized[i + 1:] for i, char in enumerate(normalized) if char == " "]
+        found = [word for word in words if word.startswith(key)]
+        if found:
+            matches.append((-weight, min(found), text))
+    matches.sort()
+    return [text for _, _, text in matches[:limit]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--suggestions", type=int, default=2_000)
+    parser.add_argument("--queries", type=int, default=5_000)
+    parser.add_argument("--limit", type=int, default=6)
+    parser.add_argument("--adds", type=int, default=app.config.AUTOCOMPLETE_PENDING_LIMIT - 1)
+    args = parser.parse_args()
+
+    rng = random.Random(13)
+    fill_products(args.rows)
+    with app.engine.begin() as conn:
+        conn.execute(insert(app.SuggestionDB.__table__), [
+            {"content": f"Show {rng.choice(['me', 'all', 'the'])} question {i}", "usage_count": rng.randint(0, 500)}
+            for i in range(args.suggestions)
+        ])
+
+    start = time.perf_counter()
+    entries = app.load_autocomplete_entries()
+    loaded = time.perf_counter()
+    app.autocomplete_index.load(entries)
+    built = time.perf_counter()
+    index = app.autocomplete_index
+    state = index.state
+    table_mb = sum(level.nbytes for level in state.table) / 2 ** 20
+    print(f"{index.stats()['entries']:,} entries, {index.stats()['keys']:,} keys (word starts); "
+          f"load {(loaded - start) * 1000:.0f} ms, build {(built - loaded) * 1000:.0f} ms, "
+          f"sparse table {table_mb:.1f} MiB\n")
+
+    texts = [text for text, _ in entries]
+    prefixes = []
+    for _ in range(args.queries):
+        text = normalize(rng.choice(texts))
+        words = text.split()
+        source = text if rng.random() < 0.5 else rng.choice(words)
+        prefixes.append(source[:rng.randint(1, min(8, len(source)))])
+
+    print_summary("PrefixIndex.complete", time_calls(lambda prefix: index.complete(prefix, args.limit), prefixes))
+    short = [prefix for prefix in prefixes if len(prefix) <= 2]
+    print_summary("  1-2 character prefixes", time_calls(lambda prefix: index.complete(prefix, args.limit), short))
+    print_summary("LIKE 'prefix%' query", time_calls(lambda prefix: like_prefix(prefix, args.limit), prefixes[:500]))
+
+    weights = {}
+    for text, weight in entries:
+        weights[text] = max(weight, weights.get(text, weight))
+    sample = prefixes[:30]
+    wrong = [prefix for prefix in sample if index.complete(prefix, args.limit) != brute_force(weights, prefix, args.limit)]
+    print(f"\nbrute-force check: {len(sample) - len(wrong)}/{len(sample)} prefixes agree")
+
+    new = [f"Show me question {i} about {rng.choice(texts)}" for i in range(args.adds)]
+    print_summary(f"add x{args.adds}", time_calls(lambda text: index.add(text, 10), new))
+    print_summary(f"complete, {len(index.pending)} pending", time_calls(lambda prefix: index.complete(prefix, args.limit),
+                                                                        prefixes))
+    print(f"'show me question 1' -> {index.complete('show me question 1', 3)}")
+    return 1 if wrong else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
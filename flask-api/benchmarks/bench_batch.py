@@ -0,0 +1,78 @@
+"""Per-message /chatbot processing vs one /chatbot/batch call.
+
+Runs --messages messages from the intent corpus through the app twice:
+process_chatbot_message once per message (what posting them one at a time
+to /chatbot does, minus HTTP), and process_chatbot_messages once for the
+whole list. Reports the spaCy-only difference (nlp() per message vs
+nlp.pipe) separately, since it depends heavily on the installed model.
+"""
+import argparse
+import os
+import time
+
+from benchmarks.common import use_sqlite
+
+use_sqlite()
+import app  # noqa: E402
+from benchmarks.catalog import fill_products  # noqa: E402
+
+CORPUS = os.path.join(os.path.dirname(__file__), "data", "intent_corpus.tsv")
+
+
+def load_messages(count):
+    with open(CORPUS, encoding="utf-8") as corpus:
+        messages = [line.split("\t")[0] for line in corpus if line.strip() and not line.startswith("#")]
+    return [messages[i % len(messages)] for i in range(count)]
+
+
+def timed(label, count, func, *args):
+    start = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {elapsed:7.2f}s  {count / elapsed:8.0f} msg/s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--products", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=app.config.NLP_BATCH_SIZE)
+    parser.add_argument("--n-process", type=int, default=app.config.NLP_N_PROCESS)
+    args = parser.parse_args()
+
+    app.Base.metadata.create_all(bind=app.engine)
+    fill_products(args.products)
+    messages = load_messages(args.messages)
+    print(f"spaCy pipeline: {app.nlp.meta.get('name')} {app.nlp.pipe_names}")
+
+    timed("nlp() per message", len(messages), lambda: [app.nlp(message) for message in messages])
+    timed(f"nlp.pipe(batch_size={args.batch_size}, n_process={args.n_process})", len(messages),
+          lambda: list(app.nlp.pipe(messages, batch_size=args.batch_size, n_process=args.n_process)))
+
+    # Keep the response cache out of it so both paths do the same lookups
+    app.response_cache_intents.clear()
+    app.config.NLP_BATCH_SIZE, app.config.NLP_N_PROCESS = args.batch_size, args.n_process
+
+    def one_at_a_time():
+        for message in messages:
+            db = app.SessionLocal()
+            try:
+                app.process_chatbot_message(message, db)
+            finally:
+                db.close()
+
+    def batched():
+        db = app.SessionLocal()
+        try:
+            app.process_chatbot_messages(messages, db)
+        finally:
+            db.close()
+
+    single = timed("process_chatbot_message x N", len(messages), one_at_a_time)
+    batch = timed("process_chatbot_messages (one batch)", len(messages), batched)
+    print(f"speedup: {single / batch:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
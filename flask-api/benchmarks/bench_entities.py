@@ -0,0 +1,160 @@
+"""Parity check and throughput benchmark for extract_entities.
+
+Compares the table-driven EntityExtractor with the original implementation,
+which rebuilt its pattern lists and ran re.search on raw strings on every
+call, over a few thousand representative messages. Exits non-zero if any
+output dict differs.
+"""
+import argparse
+import random
+import re
+import sys
+import time
+from collections import namedtuple
+
+from entity_extractor import EntityExtractor
+
+PRODUCTS = ["Laptop XPS 15", "wireless mouse", "USB-C charger", "Dell monitor", "gaming keyboard", "iPhone 15", "office chair"]
+SUPPLIERS = ["Avantika Patil", "Tech Solutions", "Global Traders", "Rahul Sharma", "Prime Distributors"]
+TEMPLATES = [
+    "What's the price of {product}?",
+    "price of {product}",
+    "How much is {product}?",
+    "how much does {product} cost",
+    "find {product}",
+    "search for {product} in stock",
+    "I am looking for {product}",
+    "Give email id of supplier {supplier}",
+    "Get phone number of supplier {supplier}",
+    "address of {supplier}",
+    "contact for vendor {supplier}?",
+    "supplier {supplier} email",
+    "show {n} products",
+    "list {n} users",
+    "Is the {product} available?",
+    "inventory of {product}",
+    "What's the location of {supplier}",
+    "Tell me about {supplier}",
+    "hello there",
+    "List all products",
+]
+
+Token = namedtuple("Token", "pos_")
+
+
+class Chunk:
+    """Stand-in for a spaCy noun chunk Span: has .text and iterates tokens"""
+
+    def __init__(self, text):
+        self.text = text
+        self.tokens = [Token("PROPN" if word[:1].isupper() else "NOUN") for word in text.split()]
+
+    def __iter__(self):
+        return iter(self.tokens)
+
+
+def fake_noun_chunks(message):
+    # Runs of capitalised words plus the last word, enough to exercise the fallback branch
+    chunks = [Chunk(m.group(0)) for m in re.finditer(r"(?:[A-Z][\w-]*\s?)+", message)]
+    return chunks + [Chunk(message.split()[-1].strip("?"))]
+
+
+def reference_extract(message, noun_chunks):
+    """The original extract_entities body (minus its own spaCy parse)"""
+    entities = {}
+    for pattern in [r"find\s+([\w\s]+)", r"search\s+for\s+([\w\s]+)", r"looking\s+for\s+([\w\s]+)"]:
+        match = re.search(pattern, message, re.IGNORECASE)
+        if match:
+            entities["product_name"] = match.group(1).strip()
+            break
+    supplier_patterns = [
+        r"(?:supplier|vendor)\s+([A-Za-z\s]+?)(?:\s+(?:email|phone|contact|address)|$)",
+        r"(?:email|phone|contact|address)\s+(?:of|for)\s+(?:supplier|vendor)\s+([A-Za-z\s]+)(?:\?|$)",
+        r"(?:email|phone|contact|address)\s+(?:of|for)\s+([A-Za-z\s]+)(?:\?|$)"
+    ]
+    for pattern in supplier_patterns:
+        match = re.search(pattern, message, re.IGNORECASE)
+        if match:
+            entities["supplier_name"] = match.group(1).strip()
+            break
+    price_patterns = [
+        r"price\s+of\s+([\w\s\d]+?)(?:\?|$)",
+        r"how\s+much\s+(?:is|does|costs?)\s+([\w\s\d]+?)(?:\?|$)",
+        r"what(?:'s|\s+is)\s+the\s+price\s+of\s+([\w\s\d]+?)(?:\?|$)"
+    ]
+    for pattern in price_patterns:
+        match = re.search(pattern, message, re.IGNORECASE)
+        if match:
+            entities["product_name"] = match.group(1).strip()
+            break
+    field_patterns = {
+        "email": [r"email\s+(?:id|address)", r"e-?mail"],
+        "phone": [r"phone\s+(?:number|no\.?)", r"contact\s+number"],
+        "address": [r"address", r"location"],
+        "price": [r"price", r"cost", r"how much"],
+        "stock": [r"stock", r"inventory", r"available"]
+    }
+    for field, patterns in field_patterns.items():
+        for pattern in patterns:
+            if re.search(pattern, message, re.IGNORECASE):
+                entities["requested_field"] = field
+                break
+        if "requested_field" in entities:
+            break
+    match = re.search(r"(\d+)\s+(?:products?|items?|users?)", message, re.IGNORECASE)
+    if match:
+        entities["quantity"] = int(match.group(1))
+    if "product_name" not in entities and "supplier_name" not in entities:
+        for chunk in noun_chunks:
+            skip_terms = ["product", "category", "user", "database", "list", "all", "email", "phone"]
+            if not any(term in chunk.text.lower() for term in skip_terms):
+                if any(token.pos_ == "PROPN" for token in chunk):
+                    entities["supplier_name"] = chunk.text
+                else:
+                    entities["product_name"] = chunk.text
+                break
+    return entities
+
+
+def build_messages(count, seed=7):
+    rng = random.Random(seed)
+    messages = []
+    for _ in range(count):
+        message = rng.choice(TEMPLATES).format(
+            product=rng.choice(PRODUCTS), supplier=rng.choice(SUPPLIERS), n=rng.randint(1, 50)
+        )
+        messages.append(message.upper() if rng.random() < 0.05 else message)
+    return messages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    extractor = EntityExtractor()
+    inputs = [(message, fake_noun_chunks(message)) for message in build_messages(args.messages)]
+
+    mismatches = 0
+    for message, chunks in inputs:
+        expected, got = reference_extract(message, chunks), extractor.extract(message, chunks)
+        if list(expected.items()) != list(got.items()):
+            mismatches += 1
+            print(f"MISMATCH {message!r}: expected {expected}, got {got}")
+    print(f"Parity: {len(inputs)} messages, {mismatches} mismatches")
+
+    rates = {}
+    for name, extract in (("reference", reference_extract), ("EntityExtractor", extractor.extract)):
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for message, chunks in inputs:
+                extract(message, chunks)
+        rates[name] = len(inputs) * args.repeat / (time.perf_counter() - start)
+        print(f"{name:<16} {rates[name]:,.0f} messages/s")
+    print(f"speedup: {rates['EntityExtractor'] / rates['reference']:.1f}x")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""Ranked fuzzy name matching vs the LIKE lookup it replaced.
+
+Fills a SQLite catalog with --rows products and asks for products by name
+three ways: the exact name, the name with one typo, and a shortened name
+("brand noun model N") with one typo. For each, reports how often the old
+path (LIKE '%term%', first row) and NameIndex.best_matches pick the intended
+product, and their latencies. Then times best_matches on in-memory indexes of
+growing size to show how its cost scales with the catalog.
+"""
+import argparse
+import random
+import string
+
+from benchmarks.common import use_sqlite, print_summary, time_calls
+
+use_sqlite()
+from sqlalchemy import func, or_  # noqa: E402
+
+import app  # noqa: E402
+from benchmarks.catalog import fill_products  # noqa: E402
+from name_index import NameIndex, TableNameIndex  # noqa: E402
+
+
+def add_typo(rng, text):
+    """Delete, substitute, insert or transpose one letter"""
+    positions = [i for i, char in enumerate(text) if char.isalpha()]
+    i = rng.choice(positions)
+    kind = rng.choice(["delete", "substitute", "insert", "transpose"])
+    if kind == "delete":
+        return text[:i] + text[i + 1:]
+    if kind == "substitute":
+        return text[:i] + rng.choice(string.ascii_lowercase.replace(text[i].lower(), "")) + text[i + 1:]
+    if kind == "insert":
+        return text[:i] + rng.choice(string.ascii_lowercase) + text[i:]
+    if i + 1 < len(text) and text[i + 1] != text[i]:
+        return text[:i] + text[i + 1] + text[i] + text[i + 2:]
+    return text[:i] + text[i + 1:]
+
+
+def shorten(name):
+    # "Dell wireless mouse model 123" -> "Dell mouse model 123"
+    words = name.split()
+    return " ".join(words[:1] + words[2:]) if len(words) > 3 else name
+
+
+def like_first(db, term):
+    search_term = f"%{term}%"
+    row = db.query(app.Product.ProductId).filter(
+        or_(app.Product.Name.like(search_term), app.Product.Category.like(search_term))
+    ).first()
+    return row[0] if row else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--scale", default="10000,100000,1000000",
+                        help="comma-separated in-memory index sizes for the scaling run")
+    args = parser.parse_args()
+
+    fill_products(args.rows)
+    db = app.SessionLocal()
+    names = dict(db.query(app.Product.ProductId, app.Product.Name).all())
+    index = TableNameIndex(app.Product.ProductId, [app.Product.Name, app.Product.Category],
+                           func.coalesce(app.Product.UpdatedAt, app.Product.CreatedAt), refresh_interval=3600)
+    index.ensure_fresh(db)
+
+    rng = random.Random(7)
+    targets = rng.sample(sorted(names), args.queries)
+    cases = {
+        "exact name": [(pk, names[pk]) for pk in targets],
+        "one typo": [(pk, add_typo(rng, names[pk])) for pk in targets],
+        "short name + typo": [(pk, add_typo(rng, shorten(names[pk]))) for pk in targets],
+    }
+
+    def fuzzy_first(term):
+        ranked = index.best_matches(db, term, limit=1, min_score=app.config.FUZZY_MATCH_MIN_SCORE)
+        return ranked[0][0] if ranked else None
+
+    for case, queries in cases.items():
+        print(f"\n{case}: e.g. {queries[0][1]!r}")
+        for label, lookup in (("LIKE, first row", lambda term: like_first(db, term)), ("best_matches", fuzzy_first)):
+            # Names can repeat in the generated catalog; any row with the intended name counts
+            hits = sum(names.get(lookup(term)) == names[pk] for pk, term in queries)
+            print(f"  {label:<18} accuracy {hits / len(queries):6.1%}")
+            print_summary(f"  {label}", time_calls(lookup, [term for _, term in queries]))
+    db.close()
+
+    print("\nScaling (in-memory, one-typo queries):")
+    for size in [int(value) for value in args.scale.split(",") if value]:
+        rng = random.Random(size)
+        memory = NameIndex()
+        generated = [(pk, (f"{rng.choice(['Dell', 'Sony', 'Asus', 'Bose', 'HP'])} "
+                           f"{rng.choice(['mouse', 'laptop', 'camera', 'router'])} model {rng.randint(1, 99999)}",))
+                     for pk in range(1, size + 1)]
+        memory.load(generated)
+        queries = [add_typo(rng, generated[rng.randrange(size)][1][0]) for _ in range(args.queries)]
+        print_summary(f"  {size:>9,} names", time_calls(lambda term: memory.best_matches(term, limit=1), queries))
+
+
+if __name__ == "__main__":
+    main()
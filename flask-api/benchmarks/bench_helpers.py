@@ -0,0 +1,145 @@
+"""Microbenchmarks for the request-path building blocks on a synthetic catalog.
+
+Fills a SQLite catalog (see benchmarks.catalog) and times:
+
+- extract_entities and classify_intent over the golden intent corpus
+- every get_* query helper in app.py that takes a session, with sample
+  arguments from HELPER_ARGS. A helper added to app.py without an entry there
+  fails the run, so the list can't silently fall behind. Helpers behind the
+  reference cache are timed twice: the query itself, and the cached call
+- generate_response for each intent, over the corpus messages with that intent
+
+By default caches stay warm between calls, as they are for a running app;
+--cold invalidates them before every call. --json saves the results and
+--baseline prints the change against an earlier saved run:
+
+    python -m benchmarks.bench_helpers --json before.json
+    python -m benchmarks.bench_helpers --baseline before.json
+"""
+import argparse
+import inspect
+import sys
+from collections import defaultdict
+
+from benchmarks.common import compare_results, print_summary, time_calls, use_sqlite, write_results
+
+use_sqlite()
+import app  # noqa: E402
+from benchmarks.bench_intents import load_corpus  # noqa: E402
+from benchmarks.catalog import fill_catalog  # noqa: E402
+
+# Sample keyword arguments for each helper (after the session)
+HELPER_ARGS = {
+    "get_products": lambda: {"limit": 10},
+    "get_categories": lambda: {},
+    "get_brands": lambda: {},
+    "get_users": lambda: {"limit": 10},
+    "get_suppliers": lambda: {},
+    "get_products_count": lambda: {},
+    "get_stats_snapshot": lambda: {},
+    "get_products_in_stock_count": lambda: {},
+    "get_products_by_price": lambda: {"descending": True, "limit": 10},
+    "get_out_of_stock_products": lambda: {},
+    "get_low_stock_products": lambda: {"threshold": 5, "limit": 50},
+    "get_pending_stock_alerts": lambda: {"session_id": "bench"},
+    "get_product_by_category": lambda: {"category_id": 1},
+    "get_user_permissions": lambda: {"user_id": 7},
+    "get_by_ids": lambda: {"pk_column": app.Product.ProductId, "ids": list(range(1, 1001, 10))},
+    "get_product_by_name": lambda: {"name": "xps"},
+    "get_supplier_by_name": lambda: {"name": "patil"},
+}
+
+
+def query_helpers():
+    """name -> function for every get_* in app.py whose first parameter is the session"""
+    helpers = {}
+    for name, func in vars(app).items():
+        if name.startswith("get_") and inspect.isfunction(func) and func.__module__ == app.__name__:
+            parameters = list(inspect.signature(func).parameters)
+            if parameters and parameters[0] == "db":
+                helpers[name] = func
+    return helpers
+
+
+def call_helper(func, db, kwargs):
+    result = func(db, **kwargs)
+    # Generators stream their rows, so reading them is part of the call
+    if inspect.isgenerator(result):
+        result = list(result)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=10_000)
+    parser.add_argument("--suppliers", type=int, default=500)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=50, help="calls per query helper")
+    parser.add_argument("--per-intent", type=int, default=40, help="generate_response calls per intent")
+    parser.add_argument("--cold", action="store_true", help="invalidate the caches before every call")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="compare p50 latencies with this earlier --json file")
+    args = parser.parse_args()
+
+    fill_catalog(args.products, args.suppliers, args.users, args.seed)
+    with app.SessionLocal() as db:
+        app.subscribe_to_stock_alert(db, "bench", 1)
+        db.commit()
+    corpus = [message for message, _ in load_corpus()]
+    print(f"{args.products:,} products, {args.suppliers} suppliers, {args.users} users; "
+          f"{len(corpus)} corpus messages; caches {'cold' if args.cold else 'warm'}\n")
+
+    def cold(func):
+        if not args.cold:
+            return func
+
+        def call(item):
+            app.reference_cache.invalidate()
+            return func(item)
+        return call
+
+    # Load the spaCy pipeline before timing anything
+    app.extract_entities(corpus[0])
+    results = {}
+    results["extract_entities"] = print_summary("extract_entities", time_calls(cold(app.extract_entities), corpus))
+    results["classify_intent"] = print_summary("classify_intent", time_calls(cold(app.classify_intent), corpus))
+
+    helpers = query_helpers()
+    missing = sorted(set(helpers) - set(HELPER_ARGS))
+    if missing:
+        print(f"No sample arguments in HELPER_ARGS for: {', '.join(missing)}")
+        return 1
+    print()
+    for name, func in sorted(helpers.items()):
+        kwargs = HELPER_ARGS[name]()
+        variants = [(name, func)]
+        if hasattr(func, "cache"):
+            # Behind the reference cache: time the query on its own as well
+            variants = [(f"{name} (query)", inspect.unwrap(func)), (f"{name} (cached)", func)]
+        for label, target in variants:
+            with app.SessionLocal() as db:
+                latencies = time_calls(cold(lambda _: call_helper(target, db, kwargs)), range(args.repeat))
+            results[label] = print_summary(label, latencies)
+
+    by_intent = defaultdict(list)
+    for message, intent in zip(corpus, app.classify_intents(corpus)):
+        if len(by_intent[intent]) < args.per_intent:
+            by_intent[intent].append(message)
+    print()
+    for intent, messages in sorted(by_intent.items()):
+        label = f"generate_response {intent}"
+        with app.SessionLocal() as db:
+            latencies = time_calls(cold(lambda message: app.generate_response(message, db, session_id="bench")),
+                                   messages)
+        results[label] = print_summary(label, latencies)
+
+    if args.json:
+        write_results(args.json, "bench_helpers", vars(args), results)
+    if args.baseline:
+        compare_results(args.baseline, results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""Accuracy and latency of the similarity intent fallback against regex only.
+
+data/intent_paraphrases.tsv holds hand-labelled paraphrases that share no
+text with INTENT_EXAMPLES, most of which no INTENT_PATTERNS entry matches,
+plus small talk labelled "unknown". For each threshold in --thresholds the
+script reports accuracy on that set for regex only and for regex followed by
+the fallback, and how much small talk the fallback wrongly claims. The golden
+corpus is run through both too: the fallback only ever relabels messages the
+regexes call "unknown", so every other label must stay the same.
+
+Latency compares the regex matcher, the fallback on one message, and
+classify_many over all unmatched messages at once.
+"""
+import argparse
+import os
+import sys
+import time
+
+from benchmarks.bench_intents import FALLBACKS, load_corpus
+from benchmarks.common import print_summary, time_calls
+from intent_matcher import IntentMatcher
+from intent_similarity import IntentSimilarity
+from intents import INTENT_EXAMPLES, INTENT_PATTERNS
+
+PARAPHRASES_PATH = os.path.join(os.path.dirname(__file__), "data", "intent_paraphrases.tsv")
+
+
+def classify(matcher, similarity, message):
+    intent = matcher.match(message)
+    if intent == matcher.default and similarity is not None:
+        intent, _ = similarity.classify(message)
+    return intent
+
+
+def evaluate(matcher, similarity, cases):
+    correct = claimed_small_talk = small_talk = 0
+    for message, expected in cases:
+        got = classify(matcher, similarity, message)
+        correct += got == expected
+        if expected == "unknown":
+            small_talk += 1
+            claimed_small_talk += got != "unknown"
+    return correct / len(cases), claimed_small_talk, small_talk
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--thresholds", default="0.2,0.3,0.35,0.4,0.45,0.5,0.6")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    matcher = IntentMatcher(INTENT_PATTERNS, fallbacks=FALLBACKS)
+    start = time.perf_counter()
+    similarity = IntentSimilarity(INTENT_EXAMPLES)
+    build_ms = (time.perf_counter() - start) * 1000
+    print(f"{len(similarity.intents)} examples, {len(similarity.vocabulary):,} n-grams, "
+          f"{len(similarity.values):,} stored entries, built in {build_ms:.1f} ms\n")
+
+    paraphrases = load_corpus(PARAPHRASES_PATH)
+    unmatched = sum(matcher.match(message) == "unknown" for message, _ in paraphrases)
+    accuracy, claimed, small_talk = evaluate(matcher, None, paraphrases)
+    print(f"Paraphrases: {len(paraphrases)} messages, {unmatched} unmatched by the patterns")
+    print(f"{'regex only':<22} accuracy {accuracy:6.1%}   small talk claimed {claimed}/{small_talk}")
+    for threshold in [float(value) for value in args.thresholds.split(",") if value]:
+        similarity.threshold = threshold
+        accuracy, claimed, small_talk = evaluate(matcher, similarity, paraphrases)
+        print(f"{f'+ fallback @ {threshold:.2f}':<22} accuracy {accuracy:6.1%}   small talk claimed {claimed}/{small_talk}")
+    similarity.threshold = IntentSimilarity(INTENT_EXAMPLES).threshold
+
+    corpus = load_corpus()
+    changed = [(message, expected, classify(matcher, similarity, message)) for message, expected in corpus]
+    changed = [entry for entry in changed if entry[1] != entry[2]]
+    broken = [entry for entry in changed if entry[1] != "unknown"]
+    print(f"\nGolden corpus: {len(corpus)} messages, {len(changed)} relabelled from unknown, {len(broken)} others changed")
+    for message, expected, got in changed:
+        print(f"  {message!r}: {expected} -> {got}")
+
+    messages = [message for message, _ in paraphrases]
+    leftovers = [message for message in messages if matcher.match(message) == "unknown"]
+    print()
+    print_summary("regex match", time_calls(matcher.match, messages, args.repeat))
+    print_summary("fallback classify (1 msg)", time_calls(similarity.classify, leftovers, args.repeat))
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        similarity.classify_many(leftovers)
+    batched = (time.perf_counter() - start) / (args.repeat * len(leftovers))
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for message in leftovers:
+            similarity.classify(message)
+    looped = (time.perf_counter() - start) / (args.repeat * len(leftovers))
+    print(f"classify_many over {len(leftovers)} messages: {batched * 1e6:.1f} us/message "
+          f"(one at a time: {looped * 1e6:.1f} us/message)")
+    return 1 if broken else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
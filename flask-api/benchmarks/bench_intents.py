@@ -0,0 +1,98 @@
+"""Golden-corpus check and throughput benchmark for classify_intent.
+
+Every message in data/intent_corpus.tsv is labelled with the intent picked by
+the original loop that calls re.search on each raw INTENT_PATTERNS string.
+This script checks that the compiled IntentMatcher agrees on every message,
+then reports messages per second for both implementations.
+
+Pass --regenerate to relabel the corpus after deliberately changing intents.py.
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+from intents import INTENT_PATTERNS
+from intent_matcher import IntentMatcher
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "data", "intent_corpus.tsv")
+FALLBACKS = [
+    ("supplier_contact", r"(email|phone|contact|address)\s+(?:of|for|details)"),
+    ("product_price", r"(price|cost|how much)"),
+]
+
+
+def reference_classify(message):
+    """The original classify_intent: one re.search per raw pattern string"""
+    message_lower = message.lower()
+    for intent, patterns in INTENT_PATTERNS.items():
+        for pattern in patterns:
+            if re.search(pattern, message_lower, re.IGNORECASE):
+                return intent
+    for intent, pattern in FALLBACKS:
+        if re.search(pattern, message_lower):
+            return intent
+    return "unknown"
+
+
+def load_corpus(path=CORPUS_PATH):
+    corpus = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("#") or not line.strip():
+                continue
+            message, expected = line.rstrip("\n").split("\t")
+            corpus.append((message, expected))
+    return corpus
+
+
+def write_corpus(messages, path=CORPUS_PATH):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("# message\texpected intent (labelled by the original per-pattern re.search loop)\n")
+        for message in messages:
+            f.write(f"{message}\t{reference_classify(message)}\n")
+
+
+def throughput(classify, messages, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for message in messages:
+            classify(message)
+    return len(messages) * repeat / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--regenerate", action="store_true", help="relabel the corpus with the reference loop")
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    if args.regenerate:
+        write_corpus([message for message, _ in corpus])
+        corpus = load_corpus()
+        print(f"Relabelled {len(corpus)} messages")
+
+    matcher = IntentMatcher(INTENT_PATTERNS, fallbacks=FALLBACKS)
+    mismatches = []
+    for message, expected in corpus:
+        for name, classify in (("reference", reference_classify), ("compiled", matcher.match)):
+            got = classify(message)
+            if got != expected:
+                mismatches.append((name, message, expected, got))
+
+    for name, message, expected, got in mismatches:
+        print(f"MISMATCH [{name}] {message!r}: expected {expected}, got {got}")
+    print(f"Golden corpus: {len(corpus)} messages, {len(mismatches)} mismatches")
+
+    messages = [message for message, _ in corpus]
+    reference_rate = throughput(reference_classify, messages, args.repeat)
+    compiled_rate = throughput(matcher.match, messages, args.repeat)
+    print(f"reference loop:   {reference_rate:,.0f} messages/s")
+    print(f"IntentMatcher:    {compiled_rate:,.0f} messages/s ({compiled_rate / reference_rate:.1f}x)")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
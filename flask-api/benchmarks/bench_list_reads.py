@@ -0,0 +1,134 @@
+"""List replies: full ORM entities against column-projected Core rows.
+
+Fills a SQLite catalog with --rows products and users (and --rows / 10
+suppliers), with --out-of-stock of the products at zero stock, then compares
+for each list reply:
+
+- latency of the query plus formatting, the way the handler used to run it
+  (db.query(Entity), every column, identity map) and the way it does now
+  (only the formatted columns, plain rows through Core)
+- Python memory (tracemalloc peak) of reading a whole table as ORM entities,
+  as projected rows, and streamed with yield_per (only the formatted lines
+  are kept)
+- a page deep in the list: OFFSET, which reads and throws away every row in
+  front of it, against the keyset condition "next N products" uses
+
+The replies built both ways are compared and must be identical.
+"""
+import argparse
+import random
+import tracemalloc
+
+from benchmarks.common import print_summary, time_calls, use_sqlite
+
+use_sqlite()
+from sqlalchemy import select, update  # noqa: E402
+
+import app  # noqa: E402
+from benchmarks.catalog import fill_catalog  # noqa: E402
+
+
+def format_products(products):
+    return "\n".join([f"- {product.Name}: ${product.Price}, Stock: {product.Stock}" for product in products])
+
+
+def format_users(users):
+    return "\n".join([f"- {user.Username} ({user.FirstName} {user.LastName}, {user.Email})" for user in users])
+
+
+def format_suppliers(suppliers):
+    return "\n".join([f"- {supplier.Name} (Email: {supplier.Email}, Phone: {supplier.Phone})" for supplier in suppliers])
+
+
+def format_names(products):
+    return "\n".join([f"- {product.Name}" for product in products])
+
+
+# (reply, what the handler used to run, what it runs now); each takes a session
+PATHS = [
+    ("list_products page",
+     lambda db: format_products(db.query(app.Product).order_by(app.Product.ProductId).limit(10).all()),
+     lambda db: format_products(app.get_products(db, 10))),
+    ("list_users page",
+     lambda db: format_users(db.query(app.User).order_by(app.User.UserId).limit(10).all()),
+     lambda db: format_users(app.get_users(db, 10))),
+    ("suppliers (uncached)",
+     lambda db: format_suppliers(db.query(app.Supplier).order_by(app.Supplier.SupplierId).all()),
+     lambda db: format_suppliers(app.get_suppliers.__wrapped__(db))),
+    ("out_of_stock",
+     lambda db: format_names(db.query(app.Product).filter(app.Product.Stock == app.inline_int(0))
+                             .order_by(app.Product.ProductId).all()),
+     lambda db: format_names(app.get_out_of_stock_products(db))),
+]
+
+
+def peak_memory(func):
+    """(result, peak bytes allocated while func ran) with a fresh session"""
+    with app.SessionLocal() as db:
+        db.connection()
+        tracemalloc.start()
+        result = func(db)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--out-of-stock", type=int, default=2_000)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    fill_catalog(args.rows, args.rows // 10, args.rows)
+    rng = random.Random(5)
+    empty = rng.sample(range(1, args.rows + 1), args.out_of_stock)
+    with app.engine.begin() as conn:
+        conn.execute(update(app.Product.__table__).values(Stock=1).where(app.Product.Stock == 0))
+        conn.execute(update(app.Product.__table__).values(Stock=0).where(app.Product.ProductId.in_(empty)))
+    print(f"{args.rows:,} products and users, {args.rows // 10:,} suppliers, {args.out_of_stock:,} out of stock\n")
+
+    mismatches = 0
+    for name, orm, core in PATHS:
+        with app.SessionLocal() as db:
+            same = orm(db) == core(db)
+        mismatches += not same
+        for label, func in (("ORM", orm), ("Core", core)):
+            with app.SessionLocal() as db:
+                print_summary(f"{name} {label}", time_calls(lambda _: func(db), range(args.repeat)))
+        print(f"{'':<40} replies identical: {same}")
+
+    print("\nReading every product (Python heap peak):")
+    products_c = app.Product.__table__.c
+    projected = select(products_c.ProductId, products_c.Name, products_c.Price, products_c.Stock)
+
+    def streamed(db):
+        reply = format_products(app.read_rows(db, projected, app.config.LIST_STREAM_CHUNK_SIZE))
+        return f"{len(reply):,} characters kept"
+
+    readers = [
+        ("ORM entities, .all()", lambda db: f"{len(db.query(app.Product).all()):,} rows"),
+        ("projected rows, .all()", lambda db: f"{len(app.read_rows(db, projected).all()):,} rows"),
+        ("projected rows, yield_per, formatted", streamed),
+    ]
+    for label, func in readers:
+        size, peak = peak_memory(func)
+        print(f"  {label:<38} {peak / 2 ** 20:8.1f} MiB  ({size})")
+
+    print(f"\nPage of 10 at row {args.rows - 1000:,}:")
+    deep = args.rows - 1000
+    with app.SessionLocal() as db:
+        print_summary("OFFSET (ORM)", time_calls(
+            lambda _: db.query(app.Product).order_by(app.Product.ProductId).offset(deep).limit(10).all(),
+            range(args.repeat)))
+        print_summary("keyset after_id (Core)", time_calls(lambda _: app.get_products(db, 10, deep), range(args.repeat)))
+        offset_ids = [product.ProductId for product in
+                      db.query(app.Product).order_by(app.Product.ProductId).offset(deep).limit(10)]
+        same = offset_ids == [row.ProductId for row in app.get_products(db, 10, deep)]
+        mismatches += not same
+        print(f"{'':<40} same rows: {same}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,89 @@
+"""Product/supplier name index vs LIKE '%term%' on a synthetic catalog.
+
+Fills a SQLite database with --rows products (1M by default), then times
+substring lookups three ways: the LIKE query get_product_by_name used to run,
+the in-memory NameIndex alone, and NameIndex plus fetching the matched rows by
+primary key. Terms matching more than NAME_INDEX_MAX_MATCH_RATIO of the rows
+are looked up with LIKE by get_product_by_name instead; both row-fetching paths
+are timed so the threshold can be checked. Also reports the index build time,
+its memory and the cost of an incremental refresh.
+"""
+import argparse
+import datetime
+import resource
+import time
+
+from benchmarks.common import use_sqlite, print_summary
+
+use_sqlite()
+from sqlalchemy import func, or_, update  # noqa: E402
+
+import app  # noqa: E402
+from benchmarks.catalog import fill_products  # noqa: E402
+from name_index import TableNameIndex  # noqa: E402
+
+QUERIES = ["xps", "gaming mouse", "Sony", "wireless headphones", "model 4711", "pro laptop", "camera", "zzz-no-match"]
+
+
+def like_lookup(db, term, entity=app.Product.ProductId):
+    search_term = f"%{term}%"
+    return db.query(entity).filter(
+        or_(app.Product.Name.like(search_term), app.Product.Category.like(search_term))
+    ).all()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    fill_products(args.rows)
+    print(f"Generated {args.rows:,} products in {time.perf_counter() - start:.1f}s")
+
+    index = TableNameIndex(app.Product.ProductId, [app.Product.Name, app.Product.Category],
+                           func.coalesce(app.Product.UpdatedAt, app.Product.CreatedAt), refresh_interval=3600)
+    db = app.SessionLocal()
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    index.ensure_fresh(db)
+    print(f"Index build: {time.perf_counter() - start:.1f}s, "
+          f"~{(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before) / 1024:.0f} MB peak RSS growth, "
+          f"{len(index.index.postings):,} trigrams")
+
+    for term in QUERIES:
+        like = sorted(pk for (pk,) in like_lookup(db, term))
+        indexed = index.index.search(term)
+        assert like == indexed, f"result mismatch for {term!r}"
+        uses_index = len(indexed) <= app.config.NAME_INDEX_MAX_MATCH_RATIO * len(index.index)
+        print(f"\n'{term}': {len(indexed):,} matches, get_product_by_name uses {'the index' if uses_index else 'LIKE'}")
+        print_summary("  LIKE '%term%' scan", [_timed(like_lookup, db, term) for _ in range(args.repeat)])
+        print_summary("  NameIndex.search", [_timed(index.index.search, term) for _ in range(args.repeat)])
+        if len(indexed) <= 5000:
+            print_summary("  LIKE fetching rows", [_timed(like_lookup, db, term, app.Product)
+                                                   for _ in range(args.repeat)])
+            print_summary("  index + fetch rows by id", [_timed(app.get_by_ids, db, app.Product.ProductId, indexed)
+                                                         for _ in range(args.repeat)])
+
+    # Incremental refresh after 100 rows change
+    changed_at = datetime.datetime.utcnow()
+    with app.engine.begin() as conn:
+        conn.execute(update(app.Product.__table__).where(app.Product.ProductId <= 100)
+                     .values(Name="Renamed widget", UpdatedAt=changed_at))
+    index.mark_stale()
+    start = time.perf_counter()
+    index.ensure_fresh(db)
+    print(f"\nIncremental refresh after 100 updates: {(time.perf_counter() - start) * 1000:.1f}ms, "
+          f"'renamed widget' -> {len(index.index.search('renamed widget'))} matches")
+    db.close()
+
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Latency, memory and accuracy of each NLP backend (NLP_BACKEND).
+
+Fills a SQLite catalog with --products products and --suppliers suppliers,
+then writes --messages messages that mention a catalog name in a way none of
+the regex entity rules catch ("do you have the Sony smart camera model 12?"),
+so the name can only come from the NLP pipeline. Each backend then runs in
+its own process, so its memory is measured on its own: load time, peak RSS
+added by loading, analyze_message latency, analyze_messages throughput, and
+how often the extracted product_name / supplier_name is the name mentioned.
+"full" and "trimmed" fall back to a blank pipeline when SPACY_MODEL isn't
+installed; the "pipes" column shows what was actually loaded.
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import summarize, time_calls, use_sqlite
+
+PRODUCT_TEMPLATES = ["do you have the {}?", "is the {} any good", "I'd like to buy a {} today", "tell me about {}"]
+SUPPLIER_TEMPLATES = ["we got a delivery from {} today", "is {} still working with us?", "I need to talk to {}"]
+SUPPLIER_NAMES = ["Patil", "Sharma", "Nguyen", "Okafor", "Schmidt", "Rossi", "Tanaka", "Silva", "Kowalski", "Haddad"]
+SUPPLIER_SUFFIXES = ["Traders", "Distribution", "Wholesale", "Imports", "Supplies"]
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def build_cases(app, products, suppliers, messages, seed=5):
+    from sqlalchemy import insert
+    from benchmarks.catalog import fill_products
+
+    fill_products(products)
+    rng = random.Random(seed)
+    names = sorted({f"{rng.choice(SUPPLIER_NAMES)} {rng.choice(SUPPLIER_SUFFIXES)} {i}" for i in range(suppliers)})
+    with app.engine.begin() as conn:
+        conn.execute(insert(app.Supplier.__table__), [{"Name": name} for name in names])
+        product_names = conn.execute(app.Product.__table__.select().with_only_columns(app.Product.Name)).scalars().all()
+    cases = []
+    for i in range(messages):
+        if i % 3 == 2:
+            name = rng.choice(names)
+            cases.append((rng.choice(SUPPLIER_TEMPLATES).format(name), "supplier_name", name))
+        else:
+            name = rng.choice(product_names)
+            cases.append((rng.choice(PRODUCT_TEMPLATES).format(name), "product_name", name))
+    return cases
+
+
+def run_backend(backend, db_path, cases):
+    """Runs in a fresh process: load one backend and measure it"""
+    use_sqlite(db_path)
+    os.environ["NLP_BACKEND"] = backend
+    import app
+
+    rss_before = peak_rss_mb()
+    start = time.perf_counter()
+    app.nlp.load()
+    load_seconds = time.perf_counter() - start
+    rss_added = peak_rss_mb() - rss_before
+
+    texts = [text for text, _, _ in cases]
+    app.analyze_message(texts[0])
+    latency = summarize(time_calls(app.analyze_message, texts))
+    start = time.perf_counter()
+    analyses = app.analyze_messages(texts)
+    batch_seconds = time.perf_counter() - start
+
+    hits = {"product_name": [0, 0], "supplier_name": [0, 0]}
+    for (text, key, expected), analysis in zip(cases, analyses):
+        hits[key][1] += 1
+        hits[key][0] += str(analysis.extracted.get(key, "")).strip().lower() == expected.lower()
+    return {
+        "backend": backend,
+        "pipes": ",".join(app.nlp.pipe_names) or "-",
+        "load_s": load_seconds,
+        "rss_mb": rss_added,
+        "p50_ms": latency["p50_ms"],
+        "p95_ms": latency["p95_ms"],
+        "batch_msg_s": len(texts) / batch_seconds,
+        "product_acc": hits["product_name"][0] / max(hits["product_name"][1], 1),
+        "supplier_acc": hits["supplier_name"][0] / max(hits["supplier_name"][1], 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=20_000)
+    parser.add_argument("--suppliers", type=int, default=200)
+    parser.add_argument("--messages", type=int, default=600)
+    parser.add_argument("--backends", default="full,trimmed,rules")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    parser.add_argument("--cases", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        with open(args.cases, encoding="utf-8") as cases_file:
+            cases = json.load(cases_file)
+        print(json.dumps(run_backend(args.worker, args.db, cases)))
+        return
+
+    db_path = use_sqlite()
+    import app
+    cases = build_cases(app, args.products, args.suppliers, args.messages)
+    cases_path = os.path.join(tempfile.mkdtemp(prefix="nlp-backends-"), "cases.json")
+    with open(cases_path, "w", encoding="utf-8") as cases_file:
+        json.dump(cases, cases_file)
+    print(f"{args.products:,} products, {args.suppliers:,} suppliers, {len(cases)} messages; e.g. {cases[0][0]!r}\n")
+
+    columns = ["backend", "pipes", "load_s", "rss_mb", "p50_ms", "p95_ms", "batch_msg_s", "product_acc", "supplier_acc"]
+    print(" ".join(f"{column:>12}" for column in columns))
+    for backend in [name for name in args.backends.split(",") if name]:
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_nlp_backends", "--worker", backend,
+             "--db", db_path, "--cases", cases_path],
+            capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(" ".join(
+            f"{value:>12.3f}" if isinstance(value, float) else f"{str(value)[:12]:>12}"
+            for value in (result[column] for column in columns)
+        ))
+
+
+if __name__ == "__main__":
+    main()
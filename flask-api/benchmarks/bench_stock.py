@@ -0,0 +1,82 @@
+"""Low-stock report and back-in-stock alert evaluation on a large catalog.
+
+Fills a SQLite catalog with --rows products (stock uniform in 0-500) and
+times get_low_stock_products three ways: through the filtered
+ix_products_low_stock index, with the threshold bound as a parameter, and
+with the index dropped. SQLite plans with the bound value and still uses the
+index; SQL Server doesn't match a parameter against an index filter, which is
+why the app renders the threshold into the SQL. Then files --alerts alerts
+on out-of-stock products, restocks a --restocked fraction of them and times
+one notify_restocked run.
+"""
+import argparse
+import random
+import time
+
+from benchmarks.common import use_sqlite, print_summary, time_calls
+
+use_sqlite()
+from sqlalchemy import bindparam, insert, text, update  # noqa: E402
+
+import app  # noqa: E402
+from benchmarks.catalog import fill_products  # noqa: E402
+
+
+def low_stock_bound(db, threshold, limit):
+    # The same query with the threshold as an ordinary bind parameter
+    return (
+        db.query(app.Product.ProductId, app.Product.Name, app.Product.Stock)
+        .filter(app.Product.Stock <= bindparam("threshold", threshold))
+        .order_by(app.Product.Stock, app.Product.ProductId)
+        .limit(limit)
+        .all()
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--alerts", type=int, default=20_000)
+    parser.add_argument("--restocked", type=float, default=0.1)
+    args = parser.parse_args()
+
+    fill_products(args.rows)
+    with app.engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+    threshold, limit = app.config.LOW_STOCK_THRESHOLD, app.config.LOW_STOCK_MAX_RESULTS
+    index_name = f"ix_products_low_stock_{threshold}"
+    db = app.SessionLocal()
+    print(f"{args.rows:,} products, threshold {threshold}, limit {limit}")
+    print_summary("filtered index", time_calls(lambda _: app.get_low_stock_products(db, threshold, limit),
+                                               range(args.queries)))
+    print_summary("bound parameter", time_calls(lambda _: low_stock_bound(db, threshold, limit), range(args.queries)))
+    with app.engine.begin() as conn:
+        conn.execute(text(f"DROP INDEX {index_name}"))
+    print_summary("no index", time_calls(lambda _: app.get_low_stock_products(db, threshold, limit),
+                                         range(args.queries)))
+    db.close()
+
+    rng = random.Random(3)
+    with app.engine.begin() as conn:
+        out_of_stock = conn.execute(
+            app.Product.__table__.select().with_only_columns(app.Product.ProductId).where(app.Product.Stock == 0)
+        ).scalars().all()
+        conn.execute(insert(app.StockAlertDB.__table__), [
+            {"session_id": f"session-{i}", "product_id": rng.choice(out_of_stock)} for i in range(args.alerts)
+        ])
+        restocked = rng.sample(out_of_stock, max(1, int(len(out_of_stock) * args.restocked)))
+        conn.execute(update(app.Product.__table__).where(app.Product.ProductId.in_(restocked)).values(Stock=10))
+    start = time.perf_counter()
+    stats = app.check_stock_alerts()
+    elapsed = time.perf_counter() - start
+    print(f"\n{args.alerts:,} pending alerts on {len(out_of_stock):,} out-of-stock products, "
+          f"{len(restocked):,} restocked")
+    print(f"notify_restocked: {stats['alerts']:,} notified in {stats['batches']} batches, {elapsed * 1000:.0f} ms")
+    start = time.perf_counter()
+    app.check_stock_alerts()
+    print(f"next run (nothing new): {(time.perf_counter() - start) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Suggestion usage counting and the /suggestions ranking: database vs memory.
+
+Fills a SQLite suggestions table with --suggestions rows, then replays
+--messages chat messages, --hit-rate of them equal to a suggestion (picked
+with a skewed distribution, as real clicks are). Compares:
+
+- counting a use with an UPDATE per message (SUGGESTION_FLUSH_INTERVAL=0)
+  against SuggestionCounter.record
+- the ORDER BY usage_count DESC LIMIT 6 query against SuggestionCounter.top
+- one flush of everything recorded, after which the stored counts and
+  ranking must equal what the in-memory counter reports
+"""
+import argparse
+import random
+import time
+
+from benchmarks.common import print_summary, time_calls, use_sqlite
+
+use_sqlite()
+from sqlalchemy import bindparam, insert, select, update  # noqa: E402
+
+import app  # noqa: E402
+
+
+def count_in_db(message):
+    # What the chat path did per message before uses were counted in memory
+    with app.engine.begin() as conn:
+        conn.execute(
+            update(app.SuggestionDB.__table__)
+            .where(app.SuggestionDB.content == bindparam("b_content"))
+            .values(usage_count=app.SuggestionDB.usage_count + 1),
+            {"b_content": message}
+        )
+
+
+def top_from_db(limit=6):
+    with app.engine.connect() as conn:
+        return conn.execute(
+            select(app.SuggestionDB.content).order_by(app.SuggestionDB.usage_count.desc(), app.SuggestionDB.id)
+            .limit(limit)
+        ).scalars().all()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--suggestions", type=int, default=500)
+    parser.add_argument("--messages", type=int, default=20_000)
+    parser.add_argument("--hit-rate", type=float, default=0.3)
+    args = parser.parse_args()
+    if args.messages < 2:
+        parser.error("--messages must be at least 2 (some are counted each way)")
+
+    rng = random.Random(11)
+    contents = [f"Suggested question number {i}?" for i in range(args.suggestions)]
+    with app.engine.begin() as conn:
+        conn.execute(insert(app.SuggestionDB.__table__), [
+            {"content": content, "usage_count": rng.randint(0, 50)} for content in contents
+        ])
+    weights = [1 / (rank + 1) for rank in range(len(contents))]
+    messages = [
+        rng.choices(contents, weights)[0] if rng.random() < args.hit_rate else f"free text message {i}"
+        for i in range(args.messages)
+    ]
+    print(f"{args.suggestions} suggestions, {args.messages:,} messages ({args.hit_rate:.0%} suggestion clicks)\n")
+
+    counter = app.SuggestionCounter(app.load_suggestion_counts, app.write_suggestion_counts, flush_interval=3600,
+                                    max_pending=len(messages) + 1)
+    counter.reload()
+    # The first fifth is counted with UPDATEs, the rest in memory
+    split = max(1, args.messages // 5)
+    print_summary("UPDATE per message", time_calls(count_in_db, messages[:split]))
+    # Keep the counter in step with the uses the UPDATEs just stored
+    counter.reload()
+    print_summary("SuggestionCounter.record", time_calls(lambda message: counter.record([message]), messages[split:]))
+    print_summary("ORDER BY usage_count LIMIT 6", time_calls(lambda _: top_from_db(), range(2000)))
+    print_summary("SuggestionCounter.top(6)", time_calls(lambda _: counter.top(6), range(2000)))
+
+    pending = counter.stats()["pending_uses"]
+    expected = dict(zip(counter.contents.values(), (counter.counts[i] for i in counter.contents)))
+    ranking = counter.top(20)
+    start = time.perf_counter()
+    flushed = counter.flush()
+    elapsed = time.perf_counter() - start
+    print(f"\nflush: {flushed['uses']:,} uses of {flushed['suggestions']} suggestions written in "
+          f"{elapsed * 1000:.1f} ms (pending before: {pending:,})")
+
+    with app.engine.connect() as conn:
+        stored = dict(conn.execute(select(app.SuggestionDB.content, app.SuggestionDB.usage_count)).all())
+    mismatches = sum(stored[content] != count for content, count in expected.items())
+    print(f"stored counts matching memory: {len(expected) - mismatches}/{len(expected)}; "
+          f"top 20 identical: {top_from_db(20) == ranking == counter.top(20)}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
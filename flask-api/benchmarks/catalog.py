@@ -0,0 +1,169 @@
+"""Synthetic catalog generator for the benchmarks.
+
+Fills a SQLite database (a stand-in for the SQL Server catalog, with the same
+tables the app maps) with products, categories, brands, suppliers, users and
+user permissions, plus the default suggestions. Everything is derived from
+--seed, so two runs with the same arguments produce the same rows.
+
+Benchmarks call fill_catalog() after use_sqlite(); run it as a script to
+keep a database around, e.g. for the load generator or for running the app:
+
+    python -m benchmarks.catalog --db /tmp/catalog.db --products 100000
+    DATABASE_URL=sqlite:////tmp/catalog.db python app.py
+"""
+import argparse
+import datetime
+import random
+import time
+
+from benchmarks.common import use_sqlite
+
+ADJECTIVES = ["wireless", "gaming", "portable", "smart", "ultra", "compact", "pro", "mini", "classic", "premium"]
+NOUNS = ["mouse", "keyboard", "laptop", "monitor", "charger", "headphones", "speaker", "camera", "router", "tablet"]
+BRANDS = ["Dell", "Apple", "Lenovo", "Sony", "Samsung", "Logitech", "Asus", "HP", "Acer", "Bose"]
+CATEGORIES = ["Electronics", "Computers", "Audio", "Accessories", "Networking", "Cameras"]
+FIRST_NAMES = ["Avantika", "Rahul", "Maria", "John", "Aiko", "Chen", "Fatima", "Lars", "Priya", "Diego"]
+LAST_NAMES = ["Patil", "Sharma", "Garcia", "Smith", "Tanaka", "Wei", "Khan", "Nielsen", "Iyer", "Lopez"]
+COMPANY_WORDS = ["Tech", "Global", "Prime", "Metro", "Blue", "Apex", "Nova", "United"]
+COMPANY_SUFFIXES = ["Solutions", "Traders", "Distribution", "Supplies", "Imports"]
+MODULES = ["Products", "Suppliers", "Users", "Orders", "Reports"]
+# Names the default suggestions ask about, so those questions find something
+FIXED_SUPPLIERS = ["Avantika Patil", "Tech Solutions"]
+FIXED_PRODUCTS = ["Dell XPS 15 laptop", "Laptop XPS 15"]
+
+CREATED_AT = datetime.datetime(2025, 1, 1)
+
+
+def _insert(app, table, rows, batch_size=10000):
+    from sqlalchemy import insert
+
+    with app.engine.begin() as conn:
+        for start in range(0, len(rows), batch_size):
+            conn.execute(insert(table), rows[start:start + batch_size])
+
+
+def fill_products(rows, seed=1):
+    """Insert `rows` products with ids 1..rows; one of them is the very selective "Dell XPS 15 laptop" """
+    import app
+    from sqlalchemy import insert, update
+
+    rng = random.Random(seed)
+    batch = []
+    with app.engine.begin() as conn:
+        for pk in range(1, rows + 1):
+            category = rng.choice(CATEGORIES)
+            batch.append({
+                "ProductId": pk,
+                "Name": f"{rng.choice(BRANDS)} {rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} model {rng.randint(1, 99999)}",
+                "Price": f"{rng.uniform(5, 3000):.2f}",
+                "Category": category,
+                "Stock": rng.randint(0, 500),
+                "CategoryId": CATEGORIES.index(category) + 1,
+                # One second apart, as rows added over time are
+                "CreatedAt": CREATED_AT + datetime.timedelta(seconds=pk),
+            })
+            if len(batch) == 10000:
+                conn.execute(insert(app.Product.__table__), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(app.Product.__table__), batch)
+    # Include an "XPS" model so some lookups are very selective
+    with app.engine.begin() as conn:
+        conn.execute(update(app.Product.__table__).where(app.Product.ProductId == rows // 2).values(Name="Dell XPS 15 laptop"))
+
+
+def fill_catalog(products=10_000, suppliers=500, users=200, seed=1):
+    """Fill every catalog table; returns the number of rows written per table"""
+    import app
+    from sqlalchemy import update
+
+    rng = random.Random(seed)
+    fill_products(products, seed)
+    if products >= 3:
+        with app.engine.begin() as conn:
+            conn.execute(update(app.Product.__table__).where(app.Product.ProductId == products // 3)
+                         .values(Name=FIXED_PRODUCTS[1]))
+
+    _insert(app, app.Category.__table__, [
+        {"CategoryId": i, "CategoryName": name, "Description": f"{name} products", "CreatedAt": CREATED_AT}
+        for i, name in enumerate(CATEGORIES, 1)
+    ])
+    _insert(app, app.Brand.__table__, [
+        {"BrandId": i, "BrandName": name, "Description": f"{name} devices", "CreatedAt": CREATED_AT}
+        for i, name in enumerate(BRANDS, 1)
+    ])
+
+    supplier_names = list(FIXED_SUPPLIERS)
+    while len(supplier_names) < suppliers:
+        if rng.random() < 0.5:
+            name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        else:
+            name = f"{rng.choice(COMPANY_WORDS)} {rng.choice(COMPANY_SUFFIXES)}"
+        supplier_names.append(f"{name} {len(supplier_names)}")
+    _insert(app, app.Supplier.__table__, [
+        {
+            "SupplierId": i,
+            "Name": name,
+            "Email": f"{name.lower().replace(' ', '.')}@example.com",
+            "Phone": f"+1-555-{rng.randint(0, 9999):04d}",
+            "Address": f"{rng.randint(1, 999)} Market Street",
+            "CreatedAt": CREATED_AT + datetime.timedelta(seconds=i),
+        }
+        for i, name in enumerate(supplier_names[:suppliers], 1)
+    ])
+
+    user_rows, permission_rows = [], []
+    for user_id in range(1, users + 1):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        modules = rng.sample(MODULES, rng.randint(1, len(MODULES)))
+        user_rows.append({
+            "UserId": user_id,
+            "Username": f"{first.lower()}.{last.lower()}{user_id}",
+            "Email": f"{first.lower()}.{last.lower()}{user_id}@example.com",
+            "FirstName": first,
+            "LastName": last,
+            "PasswordHash": f"hash-{user_id}",
+            "IsActive": 1 if rng.random() < 0.9 else 0,
+            "CreatedAt": CREATED_AT,
+            "Permissions": ",".join(modules),
+        })
+        for module in modules:
+            permission_rows.append({
+                "UserId": user_id,
+                "ModuleName": module,
+                "CanCreate": int(rng.random() < 0.3),
+                "CanRead": 1,
+                "CanUpdate": int(rng.random() < 0.4),
+                "CanDelete": int(rng.random() < 0.1),
+            })
+    _insert(app, app.User.__table__, user_rows)
+    _insert(app, app.UserPermission.__table__, permission_rows)
+    app.initialize_suggestions()
+    return {
+        "products": products,
+        "categories": len(CATEGORIES),
+        "brands": len(BRANDS),
+        "suppliers": min(suppliers, len(supplier_names)),
+        "users": users,
+        "permissions": len(permission_rows),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", help="SQLite file to create (default: a new temporary file)")
+    parser.add_argument("--products", type=int, default=10_000)
+    parser.add_argument("--suppliers", type=int, default=500)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    path = use_sqlite(args.db)
+    start = time.perf_counter()
+    counts = fill_catalog(args.products, args.suppliers, args.users, args.seed)
+    print(f"{path}: " + ", ".join(f"{count:,} {table}" for table, count in counts.items())
+          + f" in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# Shared helpers for the benchmark scripts
+import os
+import statistics
+import tempfile
+import time
+
+
+def use_sqlite(path=None):
+    """Point the app at a SQLite file (must run before `import app`)"""
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(prefix="chatbot-bench-"), "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    # A fresh file has no catalog tables, so let the app create them too
+    os.environ.setdefault("DB_CREATE_SCHEMA", "1")
+    return path
+
+
+def time_calls(func, items, repeat=1):
+    """Call func once per item and return the per-call latencies in seconds"""
+    latencies = []
+    for _ in range(repeat):
+        for item in items:
+            start = time.perf_counter()
+            func(item)
+            latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def summarize(latencies):
+    """Mean and percentile latencies in milliseconds"""
+    ordered = sorted(latencies)
+
+    def pct(p):
+        return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] * 1000
+
+    return {
+        "count": len(ordered),
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": pct(50),
+        "p95_ms": pct(95),
+        "p99_ms": pct(99),
+    }
+
+
+def print_summary(name, latencies):
+    stats = summarize(latencies)
+    print(f"{name:<40} n={stats['count']:<6} mean={stats['mean_ms']:.3f}ms "
+          f"p50={stats['p50_ms']:.3f}ms p95={stats['p95_ms']:.3f}ms p99={stats['p99_ms']:.3f}ms")
+    return stats
+
+
+def write_results(path, benchmark, params, results):
+    """Save {name: summarize(...) stats} as JSON so runs can be compared later"""
+    import json
+    import platform
+    import sys
+
+    with open(path, "w") as f:
+        json.dump({
+            "benchmark": benchmark,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "params": params,
+            "results": results,
+        }, f, indent=2)
+    print(f"\nResults written to {path}")
+
+
+def compare_results(baseline_path, results, key="p50_ms"):
+    """Print each result's `key` next to the baseline run's, with the change"""
+    import json
+
+    with open(baseline_path) as f:
+        baseline = json.load(f)["results"]
+    print(f"\n{'compared with ' + baseline_path:<48} {'baseline':>10} {'now':>10} {'change':>8}  ({key})")
+    for name, stats in results.items():
+        before = baseline.get(name, {}).get(key)
+        now = stats.get(key)
+        if before is None or now is None:
+            print(f"{name:<48} {'-':>10} {now if now is not None else '-':>10}")
+            continue
+        change = f"{(now - before) / before:+.0%}" if before else "-"
+        print(f"{name:<48} {before:>10.3f} {now:>10.3f} {change:>8}")
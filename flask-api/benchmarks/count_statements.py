@@ -0,0 +1,125 @@
+"""Count the SQL statements and commits issued per /chatbot request.
+
+Each conversation turn should be written in a single transaction: the message
+inserts plus, when suggestion uses are written per turn, one UPDATE of the
+suggestion counters, with no refresh SELECTs. Any other statements come from
+the intent's own lookup queries.
+
+The check runs twice, each in its own process because the setting is read at
+import: with suggestion uses counted in memory (the default), where a request
+must not UPDATE anything and one flush must write every use with a single
+UPDATE in one commit; and with SUGGESTION_FLUSH_INTERVAL=0, where each request
+must run exactly that one atomic usage_count UPDATE. Exits non-zero if a
+request commits more than once or its writes differ from that.
+"""
+import argparse
+import asyncio
+import os
+import re
+import subprocess
+import sys
+from collections import Counter
+
+MESSAGES = [
+    "help",
+    "List all products",
+    "Show brands",
+    "How many products do we have?",
+    "Give email id of supplier Avantika Patil",
+    "hello there",
+]
+MAX_WRITES = 3
+
+
+def run_check():
+    from benchmarks.common import use_sqlite
+
+    use_sqlite()
+    import httpx
+    from sqlalchemy import event, select
+
+    import app
+
+    in_memory = app.suggestion_counter is not None
+    expected_updates = 0 if in_memory else 1
+    print(f"Suggestion uses {'counted in memory' if in_memory else 'written per turn'} "
+          f"(SUGGESTION_FLUSH_INTERVAL={app.config.SUGGESTION_FLUSH_INTERVAL:g})")
+    app.blocking_executor = None
+    app.initialize_suggestions()
+    counts = Counter()
+
+    @event.listens_for(app.engine, "before_cursor_execute")
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        counts[re.match(r"\s*(\w+)", statement).group(1).upper()] += 1
+
+    @event.listens_for(app.engine, "commit")
+    def count_commit(conn):
+        counts["COMMIT"] += 1
+
+    failures = 0
+    transport = httpx.ASGITransport(app=app.app)
+    print(f"{'message':<45} {'SELECT':>6} {'INSERT':>6} {'UPDATE':>6} {'COMMIT':>6}")
+
+    async def run():
+        nonlocal failures
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for message in MESSAGES:
+                counts.clear()
+                response = await client.post("/chatbot", json={"message": message})
+                response.raise_for_status()
+                writes = counts["INSERT"] + counts["UPDATE"]
+                print(f"{message:<45} {counts['SELECT']:>6} {counts['INSERT']:>6} {counts['UPDATE']:>6} {counts['COMMIT']:>6}")
+                if counts["COMMIT"] > 1 or writes > MAX_WRITES or counts["UPDATE"] != expected_updates:
+                    failures += 1
+
+    asyncio.run(run())
+
+    with app.engine.connect() as conn:
+        stored_before = conn.execute(
+            select(app.SuggestionDB.usage_count).where(app.SuggestionDB.content == "List all products")
+        ).scalar()
+    if in_memory:
+        # Everything recorded above goes out in one statement and one commit
+        clicks = sum(message in app.suggestion_counter.ids for message in MESSAGES)
+        counts.clear()
+        flushed = app.suggestion_counter.flush()
+        print(f"{'flush (' + str(flushed['uses']) + ' uses)':<45} {counts['SELECT']:>6} {counts['INSERT']:>6} "
+              f"{counts['UPDATE']:>6} {counts['COMMIT']:>6}")
+        if counts["UPDATE"] != 1 or counts["COMMIT"] != 1 or flushed["uses"] != clicks:
+            failures += 1
+        with app.engine.connect() as conn:
+            stored = conn.execute(
+                select(app.SuggestionDB.usage_count).where(app.SuggestionDB.content == "List all products")
+            ).scalar()
+        if stored != stored_before + 1:
+            print(f"usage_count after the flush is {stored}, expected {stored_before + 1}")
+            failures += 1
+    elif stored_before != 1:
+        print(f"usage_count of the clicked suggestion is {stored_before}, expected 1")
+        failures += 1
+
+    print("OK\n" if not failures else
+          f"{failures} check(s) failed: more than one commit, over {MAX_WRITES} writes or wrong suggestion UPDATEs\n")
+    return 1 if failures else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--worker", action="store_true", help="run one check with the current environment")
+    args = parser.parse_args()
+    if args.worker:
+        return run_check()
+
+    failed = 0
+    for interval in (None, "0"):
+        env = dict(os.environ)
+        env.pop("SUGGESTION_FLUSH_INTERVAL", None)
+        if interval is not None:
+            env["SUGGESTION_FLUSH_INTERVAL"] = interval
+        sys.stdout.flush()
+        failed |= subprocess.run([sys.executable, "-m", "benchmarks.count_statements", "--worker"], env=env).returncode
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""Concurrent-request latency for the chatbot API, inline vs executor.
+
+Fires batches of concurrent /chatbot, /history and /suggestions requests at the
+app in-process. It runs once with blocking work inline on the event loop (how
+the endpoints used to behave) and once with the bounded executor. --sql-delay
+adds a sleep before every SQL statement to emulate a slow SQL Server.
+
+Keep --concurrency below the connection pool limit. In inline mode a request
+that waits for a pooled connection blocks the very event loop that would
+release one, so the "before" run deadlocks instead of just being slow.
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.common import use_sqlite, print_summary
+
+use_sqlite()
+import httpx  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+import app  # noqa: E402
+
+REQUESTS = [
+    ("POST", "/chatbot", {"message": "List all products"}),
+    ("POST", "/chatbot", {"message": "How many products in stock?"}),
+    ("GET", "/history?limit=20", None),
+    ("GET", "/suggestions", None),
+]
+
+
+async def run_load(concurrency, total):
+    transport = httpx.ASGITransport(app=app.app)
+    latencies = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one(i):
+            method, path, body = REQUESTS[i % len(REQUESTS)]
+            start = time.perf_counter()
+            response = await client.request(method, path, json=body)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+        started = time.perf_counter()
+        for offset in range(0, total, concurrency):
+            await asyncio.gather(*(one(i) for i in range(offset, min(total, offset + concurrency))))
+        elapsed = time.perf_counter() - started
+    return latencies, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=160)
+    parser.add_argument("--sql-delay", type=float, default=0.01, help="seconds slept before each SQL statement")
+    args = parser.parse_args()
+
+    if args.sql_delay > 0:
+        @event.listens_for(app.engine, "before_cursor_execute")
+        def slow_sql(*_):
+            time.sleep(args.sql_delay)
+
+    app.initialize_suggestions()
+    executor = app.blocking_executor
+    for name, mode in (("inline (event loop)", None), ("bounded executor", executor)):
+        app.blocking_executor = mode
+        latencies, elapsed = asyncio.run(run_load(args.concurrency, args.requests))
+        print_summary(name, latencies)
+        print(f"{'':<32} throughput={len(latencies) / elapsed:.1f} req/s")
+
+
+if __name__ == "__main__":
+    main()
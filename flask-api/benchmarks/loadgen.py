@@ -0,0 +1,154 @@
+"""In-process load generator for the chatbot API.
+
+Runs the app's startup hook, waits for the background warm-up, then drives
+--users closed-loop virtual users over httpx's ASGI transport (no network,
+no server process): each user sends its next request as soon as the previous
+one answers. Requests follow --mix, e.g. "chatbot=8,history=1,suggestions=1":
+
+- POST /chatbot with a message from the golden intent corpus; each virtual
+  user keeps its own session_id, as a browser tab would
+- GET /history?limit=20
+- GET /suggestions
+
+The first --warmup requests are not measured. Reports count, errors,
+p50/p95/p99 latency and throughput per endpoint and overall; --json saves
+them and --baseline compares with an earlier saved run.
+
+The catalog comes from benchmarks.catalog. Pass --db to reuse a database
+across runs (it is filled only when it has no products yet), so before and
+after runs measure the same data:
+
+    python -m benchmarks.loadgen --db /tmp/load.db --json before.json
+    python -m benchmarks.loadgen --db /tmp/load.db --baseline before.json
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+
+from benchmarks.common import compare_results, summarize, use_sqlite, write_results
+
+ENDPOINTS = {
+    "chatbot": ("POST", "/chatbot"),
+    "history": ("GET", "/history?limit=20"),
+    "suggestions": ("GET", "/suggestions"),
+}
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"unknown endpoint {name.strip()!r}; use {', '.join(ENDPOINTS)}")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+async def run_load(app, args, messages):
+    import httpx
+
+    rng = random.Random(args.seed)
+    names = list(args.mix)
+    plan = rng.choices(names, [args.mix[name] for name in names], k=args.warmup + args.requests)
+    latencies = {name: [] for name in names}
+    errors = {name: 0 for name in names}
+    next_request = 0
+    measured_from = None
+
+    transport = httpx.ASGITransport(app=app.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadgen", timeout=60) as client:
+        async def virtual_user(user):
+            nonlocal next_request, measured_from
+            session_id = f"loadgen-{user}"
+            user_rng = random.Random(args.seed * 1000 + user)
+            while next_request < len(plan):
+                i = next_request
+                next_request += 1
+                if i == args.warmup:
+                    measured_from = time.perf_counter()
+                name = plan[i]
+                method, path = ENDPOINTS[name]
+                body = {"message": user_rng.choice(messages), "session_id": session_id} if method == "POST" else None
+                start = time.perf_counter()
+                try:
+                    response = await client.request(method, path, json=body)
+                    failed = response.status_code >= 400
+                except httpx.HTTPError:
+                    failed = True
+                elapsed = time.perf_counter() - start
+                if i >= args.warmup:
+                    latencies[name].append(elapsed)
+                    errors[name] += failed
+
+        await asyncio.gather(*(virtual_user(user) for user in range(args.users)))
+    elapsed = time.perf_counter() - measured_from
+    return latencies, errors, elapsed
+
+
+async def run(args):
+    import app
+    from benchmarks.bench_intents import load_corpus
+    from benchmarks.catalog import fill_catalog
+
+    with app.SessionLocal() as db:
+        filled = app.get_products_count(db)
+    if not filled:
+        fill_catalog(args.products, args.suppliers, args.users_rows, args.seed)
+
+    await app.startup_event()
+    try:
+        start = time.perf_counter()
+        await asyncio.get_running_loop().run_in_executor(None, app.startup_report.finished.wait)
+        print(f"Warm-up finished in {time.perf_counter() - start:.1f}s; "
+              f"{args.users} virtual users, {args.requests:,} requests (+{args.warmup} warm-up)\n")
+        messages = [message for message, _ in load_corpus()]
+        latencies, errors, elapsed = await run_load(app, args, messages)
+    finally:
+        await app.shutdown_event()
+
+    results = {}
+    print(f"{'endpoint':<12} {'count':>7} {'errors':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>8}")
+    everything = [latency for values in latencies.values() for latency in values]
+    for name, values in list(latencies.items()) + [("all", everything)]:
+        if not values:
+            continue
+        stats = summarize(values)
+        stats["errors"] = sum(errors.values()) if name == "all" else errors[name]
+        stats["throughput_rps"] = len(values) / elapsed
+        results[name] = stats
+        print(f"{name:<12} {stats['count']:>7} {stats['errors']:>6} {stats['p50_ms']:>8.2f} "
+              f"{stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f} {stats['throughput_rps']:>8.1f}")
+
+    if args.json:
+        params = {key: value for key, value in vars(args).items() if key not in ("json", "baseline")}
+        write_results(args.json, "loadgen", params, results)
+    if args.baseline:
+        for key in ("p50_ms", "p99_ms", "throughput_rps"):
+            compare_results(args.baseline, results, key)
+    return 1 if results["all"]["errors"] else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", help="SQLite file to use (default: a new temporary file)")
+    parser.add_argument("--users", type=int, default=20, help="concurrent virtual users")
+    parser.add_argument("--requests", type=int, default=3000, help="measured requests")
+    parser.add_argument("--warmup", type=int, default=200, help="requests sent before measuring")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("chatbot=8,history=1,suggestions=1"))
+    parser.add_argument("--products", type=int, default=10_000)
+    parser.add_argument("--suppliers", type=int, default=500)
+    parser.add_argument("--users-rows", type=int, default=200, help="rows in the Users table")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="compare with this earlier --json file")
+    args = parser.parse_args()
+
+    # The database has to be chosen before the app is imported
+    use_sqlite(args.db)
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+# cache.py
+import functools
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire `ttl` seconds after being set"""
+
+    def __init__(self, maxsize: int = 128, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def lookup(self, key: Hashable) -> Tuple[bool, Any]:
+        """Return (found, value) and count the hit or miss"""
+        with self.lock:
+            entry = self.data.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self.data.move_to_end(key)
+                    self.hits += 1
+                    return True, value
+                del self.data[key]
+                self.expirations += 1
+            self.misses += 1
+            return False, None
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        found, value = self.lookup(key)
+        return value if found else default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        with self.lock:
+            self.data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable = _MISSING):
+        """Drop one key, or everything when no key is given"""
+        with self.lock:
+            if key is _MISSING:
+                self.data.clear()
+            else:
+                self.data.pop(key, None)
+
+    def keys(self) -> List[Hashable]:
+        with self.lock:
+            return list(self.data)
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self.data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+class QueryCache:
+    """Named TTL caches in front of query functions that take a DB session first.
+
+    The session is left out of the cache key, so results must not depend on
+    session state (detach ORM objects before returning them). Call
+    `invalidate` when the underlying data changes; `start_refresher` reloads
+    cached keys in the background before they expire.
+    """
+
+    def __init__(self):
+        self.caches: Dict[str, TTLCache] = {}
+        self.loaders: Dict[str, Callable] = {}
+        self.listeners: List[Callable[[Optional[str]], None]] = []
+        self.refresher = None
+        self.stopping = threading.Event()
+
+    def cached(self, name: str, ttl: float, maxsize: int = 128):
+        def decorator(func):
+            if ttl <= 0:
+                return func
+            cache = TTLCache(maxsize, ttl)
+            self.caches[name] = cache
+            self.loaders[name] = func
+
+            @functools.wraps(func)
+            def wrapper(db, *args, **kwargs):
+                key = (args, tuple(sorted(kwargs.items())))
+                found, value = cache.lookup(key)
+                if found:
+                    return value
+                value = func(db, *args, **kwargs)
+                cache.set(key, value)
+                return value
+
+            wrapper.cache = cache
+            return wrapper
+        return decorator
+
+    def on_invalidate(self, callback: Callable[[Optional[str]], None]):
+        """Register a hook called with the cache name (None for all) on invalidation"""
+        self.listeners.append(callback)
+
+    def invalidate(self, name: Optional[str] = None):
+        for cache_name, cache in self.caches.items():
+            if name is None or cache_name == name:
+                cache.invalidate()
+        for callback in self.listeners:
+            callback(name)
+
+    def refresh(self, session_factory):
+        """Reload every cached key, plus the no-argument call, with a fresh session"""
+        db = session_factory()
+        try:
+            for name, cache in self.caches.items():
+                loader = self.loaders[name]
+                for key in set(cache.keys()) | {((), ())}:
+                    args, kwargs = key
+                    cache.set(key, loader(db, *args, **dict(kwargs)))
+        finally:
+            db.close()
+
+    def start_refresher(self, session_factory, interval: float):
+        """Refresh all caches every `interval` seconds so requests never see a cold cache"""
+        def run():
+            while not self.stopping.wait(interval):
+                try:
+                    self.refresh(session_factory)
+                except Exception as ex:
+                    print(f"Warning: cache refresh failed: {ex}")
+
+        self.refresh(session_factory)
+        self.refresher = threading.Thread(target=run, name="cache-refresher", daemon=True)
+        self.refresher.start()
+
+    def stop(self):
+        self.stopping.set()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: cache.stats() for name, cache in self.caches.items()}
@@ -0,0 +1,166 @@
+# config.py
+import os
+
+
+def env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, default))
+
+
+def env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, default))
+
+
+def env_list(name: str, default: str) -> list:
+    return [item.strip() for item in os.getenv(name, default).split(",") if item.strip()]
+
+
+def env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# Concurrency: blocking work (SQL Server queries, spaCy parsing) runs on a bounded
+# thread pool so it never stalls the event loop. 0 runs it inline on the loop.
+BLOCKING_WORKERS = env_int("BLOCKING_WORKERS", 8)
+
+# /chatbot/batch parses its messages with nlp.pipe in batches of NLP_BATCH_SIZE,
+# spread over NLP_N_PROCESS worker processes (1 parses in the request thread).
+# Extra processes only pay off for large batches with a full trained pipeline.
+NLP_BATCH_SIZE = env_int("NLP_BATCH_SIZE", 64)
+NLP_N_PROCESS = env_int("NLP_N_PROCESS", 1)
+CHATBOT_BATCH_MAX_MESSAGES = env_int("CHATBOT_BATCH_MAX_MESSAGES", 5000)
+
+# Database connection pool. Pre-ping checks a pooled connection before handing it
+# out and recycle replaces connections older than N seconds, so connections that
+# SQL Server or a firewall dropped while idle aren't handed to a request.
+DB_POOL_SIZE = env_int("DB_POOL_SIZE", 5)
+DB_MAX_OVERFLOW = env_int("DB_MAX_OVERFLOW", 10)
+DB_POOL_TIMEOUT = env_int("DB_POOL_TIMEOUT", 30)
+DB_POOL_RECYCLE = env_int("DB_POOL_RECYCLE", 1800)
+DB_POOL_PRE_PING = env_bool("DB_POOL_PRE_PING", True)
+# Connections to open at startup so the first requests don't pay for the ODBC connect
+DB_POOL_WARMUP = env_int("DB_POOL_WARMUP", 0)
+
+# Write-behind chat history: messages are queued in memory and bulk-inserted by a
+# background thread instead of inline before each reply. Ids are reserved ahead in
+# blocks, so when enabled it must be enabled on every instance writing messages.
+# Replies show up in /history once their batch is flushed.
+MESSAGE_WRITE_BEHIND = env_bool("MESSAGE_WRITE_BEHIND", False)
+WRITE_BEHIND_QUEUE_SIZE = env_int("WRITE_BEHIND_QUEUE_SIZE", 10000)
+WRITE_BEHIND_BATCH_SIZE = env_int("WRITE_BEHIND_BATCH_SIZE", 200)
+WRITE_BEHIND_FLUSH_INTERVAL = env_float("WRITE_BEHIND_FLUSH_INTERVAL", 0.5)
+# How long a request waits for queue space before writing its messages inline
+WRITE_BEHIND_PUT_TIMEOUT = env_float("WRITE_BEHIND_PUT_TIMEOUT", 1.0)
+MESSAGE_ID_BLOCK_SIZE = env_int("MESSAGE_ID_BLOCK_SIZE", 1000)
+
+# Reference-data caching (seconds; 0 disables caching for that entity). These
+# tables change rarely, so short TTLs avoid a full-table query per question.
+CACHE_TTL_CATEGORIES = env_float("CACHE_TTL_CATEGORIES", 300)
+CACHE_TTL_BRANDS = env_float("CACHE_TTL_BRANDS", 300)
+CACHE_TTL_SUPPLIERS = env_float("CACHE_TTL_SUPPLIERS", 120)
+CACHE_TTL_PERMISSIONS = env_float("CACHE_TTL_PERMISSIONS", 60)
+# Row-count snapshot behind the database_info and product_count replies
+CACHE_TTL_STATS = env_float("CACHE_TTL_STATS", 30)
+CACHE_MAX_ENTRIES = env_int("CACHE_MAX_ENTRIES", 128)
+# Reload cached entries every N seconds in the background (0 = only on expiry)
+CACHE_REFRESH_INTERVAL = env_float("CACHE_REFRESH_INTERVAL", 0)
+
+# Whole-response cache for intents whose reply depends only on the intent and its
+# entities. Remove an intent from the list to stop caching it; TTL 0 disables it.
+RESPONSE_CACHE_TTL = env_float("RESPONSE_CACHE_TTL", 60)
+RESPONSE_CACHE_SIZE = env_int("RESPONSE_CACHE_SIZE", 256)
+RESPONSE_CACHE_INTENTS = env_list("RESPONSE_CACHE_INTENTS", "help,product_categories,brands")
+
+# In-memory product/supplier name index used instead of LIKE '%term%' scans.
+# Changed rows are picked up incrementally at most every N seconds.
+NAME_INDEX_ENABLED = env_bool("NAME_INDEX_ENABLED", True)
+NAME_INDEX_REFRESH_SECONDS = env_float("NAME_INDEX_REFRESH_SECONDS", 60)
+# A term matching more than this share of the table (e.g. "camera") is looked up
+# with LIKE: one scan is cheaper than fetching that many rows by primary key
+NAME_INDEX_MAX_MATCH_RATIO = env_float("NAME_INDEX_MAX_MATCH_RATIO", 0.1)
+
+# Minimum similarity (0-1) for a product/supplier name to count as a match when
+# answering "price of X" / "email of Y"; lower tolerates more typos
+FUZZY_MATCH_MIN_SCORE = env_float("FUZZY_MATCH_MIN_SCORE", 0.7)
+
+# /history pages are capped at HISTORY_MAX_LIMIT messages; /history/export streams
+# everything, reading HISTORY_EXPORT_CHUNK_SIZE rows from the database at a time
+HISTORY_MAX_LIMIT = env_int("HISTORY_MAX_LIMIT", 500)
+HISTORY_EXPORT_CHUNK_SIZE = env_int("HISTORY_EXPORT_CHUNK_SIZE", 1000)
+
+# Retention: conversations idle for more than MESSAGE_RETENTION_DAYS are moved from
+# messages to messages_archive every MESSAGE_RETENTION_INTERVAL seconds, in batches
+# of MESSAGE_ARCHIVE_BATCH_SIZE sessions. 0 days turns the background job off.
+MESSAGE_RETENTION_DAYS = env_float("MESSAGE_RETENTION_DAYS", 0)
+MESSAGE_RETENTION_INTERVAL = env_float("MESSAGE_RETENTION_INTERVAL", 3600)
+MESSAGE_ARCHIVE_BATCH_SIZE = env_int("MESSAGE_ARCHIVE_BATCH_SIZE", 500)
+
+# Most products a cheapest / most expensive / price range reply lists
+PRICE_QUERY_MAX_RESULTS = env_int("PRICE_QUERY_MAX_RESULTS", 50)
+
+# Low stock: inventory_management replies list products with at most LOW_STOCK_THRESHOLD
+# units, lowest first, up to LOW_STOCK_MAX_RESULTS of them. A filtered index covers
+# exactly that range; its name includes the threshold, so drop the old one after a change.
+LOW_STOCK_THRESHOLD = env_int("LOW_STOCK_THRESHOLD", 5)
+LOW_STOCK_MAX_RESULTS = env_int("LOW_STOCK_MAX_RESULTS", 50)
+
+# Back-in-stock alerts: every STOCK_ALERT_INTERVAL seconds the pending alerts are checked
+# against current stock, STOCK_ALERT_BATCH_SIZE at a time, and a message is posted to each
+# conversation whose product is available again. 0 turns the background check off.
+STOCK_ALERT_INTERVAL = env_float("STOCK_ALERT_INTERVAL", 60)
+STOCK_ALERT_BATCH_SIZE = env_int("STOCK_ALERT_BATCH_SIZE", 500)
+
+# Instrumentation: /metrics serves Prometheus text-format counters and histograms
+# (per-stage and per-intent latency, DB queries per request, cache hit ratios), and
+# SERVER_TIMING adds a Server-Timing header with each request's stage durations
+METRICS_ENABLED = env_bool("METRICS_ENABLED", True)
+SERVER_TIMING = env_bool("SERVER_TIMING", True)
+
+# Startup. The NLP pipeline loads in the background once the server is listening and
+# /ready answers 200 when the warm-up is done. The app's own tables (messages,
+# suggestions, stock alerts, ...) are created and migrated at every start; catalog
+# tables, columns and indexes only with DB_CREATE_SCHEMA on, as the catalog schema
+# belongs to the backend's migrations.
+#
+# NLP_BACKEND picks the pipeline (nlp_backends.py): "full" loads all of SPACY_MODEL,
+# "trimmed" leaves out the SPACY_EXCLUDE components, and "rules" loads no model at all,
+# only an entity ruler over the catalog's product and supplier names, rebuilt every
+# NLP_RULES_REFRESH_SECONDS. "rules" has no POS tags, parse or statistical entities.
+NLP_BACKEND = os.getenv("NLP_BACKEND", "trimmed")
+SPACY_MODEL = os.getenv("SPACY_MODEL", "en_core_web_sm")
+SPACY_EXCLUDE = env_list("SPACY_EXCLUDE", "lemmatizer,senter")
+NLP_RULES_REFRESH_SECONDS = env_float("NLP_RULES_REFRESH_SECONDS", 300)
+DB_CREATE_SCHEMA = env_bool("DB_CREATE_SCHEMA", False)
+
+# Intent fallback: messages no INTENT_PATTERNS entry matches are compared with the
+# INTENT_EXAMPLES utterances (TF-IDF over word and character n-grams) and take the
+# intent of the closest one if its cosine similarity reaches the threshold
+INTENT_SIMILARITY_ENABLED = env_bool("INTENT_SIMILARITY_ENABLED", True)
+INTENT_SIMILARITY_THRESHOLD = env_float("INTENT_SIMILARITY_THRESHOLD", 0.4)
+
+# Suggestion usage is counted in memory and /suggestions is served from there. The
+# counts are written to the suggestions table in one batch every SUGGESTION_FLUSH_INTERVAL
+# seconds, or as soon as SUGGESTION_FLUSH_MAX_PENDING uses are waiting, and on shutdown;
+# a crash loses at most that much. 0 writes each use with its conversation turn instead.
+SUGGESTION_FLUSH_INTERVAL = env_float("SUGGESTION_FLUSH_INTERVAL", 10)
+SUGGESTION_FLUSH_MAX_PENDING = env_int("SUGGESTION_FLUSH_MAX_PENDING", 1000)
+
+# /autocomplete: prefix lookups over suggestions (ranked by usage) and product and
+# supplier names, from an in-memory index rebuilt every AUTOCOMPLETE_REFRESH_SECONDS.
+# Added suggestions are merged into it once AUTOCOMPLETE_PENDING_LIMIT are waiting.
+AUTOCOMPLETE_ENABLED = env_bool("AUTOCOMPLETE_ENABLED", True)
+AUTOCOMPLETE_REFRESH_SECONDS = env_float("AUTOCOMPLETE_REFRESH_SECONDS", 300)
+AUTOCOMPLETE_MAX_RESULTS = env_int("AUTOCOMPLETE_MAX_RESULTS", 10)
+AUTOCOMPLETE_PENDING_LIMIT = env_int("AUTOCOMPLETE_PENDING_LIMIT", 100)
+
+# list_products and list_users replies show LIST_PAGE_SIZE rows ("show 5 products" asks
+# for up to LIST_PAGE_MAX); "next 10 products" continues after the last row the
+# conversation was shown, remembered for LIST_PAGE_TTL seconds for up to LIST_PAGE_SESSIONS
+# conversations. Unbounded lists (out of stock) are read LIST_STREAM_CHUNK_SIZE rows at a time.
+LIST_PAGE_SIZE = env_int("LIST_PAGE_SIZE", 10)
+LIST_PAGE_MAX = env_int("LIST_PAGE_MAX", 50)
+LIST_PAGE_TTL = env_float("LIST_PAGE_TTL", 1800)
+LIST_PAGE_SESSIONS = env_int("LIST_PAGE_SESSIONS", 10000)
+LIST_STREAM_CHUNK_SIZE = env_int("LIST_STREAM_CHUNK_SIZE", 1000)
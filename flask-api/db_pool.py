@@ -0,0 +1,117 @@
+# db_pool.py
+import bisect
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy import event, exc, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+# Upper bounds (seconds) of the checkout wait histogram buckets
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+
+class PoolMetrics:
+    """Counts connection pool activity and how long checkouts wait for a connection.
+
+    Engines built with `pool_class` (a QueuePool subclass bound to this object)
+    report their checkout waits, including the time spent opening a new
+    connection. `attach` adds the event-based counters.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS) + 1)
+        self.engine = None
+
+        metrics = self
+
+        class MeteredQueuePool(QueuePool):
+            def _do_get(self):
+                start = time.perf_counter()
+                try:
+                    return super()._do_get()
+                except exc.TimeoutError:
+                    metrics.record_timeout()
+                    raise
+                finally:
+                    metrics.record_wait(time.perf_counter() - start)
+
+        self.pool_class = MeteredQueuePool
+
+    def attach(self, engine: Engine):
+        self.engine = engine
+        event.listen(engine, "connect", lambda *_: self._increment("connects"))
+        event.listen(engine, "checkout", lambda *_: self._increment("checkouts"))
+        event.listen(engine, "checkin", lambda *_: self._increment("checkins"))
+        event.listen(engine, "invalidate", lambda *_: self._increment("invalidations"))
+
+    def _increment(self, name: str):
+        with self.lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def record_wait(self, seconds: float):
+        with self.lock:
+            self.wait_count += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            self.wait_buckets[bisect.bisect_left(WAIT_BUCKETS, seconds)] += 1
+
+    def record_timeout(self):
+        self._increment("timeouts")
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            stats = {
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "wait": {
+                    "count": self.wait_count,
+                    "total_seconds": self.wait_total,
+                    "max_seconds": self.wait_max,
+                    "mean_seconds": self.wait_total / self.wait_count if self.wait_count else 0.0,
+                    "buckets": {
+                        **{f"le_{bound}": count for bound, count in zip(WAIT_BUCKETS, self.wait_buckets)},
+                        "le_inf": self.wait_buckets[-1],
+                    },
+                },
+            }
+        pool = self.engine.pool if self.engine is not None else None
+        if isinstance(pool, QueuePool):
+            stats["pool"] = {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": pool.overflow(),
+            }
+        return stats
+
+
+def warm_up_pool(engine: Engine, count: int) -> int:
+    """Open up to `count` connections ahead of time and return them to the pool"""
+    pool = engine.pool
+    if isinstance(pool, QueuePool):
+        # Connections beyond the pool size are overflow and get closed on checkin
+        count = min(count, pool.size())
+    connections = []
+    try:
+        for _ in range(count):
+            connection = engine.connect()
+            connection.execute(text("SELECT 1"))
+            connections.append(connection)
+    finally:
+        for connection in connections:
+            connection.close()
+    return len(connections)
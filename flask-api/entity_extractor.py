@@ -0,0 +1,146 @@
+# entity_extractor.py
+import decimal
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple, Union
+
+from intent_matcher import PrioritizedPatterns
+
+
+def captured_text(key: Any, match: re.Match) -> str:
+    return match.group(1).strip()
+
+
+def pattern_key(key: Any, match: re.Match) -> Any:
+    return key
+
+
+def captured_int(key: Any, match: re.Match) -> int:
+    return int(match.group(1))
+
+
+def captured_decimal(key: Any, match: re.Match) -> decimal.Decimal:
+    return decimal.Decimal(match.group(1).replace(",", ""))
+
+
+@dataclass(frozen=True)
+class ExtractionRule:
+    """Sets `entity` from the first of `patterns` (in list order) that matches.
+
+    Patterns are plain strings or (key, pattern) pairs; `value` turns the key and
+    the match into the stored value. Rules run in order, so a later rule for the
+    same entity overrides an earlier one.
+    """
+    entity: str
+    patterns: Sequence[Union[str, Tuple[Any, str]]]
+    value: Callable[[Any, re.Match], Any] = captured_text
+
+
+# What attribute/field they're looking for, checked field by field in this order
+FIELD_PATTERNS = {
+    "email": [r"email\s+(?:id|address)", r"e-?mail"],
+    "phone": [r"phone\s+(?:number|no\.?)", r"contact\s+number"],
+    "address": [r"address", r"location"],
+    "price": [r"price", r"cost", r"how much"],
+    "stock": [r"stock", r"inventory", r"available"]
+}
+
+ENTITY_RULES = [
+    # Look for product names after terms like "find" or "search"
+    ExtractionRule("product_name", [r"find\s+([\w\s]+)", r"search\s+for\s+([\w\s]+)", r"looking\s+for\s+([\w\s]+)"]),
+    # Supplier name
+    ExtractionRule("supplier_name", [
+        r"(?:supplier|vendor)\s+([A-Za-z\s]+?)(?:\s+(?:email|phone|contact|address)|$)",
+        r"(?:email|phone|contact|address)\s+(?:of|for)\s+(?:supplier|vendor)\s+([A-Za-z\s]+)(?:\?|$)",
+        r"(?:email|phone|contact|address)\s+(?:of|for)\s+([A-Za-z\s]+)(?:\?|$)"
+    ]),
+    # Product price questions name the product more precisely than a search does
+    ExtractionRule("product_name", [
+        r"price\s+of\s+([\w\s\d]+?)(?:\?|$)",
+        r"how\s+much\s+(?:is|does|costs?)\s+([\w\s\d]+?)(?:\?|$)",
+        r"what(?:'s|\s+is)\s+the\s+price\s+of\s+([\w\s\d]+?)(?:\?|$)"
+    ]),
+    # The product a back-in-stock alert is for ("notify me when the Wireless Mouse is back in stock")
+    ExtractionRule("product_name", [
+        r"(?:notify|tell|alert)\s+me\s+when\s+(?:the\s+)?([\w\s\d]+?)\s+(?:is|are|comes?)\s+(?:back|available|in\s+stock|restocked)",
+        r"let\s+me\s+know\s+when\s+(?:the\s+)?([\w\s\d]+?)\s+(?:is|are|comes?)\s+(?:back|available|in\s+stock|restocked)",
+        r"stock\s+alerts?\s+(?:for|on)\s+(?:the\s+)?([\w\s\d]+?)(?:\?|$)"
+    ]),
+    ExtractionRule(
+        "requested_field",
+        [(field, pattern) for field, patterns in FIELD_PATTERNS.items() for pattern in patterns],
+        value=pattern_key
+    ),
+    # Numbers for potential quantities or IDs
+    ExtractionRule("quantity", [r"(\d+)\s+(?:products?|items?|users?)"], value=captured_int),
+    # How many results for top-N questions ("top 5", "3 cheapest")
+    ExtractionRule("limit", [
+        r"(?:top|first)\s+(\d+)",
+        r"(\d+)\s+(?:cheapest|least\s+expensive|most\s+expensive|priciest|lowest|highest)"
+    ], value=captured_int),
+    # Continuing a list reply from where the conversation's last page ended
+    ExtractionRule("page", [("next", r"\bnext\b"), ("next", r"\bmore\s+(?:products|items|users)")], value=pattern_key),
+    # Which end of the price range they want ("most expensive laptops under $500")
+    ExtractionRule("price_order", [
+        ("desc", r"most\s+expensive|priciest|highest[\s-]+priced?|most\s+costly"),
+        ("asc", r"cheapest|least\s+expensive|lowest[\s-]+priced?|most\s+affordable"),
+    ], value=pattern_key),
+    # Low-stock cutoff ("products with fewer than 10 units")
+    ExtractionRule("stock_below", [
+        r"(?:below|under|less\s+than|fewer\s+than)\s+(\d+)\s+(?:units?|items?|pieces?|left|in\s+stock)"
+    ], value=captured_int),
+    # Price bounds ("between $10 and $50", "under $100", "over 200 dollars")
+    ExtractionRule("price_min", [
+        r"between\s+\$?\s*(\d[\d,]*(?:\.\d+)?)\s*(?:and|-|to)\s*\$?\s*\d",
+        r"from\s+\$\s*(\d[\d,]*(?:\.\d+)?)\s*(?:-|to)\s*\$?\s*\d",
+        r"(?:over|above|more\s+than|at\s+least)\s+\$?\s*(\d[\d,]*(?:\.\d+)?)"
+    ], value=captured_decimal),
+    ExtractionRule("price_max", [
+        r"between\s+\$?\s*\d[\d,]*(?:\.\d+)?\s*(?:and|-|to)\s*\$?\s*(\d[\d,]*(?:\.\d+)?)",
+        r"from\s+\$\s*\d[\d,]*(?:\.\d+)?\s*(?:-|to)\s*\$?\s*(\d[\d,]*(?:\.\d+)?)",
+        r"(?:under|below|less\s+than|cheaper\s+than|up\s+to|at\s+most)\s+\$?\s*(\d[\d,]*(?:\.\d+)?)"
+    ], value=captured_decimal),
+]
+
+# Noun chunks containing these are unlikely to be product or supplier names
+NOUN_CHUNK_SKIP_TERMS = ("product", "category", "user", "database", "list", "all", "email", "phone")
+
+
+class EntityExtractor:
+    """Evaluates a list of ExtractionRules that are compiled once up front"""
+
+    def __init__(self, rules: Sequence[ExtractionRule] = ENTITY_RULES, skip_terms: Sequence[str] = NOUN_CHUNK_SKIP_TERMS):
+        self.rules: List[Tuple[ExtractionRule, PrioritizedPatterns]] = []
+        for rule in rules:
+            entries = [p if isinstance(p, tuple) else (index, p) for index, p in enumerate(rule.patterns)]
+            self.rules.append((rule, PrioritizedPatterns(entries, re.IGNORECASE)))
+        self.skip_terms = tuple(skip_terms)
+
+    def extract(self, message: str, noun_chunks: Iterable = (),
+                catalog_names: Iterable[Tuple[str, str]] = ()) -> Dict[str, Any]:
+        """Entities from the rules, then from `catalog_names` ((entity, text) pairs of
+        known product/supplier names found in the message), then from noun chunks"""
+        entities = {}
+        for rule, patterns in self.rules:
+            result = patterns.first(message)
+            if result is not None:
+                entities[rule.entity] = rule.value(*result)
+
+        # A name that exists in the catalog beats a guess from the noun chunks
+        if "product_name" not in entities and "supplier_name" not in entities:
+            for entity, text in catalog_names:
+                entities.setdefault(entity, text)
+
+        # If no specific product name was found, try to find noun chunks
+        if "product_name" not in entities and "supplier_name" not in entities:
+            for chunk in noun_chunks:
+                if not any(term in chunk.text.lower() for term in self.skip_terms):
+                    # Check if this could be a proper name (potential supplier)
+                    is_proper = any(token.pos_ == "PROPN" for token in chunk)
+                    if is_proper:
+                        entities["supplier_name"] = chunk.text
+                    else:
+                        entities["product_name"] = chunk.text
+                    break
+
+        return entities
@@ -0,0 +1,150 @@
+# intent_matcher.py
+import re
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse
+
+
+def _longest_literal(items) -> str:
+    """Longest run of plain characters that every match of this sequence must contain"""
+    best = run = ""
+    for op, av in items:
+        if op == sre_parse.LITERAL:
+            run += chr(av)
+            if len(run) > len(best):
+                best = run
+        else:
+            # Optional parts, classes and groups all break the run
+            run = ""
+    return best
+
+
+def _required_literals(items) -> Optional[List[str]]:
+    """One required keyword per top-level alternative, or None if any alternative has none"""
+    items = list(items)
+    if len(items) == 1:
+        op, av = items[0]
+        if op == sre_parse.SUBPATTERN and not av[1] and not av[2]:
+            return _required_literals(av[3])
+        if op == sre_parse.BRANCH:
+            literals = []
+            for branch in av[1]:
+                branch_literals = _required_literals(branch)
+                if branch_literals is None:
+                    return None
+                literals.extend(branch_literals)
+            return literals
+    literal = _longest_literal(items)
+    if literal:
+        return [literal]
+    # No plain run (e.g. "(?:discount|sale)\s+..."), so use a required group's keywords
+    for op, av in items:
+        if op in (sre_parse.SUBPATTERN, sre_parse.BRANCH):
+            literals = _required_literals([(op, av)])
+            if literals is not None:
+                return literals
+    return None
+
+
+def keyword_prefilter(pattern: str, flags: int = 0) -> Optional[List[str]]:
+    """Keywords of which at least one must appear in any text the pattern matches.
+
+    Keywords are lowercased for IGNORECASE patterns. Returns None when the
+    pattern can't be reduced to keywords, in which case it must always be run.
+    """
+    try:
+        literals = _required_literals(sre_parse.parse(pattern, flags))
+    except (re.error, RecursionError):
+        return None
+    if literals is None:
+        return None
+    if flags & re.IGNORECASE:
+        # Non-ASCII letters have case-folding rules str.lower() doesn't mirror
+        if not all(literal.isascii() for literal in literals):
+            return None
+        literals = [literal.lower() for literal in literals]
+    return sorted(set(literals))
+
+
+class PrioritizedPatterns:
+    """An ordered list of (key, regex) entries where the first entry that matches wins.
+
+    Every pattern is compiled once. Each entry also gets a set of literal
+    keywords pulled from its parse tree (e.g. "catalog" or "categor"), at least
+    one of which must occur in any text it matches. A cheap substring check on
+    those keywords skips entries that can't match, so only a handful of regexes
+    run per message, still in priority order.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[Hashable, str]], flags: int = 0):
+        self.keys: List[Hashable] = []
+        self.regexes: List[re.Pattern] = []
+        self.keywords: List[Optional[List[str]]] = []
+        for key, pattern in entries:
+            self.keys.append(key)
+            self.regexes.append(re.compile(pattern, flags))
+            self.keywords.append(keyword_prefilter(pattern, flags))
+        self.ignore_case = bool(flags & re.IGNORECASE)
+
+        # Inverted table so each distinct keyword is looked for once per text
+        self.always = frozenset(i for i, keywords in enumerate(self.keywords) if keywords is None)
+        by_keyword: Dict[str, List[int]] = {}
+        for index, keywords in enumerate(self.keywords):
+            for keyword in keywords or ():
+                by_keyword.setdefault(keyword, []).append(index)
+        self.keyword_entries = list(by_keyword.items())
+
+    def candidates(self, text: str) -> List[int]:
+        """Indices of the entries that might match text, in priority order"""
+        haystack = text
+        if self.ignore_case:
+            # Prefilter only ASCII text; anything else goes straight to the regexes
+            if not text.isascii():
+                return list(range(len(self.regexes)))
+            haystack = text.lower()
+        found = set(self.always)
+        for keyword, indices in self.keyword_entries:
+            if keyword in haystack:
+                found.update(indices)
+        return sorted(found)
+
+    def first(self, text: str) -> Optional[Tuple[Hashable, re.Match]]:
+        """Return (key, match) for the highest-priority entry that matches text"""
+        for index in self.candidates(text):
+            match = self.regexes[index].search(text)
+            if match:
+                return self.keys[index], match
+        return None
+
+    def first_key(self, text: str) -> Optional[Hashable]:
+        result = self.first(text)
+        return result[0] if result else None
+
+
+class IntentMatcher:
+    """Classifies messages against INTENT_PATTERNS with first-match-wins priority.
+
+    Intents are checked in dict order, exactly like a plain loop calling
+    re.search on every pattern. All patterns of one intent share a priority, so
+    they are compiled into one alternation per intent.
+    """
+
+    def __init__(self, intent_patterns: Dict[str, List[str]],
+                 fallbacks: Iterable[Tuple[str, str]] = (), default: str = "unknown"):
+        self.patterns = PrioritizedPatterns(
+            ((intent, "|".join(f"(?:{p})" for p in patterns)) for intent, patterns in intent_patterns.items() if patterns),
+            re.IGNORECASE
+        )
+        # Fallbacks are checked case-sensitively against the lowercased message
+        self.fallbacks = PrioritizedPatterns(fallbacks)
+        self.default = default
+
+    def match(self, message: str) -> str:
+        message_lower = message.lower()
+        intent = self.patterns.first_key(message_lower)
+        if intent is None:
+            intent = self.fallbacks.first_key(message_lower)
+        return intent if intent is not None else self.default
@@ -0,0 +1,145 @@
+# intent_similarity.py
+import math
+import re
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+WORD_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+
+def ngrams(text: str) -> List[str]:
+    """Word unigrams and bigrams plus character trigrams of each word.
+
+    The character trigrams ("<su", "sup", ...) let "supplies" and "supplier"
+    or small typos still share most of their features.
+    """
+    words = WORD_RE.findall(text.lower())
+    features = [f"w:{word}" for word in words]
+    features.extend(f"b:{first} {second}" for first, second in zip(words, words[1:]))
+    for word in words:
+        padded = f"<{word}>"
+        features.extend(f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2))
+    return features
+
+
+class IntentSimilarity:
+    """Nearest-example intent classifier over TF-IDF n-gram vectors.
+
+    The example utterances are vectorized once into a sparse (vocabulary x
+    examples) matrix with L2-normalized columns, stored as CSR arrays: most
+    n-grams occur in only a few examples. A message's cosine similarity to
+    every example is the sum of its n-grams' rows weighted by the message
+    vector, so scoring touches only the stored entries of those rows. An
+    intent scores as its closest example; below `threshold` the message keeps
+    the `default` intent. Examples listed under `default` itself (greetings,
+    small talk) catch messages that are close to nothing useful.
+    """
+
+    def __init__(self, examples: Dict[str, Sequence[str]], threshold: float = 0.4, default: str = "unknown"):
+        self.threshold = threshold
+        self.default = default
+        texts, labels = [], []
+        for intent, utterances in examples.items():
+            for utterance in utterances:
+                texts.append(utterance)
+                labels.append(intent)
+        self.intents = labels
+
+        counts = [self.term_counts(text) for text in texts]
+        self.vocabulary: Dict[str, int] = {}
+        document_frequency: List[int] = []
+        for term_counts in counts:
+            for term in term_counts:
+                index = self.vocabulary.setdefault(term, len(document_frequency))
+                if index == len(document_frequency):
+                    document_frequency.append(0)
+                document_frequency[index] += 1
+        # Smoothed IDF; terms the examples never use get the weight of one seen once
+        self.idf = np.log((1 + len(texts)) / (1 + np.array(document_frequency, dtype=np.float64))) + 1
+        self.unseen_idf = math.log((1 + len(texts)) / 2) + 1
+
+        entries: List[Tuple[int, int, float]] = []
+        for example, term_counts in enumerate(counts):
+            rows = [self.vocabulary[term] for term in term_counts]
+            weights = self.weights(term_counts.values(), self.idf[rows])
+            weights /= np.linalg.norm(weights)
+            entries.extend(zip(rows, [example] * len(rows), weights.tolist()))
+        entries.sort()
+        self.indptr = np.searchsorted([row for row, _, _ in entries], np.arange(len(self.vocabulary) + 1))
+        self.example_ids = np.array([example for _, example, _ in entries], dtype=np.intp)
+        self.values = np.array([value for _, _, value in entries], dtype=np.float64)
+
+    @staticmethod
+    def term_counts(text: str) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for term in ngrams(text):
+            counts[term] = counts.get(term, 0) + 1
+        return counts
+
+    @staticmethod
+    def weights(counts: Iterable[int], idf: np.ndarray) -> np.ndarray:
+        # Sublinear TF, so a repeated word doesn't dominate a short message
+        return (1 + np.log(np.fromiter(counts, dtype=np.float64))) * idf
+
+    def vectorize(self, text: str) -> Tuple[List[int], np.ndarray]:
+        """(vocabulary rows, normalized weights) of text's known n-grams.
+
+        Unknown n-grams can't match any example but still count towards the
+        norm, so a long message sharing one word with an example scores low.
+        """
+        counts = self.term_counts(text)
+        rows, known, unseen = [], [], 0.0
+        for term, count in counts.items():
+            row = self.vocabulary.get(term)
+            if row is None:
+                unseen += ((1 + math.log(count)) * self.unseen_idf) ** 2
+            else:
+                rows.append(row)
+                known.append(count)
+        if not rows:
+            return [], np.zeros(0)
+        weights = self.weights(known, self.idf[rows])
+        return rows, weights / math.sqrt(float(weights @ weights) + unseen)
+
+    def products(self, rows: Sequence[int], weights: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(example ids, weight x stored value, entries per row) for every stored entry of `rows`"""
+        rows = np.asarray(rows, dtype=np.intp)
+        starts = self.indptr[rows]
+        lengths = self.indptr[rows + 1] - starts
+        # Positions in example_ids/values of the gathered rows' entries, row after row
+        positions = np.arange(lengths.sum()) + np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+        return self.example_ids[positions], self.values[positions] * np.repeat(weights, lengths), lengths
+
+    def result(self, index: int, score: float) -> Tuple[str, float]:
+        return (self.intents[index] if score > 0 and score >= self.threshold else self.default), score
+
+    def classify(self, message: str) -> Tuple[str, float]:
+        """(intent, similarity of the closest example) for one message"""
+        rows, weights = self.vectorize(message)
+        if not rows:
+            return self.default, 0.0
+        examples, products, _ = self.products(rows, weights)
+        similarities = np.bincount(examples, weights=products, minlength=len(self.intents))
+        index = int(similarities.argmax())
+        return self.result(index, float(similarities[index]))
+
+    def classify_many(self, messages: Sequence[str]) -> List[Tuple[str, float]]:
+        """classify for many messages, scored together in one sparse product.
+
+        The message vectors are stacked and every (message, example) sum is
+        accumulated by a single bincount over message * examples + example.
+        """
+        vectors = [self.vectorize(message) for message in messages]
+        if not any(rows for rows, _ in vectors):
+            return [(self.default, 0.0)] * len(messages)
+        rows = [row for message_rows, _ in vectors for row in message_rows]
+        weights = np.concatenate([message_weights for _, message_weights in vectors])
+        examples, products, lengths = self.products(rows, weights)
+        owners = np.repeat(np.arange(len(messages)), [len(message_rows) for message_rows, _ in vectors])
+        cells = np.repeat(owners, lengths) * len(self.intents) + examples
+        similarities = np.bincount(cells, weights=products, minlength=len(messages) * len(self.intents))
+        similarities = similarities.reshape(len(messages), len(self.intents))
+        best = similarities.argmax(axis=1)
+        scores = similarities[np.arange(len(messages)), best]
+        return [self.result(index, score) for index, score in zip(best.tolist(), scores.tolist())]
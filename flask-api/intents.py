@@ -1,5 +1,29 @@
 # intents.py
 INTENT_PATTERNS = {
+    # Price-ordered product lookups, ahead of listing so "list products under $50" lands here
+    "price_range": [
+        r"(?:under|below|less\s+than|cheaper\s+than|up\s+to)\s+\$\s*\d",
+        r"(?:over|above|more\s+than|at\s+least)\s+\$\s*\d",
+        r"between\s+\$?\s*\d[\d.,]*\s*(?:and|-|to)\s*\$?\s*\d",
+        r"(?:prices?|priced|costs?|costing)\s+(?:under|below|less\s+than|over|above|more\s+than|between|from)",
+        r"price\s+range",
+        r"\d\s*(?:dollars|usd)\b"
+    ],
+
+    "cheapest_products": [
+        r"cheapest",
+        r"least\s+expensive",
+        r"lowest[\s-]+priced?",
+        r"most\s+affordable"
+    ],
+
+    "most_expensive_products": [
+        r"most\s+expensive",
+        r"priciest",
+        r"highest[\s-]+priced?",
+        r"most\s+costly"
+    ],
+
     # Product listing and information
     "list_products": [
         r"list\s+(?:all\s+)?products",
@@ -9,7 +33,10 @@ INTENT_PATTERNS = {
         r"products\s+(?:in\s+)?(?:stock|inventory)",
         r"catalog",
         r"merchandise",
-        r"items?\s+(?:for\s+)?(?:sale|available)"
+        r"items?\s+(?:for\s+)?(?:sale|available)",
+        # Paging through the list ("next 10 products", "show 5 products")
+        r"(?:next|more)\s+(?:\d+\s+)?products",
+        r"(?:list|show)\s+(?:me\s+)?\d+\s+products"
     ],
 
     "product_categories": [
@@ -66,7 +93,6 @@ INTENT_PATTERNS = {
         r"what(?:'s|\s+is)\s+the\s+price",
         r"cost\s+of",
         r"pricing",
-        r"(?:cheapest|most\s+expensive)",
         r"(?:discount|sale)\s+(?:price|cost)",
         r"(?:regular|retail)\s+price"
     ],
@@ -88,13 +114,16 @@ INTENT_PATTERNS = {
         r"stock\s+levels?",
         r"replenish(?:ment)?",
         r"restock(?:ing)?",
-        r"low\s+stock",
+        r"low\s+(?:on\s+)?(?:stock|inventory)",
+        r"running\s+low",
+        r"(?:below|under|less\s+than|fewer\s+than)\s+\d+\s+(?:units?|items?|pieces?|left|in\s+stock)",
         r"(?:update|check)\s+inventory"
     ],
 
     "stock_alerts": [
         r"stock\s+alerts?",
         r"notify\s+(?:me|when)",
+        r"(?:alert|tell)\s+me\s+when",
         r"back\s+in\s+stock\s+(?:notification|alert)",
         r"let\s+me\s+know\s+when",
         r"availability\s+notification"
@@ -107,7 +136,9 @@ INTENT_PATTERNS = {
         r"all\s+(?:the\s+)?users",
         r"registered\s+users",
         r"user\s+accounts?",
-        r"who\s+has\s+access"
+        r"who\s+has\s+access",
+        r"(?:next|more)\s+(?:\d+\s+)?users",
+        r"(?:list|show)\s+(?:me\s+)?\d+\s+users"
     ],
 
     "user_permissions": [
@@ -177,3 +208,212 @@ INTENT_PATTERNS = {
     ],
 }
 
+
+# Example utterances for the similarity fallback (intent_similarity.py), used only
+# for messages none of the patterns above match. Mostly phrasings the patterns
+# miss; "unknown" examples keep small talk from landing on the nearest intent.
+INTENT_EXAMPLES = {
+    "price_range": [
+        "anything around fifty bucks",
+        "products in my budget of 100",
+        "what can I get for 20",
+        "items costing roughly 200",
+        "something affordable within 300",
+        "products between 10 and 40",
+    ],
+
+    "cheapest_products": [
+        "what is the lowest cost item",
+        "show me budget options",
+        "inexpensive products",
+        "which items cost the least",
+        "bargain items",
+        "least pricey things you sell",
+    ],
+
+    "most_expensive_products": [
+        "what is the costliest item",
+        "your premium high end products",
+        "which items cost the most",
+        "top price products",
+        "luxury items you sell",
+        "most pricey things in the shop",
+    ],
+
+    "list_products": [
+        "what do you sell",
+        "what do you have in the shop",
+        "show me everything you offer",
+        "give me your product range",
+        "display the items",
+        "what goods do you carry",
+        "browse the store",
+        "your offerings",
+        "the next page of items",
+    ],
+
+    "product_categories": [
+        "what kinds of items do you have",
+        "what sections does the store have",
+        "which departments are there",
+        "sorts of goods you stock",
+        "item categories",
+        "what groups are products organised into",
+    ],
+
+    "out_of_stock": [
+        "which items have run out",
+        "what is missing from the shelves",
+        "products we ran out of",
+        "stuff that is gone",
+        "empty inventory items",
+        "items with nothing left",
+    ],
+
+    "product_count": [
+        "how big is your range",
+        "how many items do you have",
+        "count of goods",
+        "how many things are in the store",
+        "size of the catalogue",
+        "total number of items",
+    ],
+
+    "brands": [
+        "who makes your products",
+        "which labels do you stock",
+        "what names do you carry like sony or apple",
+        "trademarks available",
+        "which producers are in the store",
+    ],
+
+    "product_search": [
+        "I want a laptop",
+        "got any headphones",
+        "I need a new phone",
+        "have you got wireless speakers",
+        "can I get a monitor",
+        "any cameras in the shop",
+        "I'm after a keyboard",
+    ],
+
+    "product_price": [
+        "how pricey is the laptop",
+        "what does the phone go for",
+        "what would I pay for a monitor",
+        "how expensive is the camera",
+        "price check on headphones",
+        "what are you charging for the tablet",
+    ],
+
+    "product_details": [
+        "what can you tell me about the laptop",
+        "what is special about this phone",
+        "describe the camera",
+        "info on the headphones",
+        "what does the monitor come with",
+        "explain the tablet",
+    ],
+
+    "inventory_management": [
+        "which items need reordering",
+        "what should we top up",
+        "items that are almost gone",
+        "products with few units left",
+        "what needs a refill",
+        "warehouse levels",
+    ],
+
+    "stock_alerts": [
+        "ping me when the laptop returns",
+        "message me once headphones are available again",
+        "I want to hear when the phone is restocked",
+        "remind me when the camera comes back",
+        "inform me about the monitor returning",
+        "my alerts",
+    ],
+
+    "list_users": [
+        "who uses the system",
+        "show the accounts",
+        "people registered here",
+        "everyone with a login",
+        "members of the platform",
+        "staff accounts",
+    ],
+
+    "user_permissions": [
+        "what is each person allowed to do",
+        "who is an admin",
+        "what can staff change",
+        "access levels",
+        "who may edit products",
+        "rights of each account",
+    ],
+
+    "user_management": [
+        "sign up a colleague",
+        "register a new employee",
+        "get rid of an old account",
+        "deactivate an account",
+        "rename an account",
+        "edit an account's email",
+    ],
+
+    "suppliers": [
+        "who do we buy from",
+        "where does our stock come from",
+        "our partners who deliver goods",
+        "wholesalers we work with",
+        "the companies that send us stock",
+    ],
+
+    "supplier_contact": [
+        "how can I call the vendor",
+        "what is the number for our wholesaler",
+        "get me the email for the distributor",
+        "reach out to our partner company",
+        "address of the company that delivers",
+    ],
+
+    "supplier_orders": [
+        "buy more stock from the wholesaler",
+        "request a shipment of laptops",
+        "order 50 more phones",
+        "reorder from our partner",
+        "get more units delivered",
+    ],
+
+    "database_info": [
+        "how is the data stored",
+        "what information do you keep",
+        "what backend do you run on",
+        "which columns does product have",
+        "how is information organised",
+    ],
+
+    "help": [
+        "what can you do",
+        "what can I ask you",
+        "I'm confused",
+        "I don't know what to type",
+        "how does this work",
+        "what are my options",
+        "show me what you understand",
+    ],
+
+    "unknown": [
+        "hello",
+        "hi there",
+        "good morning",
+        "thanks",
+        "thank you very much",
+        "bye",
+        "what is the weather like",
+        "tell me a joke",
+        "who are you",
+        "how are you today",
+        "ok",
+        "cool",
+    ],
+}
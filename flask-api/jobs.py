@@ -0,0 +1,33 @@
+# jobs.py
+import threading
+from typing import Any, Callable, Optional
+
+
+class PeriodicJob:
+    """Runs `run()` every `interval` seconds on a daemon thread until stopped.
+
+    A failing run is reported and retried at the next interval; the result of
+    the last successful run is kept in `last_run`.
+    """
+
+    def __init__(self, run: Callable[[], Any], interval: float, name: str):
+        self.run = run
+        self.interval = interval
+        self.name = name
+        self.stopping = threading.Event()
+        self.thread = None
+        self.last_run: Optional[Any] = None
+
+    def start(self):
+        def loop():
+            while not self.stopping.wait(self.interval):
+                try:
+                    self.last_run = self.run()
+                except Exception as ex:
+                    print(f"Warning: {self.name} job failed: {ex}")
+
+        self.thread = threading.Thread(target=loop, name=self.name, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopping.set()
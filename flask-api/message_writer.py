@@ -0,0 +1,178 @@
+# message_writer.py
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List
+
+from sqlalchemy.exc import IntegrityError
+
+
+class WriteBehindQueue:
+    """Bounded in-process queue that a background thread flushes in batches.
+
+    A batch is flushed once it holds `batch_size` items or its oldest item has
+    waited `flush_interval` seconds. When the queue is full, `put` blocks for
+    up to `put_timeout` seconds and then raises queue.Full, so callers slow
+    down (or write inline) instead of memory growing without bound. Once
+    `stop` has been called, `put` raises queue.Full straight away; `stop`
+    waits for puts already under way, and whatever the worker has not written
+    by the join timeout is flushed on the calling thread before it returns.
+    """
+
+    def __init__(self, flush: Callable[[List[Any]], None], max_size: int = 10000, batch_size: int = 200,
+                 flush_interval: float = 0.5, put_timeout: float = 1.0, max_retries: int = 3):
+        self.flush = flush
+        self.queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_size)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.max_retries = max_retries
+        self.stopping = threading.Event()
+        self.thread = None
+        # Guards `closed` and the count of puts in progress, so stop() never
+        # signals the worker while an item is still on its way into the queue
+        self.put_state = threading.Condition()
+        self.closed = False
+        self.puts_in_progress = 0
+        self.lock = threading.Lock()
+        self.flushed_items = 0
+        self.flushed_batches = 0
+        self.failed_items = 0
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+            self.thread.start()
+
+    def put(self, item: Any):
+        with self.put_state:
+            if self.closed:
+                raise queue.Full("write-behind queue is shutting down")
+            self.puts_in_progress += 1
+        try:
+            # Not under the lock: a put waiting on a full queue must not hold up the others
+            self.queue.put(item, timeout=self.put_timeout)
+        finally:
+            with self.put_state:
+                self.puts_in_progress -= 1
+                self.put_state.notify_all()
+
+    def stop(self, timeout: float = 30.0):
+        """Stop accepting work, flush whatever is queued and wait for the worker"""
+        with self.put_state:
+            self.closed = True
+            # Each put gives up after put_timeout, so this wait is bounded
+            self.put_state.wait_for(lambda: self.puts_in_progress == 0)
+        self.stopping.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+            if self.thread.is_alive():
+                print(f"Warning: write-behind worker still busy after {timeout}s; flushing the rest inline")
+            self.thread = None
+        # Whatever the worker did not get to (or everything, if it never started)
+        while True:
+            batch = []
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                break
+            self._flush_with_retry(batch)
+
+    def _next_batch(self) -> List[Any]:
+        try:
+            batch = [self.queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                # While draining for shutdown, take what's there without waiting
+                batch.append(self.queue.get_nowait() if self.stopping.is_set() or remaining <= 0
+                             else self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not (self.stopping.is_set() and self.queue.empty()):
+            batch = self._next_batch()
+            if batch:
+                self._flush_with_retry(batch)
+
+    def _flush_with_retry(self, batch: List[Any]):
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.flush(batch)
+                with self.lock:
+                    self.flushed_items += len(batch)
+                    self.flushed_batches += 1
+                return
+            except Exception as ex:
+                if attempt == self.max_retries:
+                    print(f"Error: dropping {len(batch)} queued writes after {attempt + 1} attempts: {ex}")
+                    with self.lock:
+                        self.failed_items += len(batch)
+                    return
+                time.sleep(min(2 ** attempt * 0.1, 5.0))
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {
+                "queued": self.queue.qsize(),
+                "flushed_items": self.flushed_items,
+                "flushed_batches": self.flushed_batches,
+                "failed_items": self.failed_items,
+            }
+
+
+class IdBlockAllocator:
+    """Hands out primary keys from blocks reserved in an id-block table.
+
+    Each reservation is one short transaction that bumps the named counter
+    row by `block_size`, so several processes can share a table safely. The
+    counter is seeded from `seed(db)` (the current MAX(id) + 1) the first time
+    it is used. Every writer to the table must take its ids from here.
+    """
+
+    def __init__(self, session_factory, block_model, name: str, seed: Callable[[Any], int], block_size: int = 1000):
+        self.session_factory = session_factory
+        self.block_model = block_model
+        self.name = name
+        self.seed = seed
+        self.block_size = block_size
+        self.lock = threading.Lock()
+        self.next_id = 0
+        self.end_id = 0
+
+    def allocate(self, count: int = 1) -> List[int]:
+        with self.lock:
+            if self.next_id + count > self.end_id:
+                self.next_id, self.end_id = self._reserve(max(count, self.block_size))
+            ids = list(range(self.next_id, self.next_id + count))
+            self.next_id += count
+            return ids
+
+    def _reserve(self, size: int):
+        model = self.block_model
+        for _ in range(3):
+            db = self.session_factory()
+            try:
+                updated = db.query(model).filter(model.name == self.name).update(
+                    {model.next_id: model.next_id + size}, synchronize_session=False
+                )
+                if not updated:
+                    db.add(model(name=self.name, next_id=self.seed(db) + size))
+                    db.flush()
+                end = db.query(model.next_id).filter(model.name == self.name).scalar()
+                db.commit()
+                return end - size, end
+            except IntegrityError:
+                # Another process seeded the counter first; reserve from it instead
+                db.rollback()
+            finally:
+                db.close()
+        raise RuntimeError(f"Could not reserve ids for '{self.name}'")
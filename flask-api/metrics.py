@@ -0,0 +1,273 @@
+# metrics.py
+import bisect
+import contextvars
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Upper bounds of the queries-per-request histogram buckets
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def escape_label(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(names: Sequence[str], values: Sequence[Any], extra: str = "") -> str:
+    pairs = [f'{name}="{escape_label(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """A monotonically increasing count per combination of label values"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.lock = threading.Lock()
+        self.values: Dict[Tuple, float] = {}
+
+    def inc(self, *labels: Any, amount: float = 1):
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self) -> List[str]:
+        with self.lock:
+            values = list(self.values.items())
+        return [f"{self.name}{format_labels(self.labelnames, labels)} {format_value(value)}" for labels, value in values]
+
+
+class Histogram:
+    """Bucketed observations (cumulative on output) plus their sum and count, per label values"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self.lock = threading.Lock()
+        # labels -> [per-bucket counts (last is +Inf), sum, count]
+        self.values: Dict[Tuple, list] = {}
+
+    def observe(self, value: float, *labels: Any):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            entry = self.values.get(labels)
+            if entry is None:
+                entry = self.values[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def samples(self) -> List[str]:
+        with self.lock:
+            values = [(labels, list(counts), total, count) for labels, (counts, total, count) in self.values.items()]
+        lines = []
+        for labels, counts, total, count in values:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = format_labels(self.labelnames, labels, f'le="{format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(self.labelnames, labels)} {format_value(total)}")
+            lines.append(f"{self.name}_count{format_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class CallbackMetric:
+    """A counter or gauge whose values are read from `collect()` at scrape time.
+
+    `collect` returns (label values, value) pairs, so existing stats (cache
+    hit counts, pool state) are exported without being counted twice.
+    """
+
+    def __init__(self, name: str, help: str, kind: str, labelnames: Sequence[str],
+                 collect: Callable[[], Iterable[Tuple[Tuple, float]]]):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.labelnames = tuple(labelnames)
+        self.collect = collect
+
+    def samples(self) -> List[str]:
+        return [
+            f"{self.name}{format_labels(self.labelnames, labels)} {format_value(value)}"
+            for labels, value in self.collect()
+        ]
+
+
+class MetricsRegistry:
+    """In-process metrics rendered in the Prometheus text exposition format"""
+
+    def __init__(self):
+        self.metrics: List[Any] = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def callback(self, name: str, help: str, kind: str, labelnames: Sequence[str],
+                 collect: Callable[[], Iterable[Tuple[Tuple, float]]]) -> CallbackMetric:
+        return self.register(CallbackMetric(name, help, kind, labelnames, collect))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics:
+            try:
+                samples = metric.samples()
+            except Exception as ex:
+                print(f"Warning: collecting metric {metric.name} failed: {ex}")
+                continue
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(samples)
+        return "\n".join(lines) + "\n"
+
+
+class RequestTimings:
+    """Stage durations and database work of one request, reported in Server-Timing"""
+
+    __slots__ = ("stages", "queries", "query_seconds")
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+        self.queries = 0
+        self.query_seconds = 0.0
+
+    def add(self, stage: str, seconds: float):
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def server_timing(self, total_seconds: float) -> str:
+        entries = [f"{stage};dur={seconds * 1000:.2f}" for stage, seconds in self.stages.items()]
+        entries.append(f'db;desc="{self.queries} queries";dur={self.query_seconds * 1000:.2f}')
+        entries.append(f"total;dur={total_seconds * 1000:.2f}")
+        return ", ".join(entries)
+
+
+# Set by MetricsMiddleware for the duration of a request. The object is shared, not
+# copied, by the contexts run_blocking hands to worker threads, so they add to it too.
+current_request: contextvars.ContextVar[Optional[RequestTimings]] = contextvars.ContextVar(
+    "current_request", default=None
+)
+
+
+class StageTimer:
+    """`with stage_timer("parse"):` records the block's duration in the stage histogram
+    and in the current request's timings"""
+
+    def __init__(self, histogram: Histogram, enabled: bool = True):
+        self.histogram = histogram
+        self.enabled = enabled
+
+    def __call__(self, stage: str) -> "_Stage":
+        return _Stage(self, stage)
+
+
+class _Stage:
+    __slots__ = ("timer", "stage", "start")
+
+    def __init__(self, timer: StageTimer, stage: str):
+        self.timer = timer
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if not self.timer.enabled:
+            return False
+        elapsed = time.perf_counter() - self.start
+        self.timer.histogram.observe(elapsed, self.stage)
+        timings = current_request.get()
+        if timings is not None:
+            timings.add(self.stage, elapsed)
+        return False
+
+
+def instrument_engine(engine: Engine, queries: Counter, query_seconds: Histogram):
+    """Count and time every statement the engine runs, globally and per request"""
+
+    # The start time lives on the statement's execution context, so a statement that
+    # fails (and never reaches after_cursor_execute) leaves nothing behind
+    def before(conn, cursor, statement, parameters, context, executemany):
+        context._query_started = time.perf_counter()
+
+    def after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._query_started
+        queries.inc()
+        query_seconds.observe(elapsed)
+        timings = current_request.get()
+        if timings is not None:
+            timings.queries += 1
+            timings.query_seconds += elapsed
+
+    event.listen(engine, "before_cursor_execute", before)
+    event.listen(engine, "after_cursor_execute", after)
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing each HTTP request by method, route template and status.
+
+    Also records the number of database queries per request and, with
+    `server_timing`, adds a Server-Timing header listing the request's stages.
+    """
+
+    def __init__(self, app, request_seconds: Histogram, request_queries: Histogram, server_timing: bool = True):
+        self.app = app
+        self.request_seconds = request_seconds
+        self.request_queries = request_queries
+        self.server_timing = server_timing
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        timings = RequestTimings()
+        token = current_request.set(timings)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    header = timings.server_timing(time.perf_counter() - start)
+                    message = {**message, "headers": [*message.get("headers", []), (b"server-timing", header.encode("latin-1"))]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_request.reset(token)
+            # The route template ("/sessions/{session_id}/history") keeps label values bounded
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            self.request_seconds.observe(time.perf_counter() - start, scope["method"], path, status)
+            self.request_queries.observe(timings.queries, path)
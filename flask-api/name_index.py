@@ -0,0 +1,386 @@
+# name_index.py
+import datetime
+import re
+import sys
+import threading
+import time
+from array import array
+from collections import Counter
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import func, or_, select
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def normalize(text: Optional[str]) -> str:
+    return " ".join((text or "").lower().split())
+
+
+def trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class NameIndex:
+    """In-memory substring and fuzzy lookup over the name fields of a table.
+
+    Each document is a primary key plus one or more short text fields (e.g. a
+    product's name and category). Two posting structures point back at the keys:
+
+    - trigram postings answer case-insensitive substring lookups (what
+      LIKE '%term%' does). Candidates come from the query's rarest trigram and
+      are verified against the stored text.
+    - a token inverted index answers whole-word lookups.
+
+    Postings are append-only int arrays. Removing or updating a document leaves
+    stale entries behind; lookups skip them by re-checking the stored text, and
+    the postings are rebuilt once stale entries outnumber live documents.
+    """
+
+    def __init__(self):
+        self.docs: Dict[int, Tuple[str, ...]] = {}
+        self.postings: Dict[str, array] = {}
+        self.tokens: Dict[str, array] = {}
+        self.names: Dict[str, List[int]] = {}
+        self.stale = 0
+        self.lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def add(self, pk: int, fields: Sequence[Optional[str]]):
+        """Insert or replace a document"""
+        values = tuple(sys.intern(normalize(value)) for value in fields)
+        with self.lock:
+            previous = self.docs.get(pk)
+            if previous == values:
+                return
+            if previous is not None:
+                self.stale += 1
+            self.docs[pk] = values
+            grams = {value[i:i + 3] for value in values for i in range(len(value) - 2)}
+            _append_postings(self.postings, grams, pk)
+            _append_postings(self.tokens, {t for value in values for t in _TOKEN_RE.findall(value)}, pk)
+            self.names.setdefault(values[0], []).append(pk)
+            self._maybe_compact()
+
+    def load(self, items: Iterable[Tuple[int, Sequence[Optional[str]]]]):
+        """Replace the whole index with (key, fields) pairs; much faster than add() per row"""
+        docs: Dict[int, Tuple[str, ...]] = {}
+        postings: Dict[str, list] = {}
+        tokens: Dict[str, list] = {}
+        names: Dict[str, List[int]] = {}
+        for pk, fields in items:
+            docs[pk] = tuple(sys.intern(normalize(value)) for value in fields)
+        for pk, values in docs.items():
+            for gram in {value[i:i + 3] for value in values for i in range(len(value) - 2)}:
+                postings.setdefault(gram, []).append(pk)
+            for token in {t for value in values for t in _TOKEN_RE.findall(value)}:
+                tokens.setdefault(token, []).append(pk)
+            names.setdefault(values[0], []).append(pk)
+        with self.lock:
+            self.docs = docs
+            self.postings = {gram: array("i", pks) for gram, pks in postings.items()}
+            self.tokens = {token: array("i", pks) for token, pks in tokens.items()}
+            self.names = names
+            self.stale = 0
+
+    def remove(self, pk: int):
+        with self.lock:
+            if self.docs.pop(pk, None) is not None:
+                self.stale += 1
+                self._maybe_compact()
+
+    def _maybe_compact(self):
+        if self.stale > max(1000, len(self.docs)):
+            self.rebuild()
+
+    def rebuild(self):
+        """Rebuild the postings from the live documents, dropping stale entries"""
+        with self.lock:
+            self.load(list(self.docs.items()))
+
+    def search(self, term: str) -> List[int]:
+        """Keys of documents with a field containing term, case-insensitively, sorted"""
+        term = normalize(term)
+        if not term:
+            return []
+        with self.lock:
+            grams = trigrams(term)
+            if grams:
+                # Start from the rarest trigram; intersect a few more while that's still broad
+                postings = sorted((self.postings.get(gram, ()) for gram in grams), key=len)
+                candidates = set(postings[0])
+                for posting in postings[1:4]:
+                    if len(candidates) <= 256:
+                        break
+                    candidates = candidates.intersection(posting)
+            else:
+                # One- and two-character terms have no trigrams to go on
+                candidates = self.docs.keys()
+            return sorted(pk for pk in candidates if any(term in value for value in self.docs.get(pk, ())))
+
+    def search_tokens(self, term: str) -> List[int]:
+        """Keys of documents containing every word of term as a whole word"""
+        words = _TOKEN_RE.findall(normalize(term))
+        if not words:
+            return []
+        with self.lock:
+            postings = sorted((self.tokens.get(word, ()) for word in set(words)), key=len)
+            matches = set(postings[0])
+            for posting in postings[1:]:
+                matches.intersection_update(posting)
+            # Postings may be stale, so confirm against the stored text
+            wanted = set(words)
+            return sorted(pk for pk in matches
+                          if pk in self.docs and wanted <= set(_TOKEN_RE.findall(" ".join(self.docs[pk]))))
+
+    def search_fuzzy(self, term: str, limit: int = 10, min_similarity: float = 0.3,
+                     max_posting_ratio: float = 0.05) -> List[Tuple[int, float]]:
+        """(key, similarity) pairs ranked by trigram Dice similarity to the closest field.
+
+        Trigrams found in more than `max_posting_ratio` of all documents say
+        little about which one is meant and are skipped when gathering
+        candidates, which keeps the cost proportional to the rare trigrams.
+        """
+        term = normalize(term)
+        grams = trigrams(term)
+        if not grams:
+            return []
+        with self.lock:
+            cutoff = max(50, int(len(self.docs) * max_posting_ratio))
+            overlap: Counter = Counter()
+            for gram in grams:
+                posting = self.postings.get(gram)
+                if posting is not None and len(posting) <= cutoff:
+                    overlap.update(set(posting))
+            scored = []
+            for pk, _ in overlap.most_common(limit * 20):
+                values = self.docs.get(pk)
+                if values is None:
+                    continue
+                similarity = max(dice(grams, trigrams(value)) for value in values)
+                if similarity >= min_similarity:
+                    scored.append((pk, similarity))
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return scored[:limit]
+
+    def best_matches(self, term: str, limit: int = 5, min_score: float = 0.0, candidates: int = 10,
+                     max_posting_ratio: float = 0.05) -> List[Tuple[int, float]]:
+        """(key, score) pairs ranked by how well the first field (the name) matches term.
+
+        Exact names are looked up directly. Otherwise the documents sharing the
+        most rare trigrams with term are narrowed to `candidates` by trigram
+        similarity and only those are scored with name_similarity, so the cost
+        follows the rare posting lists rather than the number of documents. A
+        term made only of common trigrams (e.g. "camera") falls back to the
+        first substring matches.
+        """
+        term = normalize(term)
+        if not term:
+            return []
+        grams = trigrams(term)
+        with self.lock:
+            exact = sorted({pk for pk in self.names.get(term, ()) if self.docs.get(pk, ("",))[0] == term})
+            if len(exact) >= limit:
+                return [(pk, 1.0) for pk in exact[:limit]]
+            cutoff = max(50, int(len(self.docs) * max_posting_ratio))
+            overlap: Counter = Counter()
+            for gram in grams:
+                posting = self.postings.get(gram)
+                if posting is not None and len(posting) <= cutoff:
+                    # A refreshed key can appear in a posting more than once
+                    overlap.update(set(posting))
+            keys = [pk for pk, _ in overlap.most_common(candidates * 4)] or self.search(term)[:candidates * 4]
+            shortlist = sorted(((dice(grams, trigrams(self.docs[pk][0])), pk) for pk in set(keys) if pk in self.docs),
+                               reverse=True)[:candidates]
+            named = [(pk, self.docs[pk][0]) for pk in set(exact) | {pk for _, pk in shortlist}]
+        return rank_names(term, named, limit, min_score)
+
+
+def _append_postings(postings: Dict[str, array], keys: Iterable[str], pk: int):
+    for key in keys:
+        posting = postings.get(key)
+        if posting is None:
+            posting = postings[key] = array("i")
+        posting.append(pk)
+
+
+def dice(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+def levenshtein(a: str, b: str, max_distance: Optional[int] = None) -> int:
+    """Edit distance (insertions, deletions and substitutions) between two strings.
+
+    With `max_distance`, only a diagonal band of that width is computed and any
+    distance above it is reported as max_distance + 1.
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    if max_distance is None:
+        max_distance = len(a)
+    too_far = max_distance + 1
+    if len(a) - len(b) > max_distance:
+        return too_far
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [too_far] * (len(b) + 1)
+        current[0] = i if i <= max_distance else too_far
+        low, high = max(1, i - max_distance), min(len(b), i + max_distance)
+        for j in range(low, high + 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != b[j - 1]))
+        if min(current[low - 1:high + 1]) > max_distance:
+            return too_far
+        previous = current
+    return min(previous[-1], too_far)
+
+
+def edit_ratio(a: str, b: str, min_ratio: float = 0.0) -> float:
+    """1 - distance / longer length; 0.0 when the ratio can't exceed min_ratio"""
+    longest = max(len(a), len(b))
+    if not longest:
+        return 1.0
+    max_distance = int((1.0 - min_ratio) * longest)
+    distance = levenshtein(a, b, max_distance)
+    return 1.0 - distance / longest if distance <= max_distance else 0.0
+
+
+def name_similarity(term: str, name: str, memo: Optional[Dict[Tuple[str, str], float]] = None) -> float:
+    """Score in [0, 1] for how well a normalized search term matches a normalized name.
+
+    1.0 is an exact match. A name containing the term scores at least 0.8,
+    more the less else it contains. Otherwise the score is the edit-distance
+    ratio against the whole name or, slightly discounted, how closely each
+    word of the term matches some word of the name, weighted by word length
+    (so "avantka" still finds "avantika patil"). Pass the same `memo` dict
+    when scoring many names against one term to reuse word comparisons.
+    """
+    if term == name:
+        return 1.0
+    if not term or not name:
+        return 0.0
+    if term in name:
+        return 0.8 + 0.2 * len(term) / len(name)
+    score = 0.0
+    term_words = term.split()
+    name_words = set(name.split())
+    if name_words:
+        memo = {} if memo is None else memo
+        matched = sum(len(word) * _best_word_ratio(word, name_words, memo) for word in term_words)
+        score = 0.9 * matched / sum(len(word) for word in term_words)
+    return max(score, edit_ratio(term, name, min_ratio=score))
+
+
+def _best_word_ratio(word: str, words: Set[str], memo: Dict[Tuple[str, str], float]) -> float:
+    if word in words:
+        return 1.0
+    best = 0.0
+    for other in words:
+        ratio = memo.get((word, other))
+        if ratio is None:
+            ratio = memo[word, other] = edit_ratio(word, other)
+        best = max(best, ratio)
+    return best
+
+
+def rank_names(term: str, names: Iterable[Tuple[Hashable, str]], limit: int = 5,
+               min_score: float = 0.0) -> List[Tuple[Hashable, float]]:
+    """Rank (key, name) pairs by name_similarity to term, best first, ties by key"""
+    term = normalize(term)
+    memo: Dict[Tuple[str, str], float] = {}
+    scored = [(key, name_similarity(term, normalize(name), memo)) for key, name in names]
+    scored = [item for item in scored if item[1] >= min_score]
+    scored.sort(key=lambda item: (-item[1], item[0]))
+    return scored[:limit]
+
+
+class TableNameIndex:
+    """Keeps a NameIndex in step with a database table.
+
+    The first lookup loads every row. After that, at most every
+    `refresh_interval` seconds, only rows whose change timestamp is at or
+    after the last one seen (or NULL) are reloaded; rows written in the same
+    tick as the last refresh are read again, and unchanged ones are skipped
+    by NameIndex.add. When the row count no longer matches, the keys are
+    diffed: deleted rows are dropped and rows the timestamps missed are
+    added. `mark_stale` forces a refresh on the next lookup.
+    """
+
+    def __init__(self, pk_column, name_columns: Iterable, changed_column, refresh_interval: float = 60.0):
+        self.pk_column = pk_column
+        self.name_columns = list(name_columns)
+        self.changed_column = changed_column
+        self.refresh_interval = refresh_interval
+        self.index = NameIndex()
+        self.loaded = False
+        self.watermark: Optional[datetime.datetime] = None
+        # Keys already indexed with exactly the watermark timestamp, which >= reads again
+        self.at_watermark: Set[int] = set()
+        self.refreshed_at: Optional[float] = None
+        self.lock = threading.Lock()
+
+    def mark_stale(self):
+        self.refreshed_at = None
+
+    def is_fresh(self) -> bool:
+        return self.refreshed_at is not None and time.monotonic() - self.refreshed_at < self.refresh_interval
+
+    def ensure_fresh(self, db):
+        if self.is_fresh():
+            return
+        with self.lock:
+            if not self.is_fresh():
+                self.refresh(db)
+
+    def refresh(self, db):
+        query = select(self.pk_column, *self.name_columns, self.changed_column)
+        if not self.loaded:
+            rows = db.execute(query).all()
+            self.index.load((row[0], row[1:-1]) for row in rows)
+        else:
+            if self.watermark is not None:
+                query = query.where(or_(self.changed_column >= self.watermark, self.changed_column.is_(None)))
+            rows = db.execute(query).all()
+            for row in rows:
+                if row[-1] is None or row[-1] != self.watermark or row[0] not in self.at_watermark:
+                    self.index.add(row[0], row[1:-1])
+        for row in rows:
+            changed_at = row[-1]
+            if changed_at is None:
+                continue
+            if self.watermark is None or changed_at > self.watermark:
+                self.watermark = changed_at
+                self.at_watermark = {row[0]}
+            elif changed_at == self.watermark:
+                self.at_watermark.add(row[0])
+
+        # Deleted rows don't show up as changes, nor do rows written with an older
+        # timestamp; catch both by the row count and diff the keys
+        if db.execute(select(func.count(self.pk_column))).scalar() != len(self.index):
+            live = set(db.execute(select(self.pk_column)).scalars())
+            for pk in list(self.index.docs):
+                if pk not in live:
+                    self.index.remove(pk)
+            missing = sorted(live.difference(self.index.docs))
+            # Chunked to stay under SQL Server's 2100 parameter limit
+            for start in range(0, len(missing), 1000):
+                chunk = missing[start:start + 1000]
+                for row in db.execute(select(self.pk_column, *self.name_columns).where(self.pk_column.in_(chunk))):
+                    self.index.add(row[0], row[1:])
+        self.loaded = True
+        self.refreshed_at = time.monotonic()
+
+    def search(self, db, term: str) -> List[int]:
+        self.ensure_fresh(db)
+        return self.index.search(term)
+
+    def search_fuzzy(self, db, term: str, limit: int = 10) -> List[Tuple[int, float]]:
+        self.ensure_fresh(db)
+        return self.index.search_fuzzy(term, limit)
+
+    def best_matches(self, db, term: str, limit: int = 5, min_score: float = 0.0) -> List[Tuple[int, float]]:
+        self.ensure_fresh(db)
+        return self.index.best_matches(term, limit, min_score)
@@ -0,0 +1,119 @@
+# nlp_backends.py
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Entity ruler labels for catalog names, and the extracted entity each one fills
+CATALOG_LABELS = {"PRODUCT": "product_name", "SUPPLIER": "supplier_name"}
+# Pattern id marking entities found by the catalog ruler (not a statistical NER)
+CATALOG_PATTERN_ID = "catalog"
+
+BACKENDS = ("full", "trimmed", "rules")
+
+
+def load_model(model: str, exclude: Sequence[str] = ()):
+    """A trained spaCy pipeline, or a blank English one when the model isn't installed"""
+    # Importing spaCy alone takes about a second, so it waits until a backend is loaded
+    import spacy
+    try:
+        return spacy.load(model, exclude=list(exclude))
+    except OSError:
+        print(f"Warning: spaCy model {model} not found. Using a blank English pipeline.")
+        return spacy.blank("en")
+
+
+def build_catalog_ruler(names: Dict[str, Iterable[str]]):
+    """A blank English pipeline with an entity ruler matching the given names, case-insensitively.
+
+    `names` maps a CATALOG_LABELS label to the names to tag with it. Where
+    matches overlap the ruler keeps the longest, so "Dell XPS 15 laptop"
+    wins over "Dell".
+    """
+    import spacy
+    nlp = spacy.blank("en")
+    ruler = nlp.add_pipe("entity_ruler", config={"phrase_matcher_attr": "LOWER"})
+    patterns = []
+    for label, label_names in names.items():
+        for name in set(name.strip() for name in label_names if name and name.strip()):
+            patterns.append({"label": label, "pattern": name, "id": CATALOG_PATTERN_ID})
+    ruler.add_patterns(patterns)
+    return nlp
+
+
+class CatalogRulesPipeline:
+    """Rule-only NLP: tokenizer plus an entity ruler seeded from catalog names.
+
+    Produces no POS tags, parse or statistical entities, only PRODUCT and
+    SUPPLIER entities for names that exist in the catalog. `load_names` is
+    called again every `refresh_interval` seconds; the new ruler is built on a
+    background thread while calls keep using the current one.
+    """
+
+    def __init__(self, load_names: Callable[[], Dict[str, List[str]]], refresh_interval: float = 300):
+        self.load_names = load_names
+        self.refresh_interval = refresh_interval
+        self.lock = threading.Lock()
+        self.refreshing = False
+        self.nlp = build_catalog_ruler(load_names())
+        self.built_at = time.monotonic()
+
+    def current(self):
+        if self.refresh_interval > 0 and time.monotonic() - self.built_at > self.refresh_interval:
+            with self.lock:
+                start = not self.refreshing
+                self.refreshing = True
+            if start:
+                threading.Thread(target=self._rebuild, name="nlp-rules-refresh", daemon=True).start()
+        return self.nlp
+
+    def _rebuild(self):
+        try:
+            self.nlp = build_catalog_ruler(self.load_names())
+        except Exception as ex:
+            print(f"Warning: refreshing the catalog entity ruler failed: {ex}")
+        finally:
+            self.built_at = time.monotonic()
+            with self.lock:
+                self.refreshing = False
+
+    def __call__(self, text: str, **kwargs):
+        return self.current()(text, **kwargs)
+
+    def pipe(self, texts, **kwargs):
+        # Multiple processes would each need a copy of the ruler; it's fast enough in one
+        kwargs.pop("n_process", None)
+        return self.current().pipe(texts, **kwargs)
+
+    def __getattr__(self, name: str):
+        # meta, pipe_names etc. come from the current pipeline
+        if name == "nlp":
+            raise AttributeError(name)
+        return getattr(self.nlp, name)
+
+
+def load_backend(backend: str, model: str = "en_core_web_sm", exclude: Sequence[str] = (),
+                 load_names: Optional[Callable[[], Dict[str, List[str]]]] = None, refresh_interval: float = 300):
+    """The NLP pipeline for `backend`:
+
+    - "full": the trained model with every component
+    - "trimmed": the trained model without the `exclude`d components
+    - "rules": CatalogRulesPipeline over the names from `load_names`
+    """
+    if backend == "full":
+        return load_model(model)
+    if backend == "trimmed":
+        return load_model(model, exclude)
+    if backend == "rules":
+        if load_names is None:
+            raise ValueError("The rules NLP backend needs a load_names function")
+        return CatalogRulesPipeline(load_names, refresh_interval)
+    raise ValueError(f"Unknown NLP backend {backend!r}; expected one of {', '.join(BACKENDS)}")
+
+
+def catalog_entities(doc) -> List[Tuple[str, str]]:
+    """(entity key, text) for the catalog names the ruler tagged in a parsed message"""
+    return [
+        (CATALOG_LABELS[ent.label_], ent.text)
+        for ent in doc.ents
+        if ent.ent_id_ == CATALOG_PATTERN_ID and ent.label_ in CATALOG_LABELS
+    ]
@@ -0,0 +1,68 @@
+# retention.py
+import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import DateTime, Table, delete, func, insert, literal, select
+from sqlalchemy.engine import Engine
+
+
+def archive_messages(engine: Engine, messages: Table, archive: Table, cutoff: datetime.datetime,
+                     batch_size: int = 500, max_batches: Optional[int] = None) -> Dict[str, int]:
+    """Move conversations idle since before `cutoff` from `messages` to `archive`.
+
+    A session moves as a whole once its newest message is older than cutoff;
+    messages without a session move one by one by their own timestamp. Each
+    batch (up to `batch_size` sessions, or `batch_size` sessionless messages)
+    is one INSERT ... SELECT and one DELETE in its own short transaction, so
+    the job can be stopped at any point and never holds locks for long.
+    """
+    columns = [name for name in archive.columns.keys() if name in messages.columns]
+    archived_at = datetime.datetime.utcnow()
+    stats = {"sessions": 0, "messages": 0, "batches": 0}
+
+    def move(conn, condition) -> int:
+        conn.execute(insert(archive).from_select(
+            columns + ["archived_at"],
+            select(*[messages.c[name] for name in columns], literal(archived_at, DateTime)).where(condition)
+        ))
+        return conn.execute(delete(messages).where(condition)).rowcount
+
+    def more_batches() -> bool:
+        return max_batches is None or stats["batches"] < max_batches
+
+    # Walk the sessions in session_id order so each batch resumes where the last stopped
+    last_session = None
+    while more_batches():
+        idle_sessions = (
+            select(messages.c.session_id)
+            .where(messages.c.session_id.is_not(None))
+            .group_by(messages.c.session_id)
+            .having(func.max(messages.c.timestamp) < cutoff)
+            .order_by(messages.c.session_id)
+            .limit(batch_size)
+        )
+        if last_session is not None:
+            idle_sessions = idle_sessions.where(messages.c.session_id > last_session)
+        with engine.begin() as conn:
+            session_ids = conn.execute(idle_sessions).scalars().all()
+            if not session_ids:
+                break
+            stats["messages"] += move(conn, messages.c.session_id.in_(session_ids))
+        stats["sessions"] += len(session_ids)
+        stats["batches"] += 1
+        last_session = session_ids[-1]
+
+    while more_batches():
+        with engine.begin() as conn:
+            message_ids = conn.execute(
+                select(messages.c.id)
+                .where(messages.c.session_id.is_(None), messages.c.timestamp < cutoff)
+                .order_by(messages.c.id)
+                .limit(batch_size)
+            ).scalars().all()
+            if not message_ids:
+                break
+            stats["messages"] += move(conn, messages.c.id.in_(message_ids))
+        stats["batches"] += 1
+    return stats
+
@@ -1,14 +1,19 @@
 from flask import Blueprint, request, jsonify
-import spacy
 from backend import db
 from backend.models import User
 from sqlalchemy.exc import SQLAlchemyError
+import config
+from nlp_backends import load_backend
+from startup import LazyPipeline
 
 # Create a blueprint for routes
 chatbot_bp = Blueprint('chatbot_bp', __name__)
 
-# Load spaCy model
-nlp = spacy.load("en_core_web_trf")
+# Load the NLP pipeline picked by NLP_BACKEND on first use. Only doc.ents is read here,
+# which doesn't need the transformer model this used to load. The rules backend needs
+# the catalog names, which this blueprint doesn't query, so it gets "trimmed" instead.
+nlp_backend = config.NLP_BACKEND if config.NLP_BACKEND != "rules" else "trimmed"
+nlp = LazyPipeline(lambda: load_backend(nlp_backend, config.SPACY_MODEL, config.SPACY_EXCLUDE))
 
 @chatbot_bp.route('/chatbot', methods=['POST'])
 def chatbot():
@@ -0,0 +1,165 @@
+# schema.py
+import decimal
+import re
+from typing import Any, Iterable, List, Optional
+
+from sqlalchemy import Column, MetaData, String, Table, inspect, select, text, update, bindparam, type_coerce
+from sqlalchemy.engine import Engine
+from sqlalchemy.sql import sqltypes
+
+
+def ensure_columns(engine: Engine, metadata: MetaData, tables: Optional[Iterable[Table]] = None) -> List[str]:
+    """Add nullable columns declared on the models that existing tables don't have yet.
+
+    Only columns that can be added without a default or a table rewrite are
+    handled; anything else is reported and left for a manual migration.
+    `tables` limits the check to those tables (default: all of metadata).
+    Returns the "table.column" names added.
+    """
+    inspector = inspect(engine)
+    preparer = engine.dialect.identifier_preparer
+    added = []
+    for table in metadata.sorted_tables if tables is None else tables:
+        if not inspector.has_table(table.name, schema=table.schema):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name, schema=table.schema)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            if not column.nullable or column.server_default is not None:
+                print(f"Warning: {table.name}.{column.name} is missing and needs a manual migration")
+                continue
+            with engine.begin() as conn:
+                conn.execute(text(
+                    f"ALTER TABLE {preparer.format_table(table)} "
+                    f"ADD {preparer.format_column(column)} {column.type.compile(dialect=engine.dialect)}"
+                ))
+            added.append(f"{table.name}.{column.name}")
+    return added
+
+
+def missing_columns(engine: Engine, tables: Iterable[Table]) -> List[str]:
+    """The tables ("table") and columns ("table.column") the models declare that the
+    database doesn't have"""
+    inspector = inspect(engine)
+    missing = []
+    for table in tables:
+        if not inspector.has_table(table.name, schema=table.schema):
+            missing.append(table.name)
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name, schema=table.schema)}
+        missing.extend(f"{table.name}.{column.name}" for column in table.columns if column.name not in existing)
+    return missing
+
+
+def ensure_indexes(engine: Engine, metadata: MetaData, tables: Optional[Iterable[Table]] = None) -> List[str]:
+    """Create indexes declared on the models that existing tables don't have yet.
+
+    create_all only builds indexes together with a new table, so an index added
+    to a model later would never reach a database created before it. `tables`
+    limits the check as in ensure_columns. Returns the names of the indexes
+    created.
+    """
+    inspector = inspect(engine)
+    created = []
+    for table in metadata.sorted_tables if tables is None else tables:
+        if not inspector.has_table(table.name, schema=table.schema):
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table.name, schema=table.schema)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(bind=engine)
+                created.append(index.name)
+    return created
+
+
+def parse_decimal(value: Any) -> Optional[decimal.Decimal]:
+    """Decimal from a stored number or number-like string ("1,299.00", "$25"), else None"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float, decimal.Decimal)):
+        return decimal.Decimal(str(value))
+    cleaned = re.sub(r"[\s,$]", "", str(value))
+    try:
+        return decimal.Decimal(cleaned) if cleaned else None
+    except decimal.InvalidOperation:
+        return None
+
+
+def migrate_to_numeric(engine: Engine, column: Column, chunk_size: int = 5000) -> Optional[int]:
+    """Convert an existing text column to the Numeric type its model now declares.
+
+    Every stored value is parsed first and nothing is changed if any of them
+    isn't a number. Values that only parse after cleanup (thousands
+    separators, a currency sign) are rewritten as plain numbers, then the
+    column type is changed: ALTER COLUMN on SQL Server and PostgreSQL, a table
+    rebuild on SQLite, which can't alter a column. Returns the number of
+    rewritten values, or None when the column is already numeric.
+    """
+    table = column.table
+    inspector = inspect(engine)
+    if not inspector.has_table(table.name, schema=table.schema):
+        return None
+    stored = {info["name"]: info["type"] for info in inspector.get_columns(table.name, schema=table.schema)}
+    if isinstance(stored.get(column.name), sqltypes.Numeric):
+        return None
+
+    (pk,) = table.primary_key.columns
+    rewrites, invalid = [], []
+    with engine.connect() as conn:
+        # Read the stored text as-is; the column's model type would try to convert it
+        result = conn.execution_options(yield_per=chunk_size).execute(select(pk, type_coerce(column, String())))
+        for rows in result.partitions():
+            for key, value in rows:
+                number = parse_decimal(value)
+                if number is None and value is not None:
+                    invalid.append((key, value))
+                elif number is not None and str(value).strip() != str(number):
+                    rewrites.append({"b_key": key, "b_value": str(number)})
+    if invalid:
+        raise ValueError(f"{len(invalid)} {table.name}.{column.name} values aren't numbers, e.g. {invalid[:5]}")
+
+    preparer = engine.dialect.identifier_preparer
+    quoted_table, quoted_column = preparer.format_table(table), preparer.format_column(column)
+    type_sql = column.type.compile(dialect=engine.dialect)
+    index_names = [index["name"] for index in inspector.get_indexes(table.name, schema=table.schema)]
+    with engine.begin() as conn:
+        if rewrites:
+            conn.execute(
+                update(table).where(pk == bindparam("b_key")).values({column.name: bindparam("b_value", type_=String())}),
+                rewrites
+            )
+        dialect = engine.dialect.name
+        if dialect == "mssql":
+            null_sql = "NULL" if column.nullable else "NOT NULL"
+            conn.execute(text(f"ALTER TABLE {quoted_table} ALTER COLUMN {quoted_column} {type_sql} {null_sql}"))
+        elif dialect == "postgresql":
+            conn.execute(text(
+                f"ALTER TABLE {quoted_table} ALTER COLUMN {quoted_column} TYPE {type_sql} "
+                f"USING {quoted_column}::{type_sql}"
+            ))
+        elif dialect == "sqlite":
+            _rebuild_sqlite_table(conn, table, list(stored), index_names)
+        else:
+            raise NotImplementedError(f"Can't change column types on {dialect}")
+    return len(rewrites)
+
+
+def _rebuild_sqlite_table(conn, table, stored_columns: List[str], index_names: List[str]):
+    # Copy the rows into a table created from the model, then swap it in
+    missing = set(stored_columns) - set(table.columns.keys())
+    if missing:
+        raise ValueError(f"{table.name} has columns the model doesn't declare: {sorted(missing)}")
+    preparer = conn.dialect.identifier_preparer
+    old_name = f"{table.name}_before_migration"
+    conn.execute(text(f"ALTER TABLE {preparer.format_table(table)} RENAME TO {preparer.quote(old_name)}"))
+    # The renamed table keeps its indexes, whose names the new table needs
+    for index_name in index_names:
+        conn.execute(text(f"DROP INDEX {preparer.quote(index_name)}"))
+    table.create(conn)
+    column_list = ", ".join(preparer.quote(name) for name in stored_columns)
+    conn.execute(text(
+        f"INSERT INTO {preparer.format_table(table)} ({column_list}) "
+        f"SELECT {column_list} FROM {preparer.quote(old_name)}"
+    ))
+    conn.execute(text(f"DROP TABLE {preparer.quote(old_name)}"))
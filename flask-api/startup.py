@@ -0,0 +1,105 @@
+# startup.py
+import contextlib
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+
+class StartupReport:
+    """Per-phase startup timings, and whether the background warm-up has finished.
+
+    Phases run with `phase()` are timed and a failure is recorded instead of
+    stopping startup, so one slow or broken dependency (the spaCy model, the
+    database) doesn't keep the rest from warming up. `ready` is set once
+    `warm_up` has run every step and none of them failed.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.lock = threading.Lock()
+        self.phases: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+        self.pending: List[str] = []
+        self.finished = threading.Event()
+        self.ready = threading.Event()
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as ex:
+            with self.lock:
+                self.errors[name] = str(ex)
+            print(f"Warning: startup phase {name} failed: {ex}")
+        finally:
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                self.phases[name] = elapsed
+            print(f"Startup: {name} took {elapsed * 1000:.0f} ms")
+
+    def warm_up(self, steps: Sequence[Tuple[str, Callable[[], Any]]]) -> threading.Thread:
+        """Run the (name, step) pairs in order on a daemon thread, each as a phase"""
+        self.pending = [name for name, _ in steps]
+
+        def run():
+            for name, step in steps:
+                with self.phase(name):
+                    step()
+                with self.lock:
+                    self.pending.remove(name)
+            with self.lock:
+                self.phases["total"] = time.perf_counter() - self.started
+                failed = bool(self.errors)
+            self.finished.set()
+            if not failed:
+                self.ready.set()
+            print(f"Startup: {'ready' if not failed else 'warm-up failed'} after {self.phases['total']:.2f} s")
+
+        thread = threading.Thread(target=run, name="startup-warm-up", daemon=True)
+        thread.start()
+        return thread
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "ready": self.ready.is_set(),
+                "pending": list(self.pending),
+                "phases_ms": {name: round(seconds * 1000, 1) for name, seconds in self.phases.items()},
+                "errors": dict(self.errors),
+            }
+
+
+class LazyPipeline:
+    """Stands in for a spaCy Language object that is only loaded on first use.
+
+    Calls, `pipe` and attribute access (`meta`, `pipe_names`) load it if
+    needed; concurrent first calls share a single load. `load()` is what the
+    background warm-up calls so that requests normally find it loaded.
+    """
+
+    def __init__(self, loader: Callable[[], Any]):
+        self.loader = loader
+        self.lock = threading.Lock()
+        self.pipeline: Optional[Any] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self.pipeline is not None
+
+    def load(self):
+        if self.pipeline is None:
+            with self.lock:
+                if self.pipeline is None:
+                    self.pipeline = self.loader()
+        return self.pipeline
+
+    def __call__(self, text: str, **kwargs):
+        return self.load()(text, **kwargs)
+
+    def pipe(self, texts, **kwargs):
+        return self.load().pipe(texts, **kwargs)
+
+    def __getattr__(self, name: str):
+        # Only reached for attributes not defined here, i.e. the pipeline's own
+        return getattr(self.load(), name)
@@ -0,0 +1,54 @@
+# stock_alerts.py
+import datetime
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import Table, insert, select, update
+from sqlalchemy.engine import Engine
+
+
+def restock_notice(product_name: str, stock: int) -> str:
+    return f"Good news: {product_name} is back in stock ({stock} available)."
+
+
+def notify_restocked(engine: Engine, alerts: Table, products: Table, messages: Table, batch_size: int = 500,
+                     allocate_ids: Optional[Callable[[int], List[int]]] = None,
+                     notice: Callable[[str, int], str] = restock_notice) -> Dict[str, int]:
+    """Post a bot message to each session waiting on a product that is in stock again.
+
+    Only pending alerts are read, joined to their product by primary key, so a
+    run costs in proportion to the open alerts rather than the catalog. Alerts
+    are walked in id order, `batch_size` at a time; a batch's messages and its
+    notified_at stamps are written in one transaction, so stopping halfway
+    never notifies an alert twice. `allocate_ids` supplies message ids when
+    they are reserved ahead (write-behind); otherwise the database assigns them.
+    """
+    stats = {"alerts": 0, "batches": 0}
+    last_id = 0
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                select(alerts.c.id, alerts.c.session_id, products.c.Name, products.c.Stock)
+                .join(products, products.c.ProductId == alerts.c.product_id)
+                .where(alerts.c.notified_at.is_(None), alerts.c.id > last_id, products.c.Stock > 0)
+                .order_by(alerts.c.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            notified_at = datetime.datetime.utcnow()
+            notices = [
+                {"content": notice(row.Name, row.Stock), "is_user": 0, "timestamp": notified_at,
+                 "session_id": row.session_id}
+                for row in rows
+            ]
+            if allocate_ids is not None:
+                for row, message_id in zip(notices, allocate_ids(len(notices))):
+                    row["id"] = message_id
+            conn.execute(insert(messages), notices)
+            conn.execute(
+                update(alerts).where(alerts.c.id.in_([row.id for row in rows])).values(notified_at=notified_at)
+            )
+        stats["alerts"] += len(rows)
+        stats["batches"] += 1
+        last_id = rows[-1].id
+    return stats
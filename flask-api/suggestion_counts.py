@@ -0,0 +1,166 @@
+# suggestion_counts.py
+import bisect
+import threading
+from typing import Callable, Dict, Iterable, List, Tuple
+
+
+class SuggestionCounter:
+    """Suggestion usage counts kept in memory and written to the database in batches.
+
+    `load()` returns every (id, content, usage_count) row; `write(deltas)`
+    adds {id: uses} to the stored counts in one batched UPDATE. Uses are
+    counted in memory, and a ranking sorted by (-count, id) is kept up to
+    date as they come in, so the most used suggestions are read without a
+    query. A background thread writes the uses accumulated since the last
+    flush every `flush_interval` seconds, or sooner once `max_pending` uses
+    are waiting, which bounds what a crash can lose. `stop` writes the rest.
+
+    After each write the counts are reloaded, which picks up suggestions and
+    uses added by other processes.
+    """
+
+    def __init__(self, load: Callable[[], Iterable[Tuple[int, str, int]]], write: Callable[[Dict[int, int]], None],
+                 flush_interval: float = 10.0, max_pending: int = 1000):
+        self.load = load
+        self.write = write
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.lock = threading.Lock()
+        # Serializes flushes and reloads, so a reload never misses uses being written
+        self.flush_lock = threading.Lock()
+        self.loaded = False
+        self.ids: Dict[str, int] = {}
+        self.contents: Dict[int, str] = {}
+        self.counts: Dict[int, int] = {}
+        self.ranking: List[Tuple[int, int]] = []
+        self.pending: Dict[int, int] = {}
+        self.pending_uses = 0
+        self.flush_requested = threading.Event()
+        self.stopping = threading.Event()
+        self.thread = None
+        self.flushes = 0
+        self.flushed_uses = 0
+        self.failed_flushes = 0
+
+    def reload(self):
+        with self.flush_lock:
+            self._reload()
+
+    def _reload(self):
+        rows = list(self.load())
+        with self.lock:
+            self.ids = {content: suggestion_id for suggestion_id, content, _ in rows}
+            self.contents = {suggestion_id: content for suggestion_id, content, _ in rows}
+            # Uses recorded while the rows were read haven't been written yet
+            self.counts = {
+                suggestion_id: (usage_count or 0) + self.pending.get(suggestion_id, 0)
+                for suggestion_id, _, usage_count in rows
+            }
+            self.ranking = sorted((-count, suggestion_id) for suggestion_id, count in self.counts.items())
+            self.loaded = True
+
+    def ensure_loaded(self):
+        if not self.loaded:
+            with self.flush_lock:
+                if not self.loaded:
+                    self._reload()
+
+    def record(self, messages: Iterable[str]):
+        """Count a use of each suggestion whose content equals one of the messages"""
+        self.ensure_loaded()
+        with self.lock:
+            for message in messages:
+                suggestion_id = self.ids.get(message)
+                if suggestion_id is None:
+                    continue
+                count = self.counts[suggestion_id]
+                self._rerank(suggestion_id, count, count + 1)
+                self.counts[suggestion_id] = count + 1
+                self.pending[suggestion_id] = self.pending.get(suggestion_id, 0) + 1
+                self.pending_uses += 1
+            if self.pending_uses >= self.max_pending:
+                self.flush_requested.set()
+
+    def _rerank(self, suggestion_id: int, old: int, new: int):
+        del self.ranking[bisect.bisect_left(self.ranking, (-old, suggestion_id))]
+        bisect.insort(self.ranking, (-new, suggestion_id))
+
+    def add(self, suggestion_id: int, content: str, usage_count: int = 0):
+        """Start counting a suggestion that was just inserted"""
+        with self.lock:
+            if not self.loaded or suggestion_id in self.counts:
+                return
+            self.ids[content] = suggestion_id
+            self.contents[suggestion_id] = content
+            self.counts[suggestion_id] = usage_count
+            bisect.insort(self.ranking, (-usage_count, suggestion_id))
+
+    def top(self, limit: int) -> List[str]:
+        """Contents of the `limit` most used suggestions, most used first (ties by id)"""
+        self.ensure_loaded()
+        with self.lock:
+            return [self.contents[suggestion_id] for _, suggestion_id in self.ranking[:limit]]
+
+    def usage(self) -> List[Tuple[str, int]]:
+        """(content, count) of every suggestion, including uses not yet written"""
+        self.ensure_loaded()
+        with self.lock:
+            return [(self.contents[suggestion_id], count) for suggestion_id, count in self.counts.items()]
+
+    def flush(self) -> Dict[str, int]:
+        """Write the pending uses in one batch, then reload the counts"""
+        with self.flush_lock:
+            with self.lock:
+                deltas, self.pending, self.pending_uses = self.pending, {}, 0
+            if deltas:
+                try:
+                    self.write(deltas)
+                except Exception:
+                    # Put the uses back so the next flush retries them
+                    with self.lock:
+                        for suggestion_id, uses in deltas.items():
+                            self.pending[suggestion_id] = self.pending.get(suggestion_id, 0) + uses
+                        self.pending_uses += sum(deltas.values())
+                        self.failed_flushes += 1
+                    raise
+            self._reload()
+            with self.lock:
+                self.flushes += 1
+                self.flushed_uses += sum(deltas.values())
+        return {"suggestions": len(deltas), "uses": sum(deltas.values())}
+
+    def start(self):
+        def loop():
+            while not self.stopping.is_set():
+                self.flush_requested.wait(self.flush_interval)
+                self.flush_requested.clear()
+                if self.stopping.is_set():
+                    break
+                try:
+                    self.flush()
+                except Exception as ex:
+                    print(f"Warning: flushing suggestion usage failed: {ex}")
+
+        if self.thread is None:
+            self.thread = threading.Thread(target=loop, name="suggestion-flush", daemon=True)
+            self.thread.start()
+
+    def stop(self, timeout: float = 30.0):
+        """Stop the background thread and write whatever is still pending"""
+        self.stopping.set()
+        self.flush_requested.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+            self.thread = None
+        if self.pending_uses:
+            self.flush()
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {
+                "suggestions": len(self.counts),
+                "pending_uses": self.pending_uses,
+                "flushes": self.flushes,
+                "flushed_uses": self.flushed_uses,
+                "failed_flushes": self.failed_flushes,
+            }
@@ -15,6 +15,9 @@ const Chatbot = () => {
   
   const messagesEndRef = useRef(null);
   const inputRef = useRef(null);
+  // Conversation id the server hands back; sent with every message so follow-ups
+  // ("next products", stock alerts) continue the same session
+  const sessionIdRef = useRef(sessionStorage.getItem('chatbotSessionId'));
   
   const apiBaseUrl = 'http://localhost:5000';
 
@@ -118,7 +121,15 @@ const Chatbot = () => {
     setShowSuggestions(false);
 
     try {
-      const response = await axios.post(`${apiBaseUrl}/chatbot`, { message: content });
+      const payload = { message: content };
+      if (sessionIdRef.current) {
+        payload.session_id = sessionIdRef.current;
+      }
+      const response = await axios.post(`${apiBaseUrl}/chatbot`, payload);
+      if (response.data.session_id) {
+        sessionIdRef.current = response.data.session_id;
+        sessionStorage.setItem('chatbotSessionId', response.data.session_id);
+      }
       const botMessageId = `bot-${Date.now()}`;
       const botMessage = { 
         id: botMessageId, 
@@ -158,6 +169,9 @@ const Chatbot = () => {
   };
   
   const clearChat = () => {
+    // A cleared chat starts a new conversation on the server too
+    sessionIdRef.current = null;
+    sessionStorage.removeItem('chatbotSessionId');
     setMessages([
       { id: 'welcome', text: 'Hello! How can I help you today?', isUser: false, timestamp: new Date() }
     ]);